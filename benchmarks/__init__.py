@@ -0,0 +1,3 @@
+"""
+Benchmarks for Peru LGBT law scrapers, run against the local mock server
+"""
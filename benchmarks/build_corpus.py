@@ -0,0 +1,185 @@
+"""
+Build the parser micro-benchmark corpus in benchmarks/corpus/
+
+Takes a fixed sample of search and detail pages per period. Pages come
+from the raw page archive when one was recorded (--archive runs), and
+are otherwise synthesized from the JSON exports by the mock server's
+fixtures. The corpus also includes the quirky variants the parsers have
+to cope with: 1995/2000 pages with malformed attributes and unterminated
+</script tags, and the 2006 JavaScript redirect stubs.
+
+    uv run python -m benchmarks.build_corpus
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+from scrapers.mock_server import DOMINO_PERIODS, ExportFixtures
+from scrapers.utils.export import DataExporter
+from scrapers.utils.search_terms import LGBT_SEARCH_TERMS
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+DETAIL_PAGES = 12
+SEARCH_TERMS = LGBT_SEARCH_TERMS[:2]
+
+# The Domino 1995/2000 templates mix quote styles and separate attributes
+# with commas, and leave script blocks unterminated
+MALFORMED_PREAMBLE = (
+    "<script language=\"JavaScript\">\n"
+    "function abre(url) { window.open(url, 'doc', 'width=600,height=400'); }\n"
+    "</script\n"
+    "<table width='100%', align=\"center\" border='0', cellpadding=\"2\">\n"
+    "<tr><td width=\"30%\", align=\"left\"><b>Proyectos de Ley</b></td></tr>\n"
+    "</table>\n"
+)
+
+JS_REDIRECT_STUB = (
+    "<html><head>\n"
+    "<script language=\"JavaScript\">\n"
+    "location.href = location.href.split('&Highlight=')[0] + '&Click=';\n"
+    "</script\n"
+    "</head><body></body></html>\n"
+)
+
+
+def _archived_pages(archive, period_name, kind, limit):
+    """Recorded (url, content type, bytes) for a period's search or detail pages"""
+    pattern = "%SearchView%" if kind == "search" else "%OpenDocument%"
+    rows = archive.conn.execute(
+        "SELECT url, content_type, hash FROM pages WHERE period = ? AND url LIKE ? "
+        "AND status = 200 GROUP BY hash ORDER BY url LIMIT ?",
+        (period_name, pattern, limit),
+    ).fetchall()
+    return [(url, content_type, archive.read(digest)) for url, content_type, digest in rows]
+
+
+def _synthesized_pages(fixtures, period_name, kind, limit):
+    if kind == "search":
+        pages = []
+        for term in SEARCH_TERMS:
+            database = "debusqueda2" if period_name in ("2011", "2016") else "debusqueda"
+            url = (
+                f"https://www2.congreso.gob.pe/Sicr/TraDocEstProc/CLProLey{period_name}.nsf/"
+                f"{database}?SearchView&Query={term}"
+            )
+            _, content_type, content = fixtures.domino_search(
+                period_name, database, {"Query": [term], "SearchMax": ["100"]}
+            )
+            pages.append((url, content_type, content))
+        return pages
+
+    pages = []
+    for unid, record in sorted(fixtures.domino.get(period_name, {}).items())[:limit]:
+        _, content_type, content = fixtures.domino_document(period_name, unid)
+        pages.append((record["url"], content_type, content))
+    return pages
+
+
+def _spley_pages(fixtures, limit):
+    pages = []
+    for term in SEARCH_TERMS:
+        payload = {"palabras": term, "pageSize": 50, "rowStart": 0}
+        _, content_type, content = fixtures.spley_search(payload)
+        pages.append(("search", f"lista-con-filtro?palabras={term}", content_type, content))
+    for per_par_id, pley_num in sorted(fixtures.spley)[:limit]:
+        _, content_type, content = fixtures.spley_detail(per_par_id, pley_num)
+        pages.append(("detail", f"expediente/{per_par_id}/{pley_num}", content_type, content))
+    return pages
+
+
+def _entries(manifest, period_name, kind):
+    return [
+        entry
+        for entry in manifest
+        if entry["period"] == period_name and entry["kind"] == kind
+    ]
+
+
+def build(output_dir=CORPUS_DIR, limit=DETAIL_PAGES):
+    exporter = DataExporter()
+    fixtures = ExportFixtures(exporter)
+
+    archive = None
+    archive_dir = exporter.output_dir.parent / "archive"
+    if (archive_dir / "pages.sqlite").exists():
+        from scrapers.utils.archive import PageArchive
+
+        archive = PageArchive(archive_dir, "corpus")
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    manifest = []
+
+    def write(period_name, kind, index, url, content_type, content, source):
+        suffix = "json" if "json" in (content_type or "") else "html"
+        path = output_dir / period_name / f"{kind}_{index:02d}.{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        manifest.append(
+            {
+                "path": str(path.relative_to(output_dir)),
+                "period": period_name,
+                "kind": kind,
+                "url": url,
+                "content_type": content_type,
+                "source": source,
+            }
+        )
+
+    for period_name in DOMINO_PERIODS:
+        for kind in ("search", "detail"):
+            pages, source = [], "archive"
+            if archive is not None:
+                pages = _archived_pages(archive, period_name, kind, limit)
+            if not pages:
+                pages = _synthesized_pages(fixtures, period_name, kind, limit)
+                source = "synthesized"
+            for index, (url, content_type, content) in enumerate(pages):
+                write(period_name, kind, index, url, content_type, content, source)
+
+        if period_name in ("1995", "2000"):
+            # Same documents wrapped in the malformed template markup
+            details = _entries(manifest, period_name, "detail")
+            for index, entry in enumerate(details[: limit // 2]):
+                content = (output_dir / entry["path"]).read_bytes()
+                content = content.replace(
+                    b"<body>", b"<body>" + MALFORMED_PREAMBLE.encode(), 1
+                )
+                write(
+                    period_name, "malformed", index,
+                    entry["url"], entry["content_type"], content, "variant",
+                )
+
+        if period_name == "2006":
+            # Stubs are served in place of some documents' real pages
+            for index, entry in enumerate(_entries(manifest, "2006", "detail")[:2]):
+                write(
+                    "2006", "stub", index,
+                    entry["url"], "text/html; charset=iso-8859-1",
+                    JS_REDIRECT_STUB.encode("iso-8859-1"), "variant",
+                )
+
+    for kind, url, content_type, content in _spley_pages(fixtures, limit):
+        index = len(_entries(manifest, "2021", kind))
+        write("2021", kind, index, url, content_type, content, "synthesized")
+
+    with open(output_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the parser benchmark corpus")
+    parser.add_argument(
+        "--limit", type=int, default=DETAIL_PAGES, help="Detail pages per period"
+    )
+    args = parser.parse_args()
+
+    manifest = build(limit=args.limit)
+    print(f"📚 Wrote {len(manifest)} pages to {CORPUS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
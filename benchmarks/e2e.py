@@ -0,0 +1,278 @@
+"""
+End-to-end throughput benchmark per period
+
+Runs each period scraper in its own process against the local stand-in
+server (scrapers/mock_server.py) and reports documents/s, requests/s,
+parse ms per page, bytes transferred, peak RSS and wall time. Results are
+compared with a stored baseline and regressions beyond the threshold are
+flagged (exit status 1), so a performance change comes with numbers.
+
+    uv run python -m benchmarks.e2e                     # all periods
+    uv run python -m benchmarks.e2e --periods 2006 2021 --repeat 3
+    uv run python -m benchmarks.e2e --save-baseline     # record a new baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+
+# Method handling one document per period; time spent in it minus the
+# time spent fetching is the parse cost
+DOCUMENT_METHODS = {
+    "2021": "get_project_details",
+    "2016": "process_law_page_2016",
+    "2011": "process_law_page_2011",
+    "2006": "process_law_page_2006",
+    "2001": "process_law_page_2001",
+    "2000": "process_law_page_2000",
+    "1995": "process_law_page_1995",
+}
+
+# Metric -> True if higher is better
+METRICS = {
+    "docs_per_s": True,
+    "requests_per_s": True,
+    "parse_ms_per_page": False,
+    "bytes": False,
+    "peak_rss_mb": False,
+    "wall_s": False,
+}
+
+DEFAULT_THRESHOLD = 0.10
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(period, terms, output_dir):
+    """Scrape one period in this process and return its metrics"""
+    from scrapers.periods import load_scraper
+    from scrapers.utils.export import DataExporter
+
+    scraper = load_scraper(period)()
+    scraper.exporter = DataExporter(output_dir)
+    if terms:
+        scraper.search_terms = scraper.search_terms[:terms]
+
+    timings = {"fetch": 0.0, "document": 0.0, "documents": 0}
+
+    def timed_fetch(method):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings["fetch"] += time.perf_counter() - started
+
+        return wrapper
+
+    scraper.fetcher.get = timed_fetch(scraper.fetcher.get)
+    scraper.fetcher.post = timed_fetch(scraper.fetcher.post)
+    scraper.fetcher.race = timed_fetch(scraper.fetcher.race)
+
+    document_method = getattr(scraper, DOCUMENT_METHODS[period])
+
+    def timed_document(*args, **kwargs):
+        fetch_before = timings["fetch"]
+        started = time.perf_counter()
+        try:
+            return document_method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            timings["document"] += elapsed - (timings["fetch"] - fetch_before)
+            timings["documents"] += 1
+
+    setattr(scraper, DOCUMENT_METHODS[period], timed_document)
+
+    started = time.perf_counter()
+    scraper.run()
+    wall = time.perf_counter() - started
+
+    pages = timings["documents"] or 1
+    return {
+        "documents": scraper.result_count,
+        "wall_s": wall,
+        "parse_ms_per_page": timings["document"] * 1000 / pages,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_period(server, period, terms):
+    """Benchmark one period in a child process, returning its metrics"""
+    from scrapers.utils.endpoints import BASE_URL_ENV, POLITENESS_ENV
+
+    env = dict(os.environ, **{BASE_URL_ENV: server.base_url, POLITENESS_ENV: "0"})
+    requests_before = server.stats["requests"]
+    bytes_before = server.stats["bytes"]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        command = [
+            sys.executable, "-m", "benchmarks.e2e",
+            "--worker", period, "--output", output_dir,
+        ]
+        if terms:
+            command += ["--terms", str(terms)]
+        completed = subprocess.run(
+            command,
+            cwd=BENCHMARKS_DIR.parent,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    metrics = json.loads(completed.stdout.strip().splitlines()[-1])
+    wall = metrics["wall_s"]
+    requests = server.stats["requests"] - requests_before
+    metrics.update(
+        {
+            "requests": requests,
+            "bytes": server.stats["bytes"] - bytes_before,
+            "docs_per_s": metrics["documents"] / wall,
+            "requests_per_s": requests / wall,
+        }
+    )
+    return metrics
+
+
+def median_metrics(runs):
+    return {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+
+
+def compare(results, baseline, threshold):
+    """Return (period, metric, baseline, current, change) for each regression"""
+    regressions = []
+    for period, metrics in results.items():
+        previous = baseline.get(period)
+        if not previous:
+            continue
+        if previous.get("documents") != metrics["documents"]:
+            logger.warning(
+                "%s: %d documents vs %s in baseline; fixtures changed",
+                period,
+                metrics["documents"],
+                previous.get("documents"),
+            )
+        for name, higher_is_better in METRICS.items():
+            old, new = previous.get(name), metrics[name]
+            if not old:
+                continue
+            change = (new - old) / old
+            if (change < -threshold) if higher_is_better else (change > threshold):
+                regressions.append((period, name, old, new, change))
+    return regressions
+
+
+def print_table(results):
+    header = f"{'period':8} {'docs':>6} {'docs/s':>8} {'req/s':>8} {'parse ms':>9} {'MB':>7} {'RSS MB':>7} {'wall s':>7}"
+    print(header)
+    print("-" * len(header))
+    for period, m in results.items():
+        print(
+            f"{period:8} {m['documents']:>6.0f} {m['docs_per_s']:>8.1f} "
+            f"{m['requests_per_s']:>8.1f} {m['parse_ms_per_page']:>9.2f} "
+            f"{m['bytes'] / 1e6:>7.2f} {m['peak_rss_mb']:>7.1f} {m['wall_s']:>7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scraper throughput benchmark")
+    parser.add_argument("--periods", nargs="+", choices=list(DOCUMENT_METHODS))
+    parser.add_argument("--terms", type=int, help="Only use the first N search terms")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per period (median)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mock server latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock server 500 rate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative change counted as a regression (default 0.10)",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store these results as the baseline"
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Scraper progress goes to stderr; stdout only carries the metrics
+        with redirect_stdout(sys.stderr):
+            metrics = run_worker(args.worker, args.terms, args.output)
+        print(json.dumps(metrics))
+        return
+
+    from scrapers.mock_server import MockConfig, MockCongressServer
+
+    config = MockConfig(latency_ms=args.latency_ms, error_rate=args.error_rate, seed=0)
+    results = {}
+
+    with MockCongressServer(config=config) as server:
+        print(f"🏁 Benchmarking against {server.base_url}")
+        for period in args.periods or list(DOCUMENT_METHODS):
+            runs = [run_period(server, period, args.terms) for _ in range(args.repeat)]
+            results[period] = median_metrics(runs)
+            print(
+                f"  {period}: {results[period]['documents']:.0f} docs in "
+                f"{results[period]['wall_s']:.2f}s"
+            )
+
+    print()
+    print_table(results)
+
+    # Numbers are only comparable between runs with the same workload
+    report = {
+        "workload": {
+            "terms": args.terms,
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+        },
+        "periods": results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    with open(RESULTS_DIR / "latest.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📌 Baseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print()
+    if baseline["workload"] != report["workload"]:
+        print(f"  ⚠️  Baseline workload differs: {baseline['workload']}")
+    regressions = compare(results, baseline["periods"], args.threshold)
+    if not regressions:
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+        return
+
+    print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+    for period, name, old, new, change in regressions:
+        print(f"  {period} {name}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Parser micro-benchmarks over the committed corpus
+
+Times each parsing stage separately, per period and per BeautifulSoup
+tree builder, on the pages in benchmarks/corpus/ (see build_corpus.py):
+
+- repair:  _repair_html_{period} on the decoded page
+- parse:   building the soup
+- text:    soup.get_text().lower()
+- terms:   find_terms on the page text
+- extract: extract_law_info_{period} (standardize_result for 2021)
+- search:  parse_search_results_{period}, with document fetches stubbed out
+- detect:  the 2006 JavaScript redirect check on stub pages
+
+    uv run python -m benchmarks.parsers
+    uv run python -m benchmarks.parsers --periods 1995 2016 --repeat 50
+"""
+
+import argparse
+import io
+import json
+import statistics
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import requests
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from scrapers.periods import load_scraper
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+RESULTS_FILE = Path(__file__).parent / "results" / "parsers.json"
+
+# Tree builders to compare; html5lib is only timed when installed
+BACKENDS = [
+    name for name in ("html.parser", "lxml", "html5lib") if builder_registry.lookup(name)
+]
+
+SEARCH_METHODS = {
+    "2016": ("parse_search_results_2016", "process_law_page_2016"),
+    "2011": ("parse_search_results_2011", "process_law_page_2011"),
+    "2006": ("parse_search_results_2006", "process_law_page_2006"),
+    "2001": ("parse_search_results_2001", "process_law_page_2001"),
+    "2000": ("parse_search_results_2000", "process_law_page_2000"),
+    "1995": ("parse_search_results_1995", "process_law_page_1995"),
+}
+
+
+def time_call(func, repeat):
+    """Median seconds per call over `repeat` calls, and the last result"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def decode(content, content_type):
+    if "iso-8859-1" in (content_type or "").lower():
+        return content.decode("iso-8859-1")
+    return content.decode("utf-8", "replace")
+
+
+def fake_response(entry, content):
+    """A requests.Response carrying a corpus page, as the scrapers receive it"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.headers["Content-Type"] = entry["content_type"] or "text/html"
+    response.url = entry["url"]
+    return response
+
+
+def bench_html_page(scraper, period_name, entry, content, backend, repeat):
+    timings = {}
+    repair = getattr(scraper, f"_repair_html_{period_name}", None)
+    text = decode(content, entry["content_type"])
+
+    if repair is not None:
+        timings["repair"], text = time_call(lambda: repair(text), repeat)
+
+    timings["parse"], soup = time_call(lambda: BeautifulSoup(text, backend), repeat)
+
+    if entry["kind"] == "stub":
+        timings["detect"], _ = time_call(
+            lambda: scraper._is_javascript_redirect_page_2006(soup), repeat
+        )
+        return timings
+
+    timings["text"], page_text = time_call(lambda: soup.get_text().lower(), repeat)
+    timings["terms"], _ = time_call(lambda: scraper.find_terms(page_text), repeat)
+    extract = getattr(scraper, f"extract_law_info_{period_name}")
+    timings["extract"], _ = time_call(lambda: extract(soup, entry["url"]), repeat)
+    return timings
+
+
+def bench_search_page(scraper, period_name, entry, content, backend, repeat):
+    parse_method, document_method = SEARCH_METHODS[period_name]
+    # Only link extraction is measured: documents are not fetched
+    setattr(scraper, document_method, lambda link_info, search_term: True)
+    scraper.html_parser = backend
+    parse = getattr(scraper, parse_method)
+    with redirect_stdout(io.StringIO()):
+        seconds, _ = time_call(
+            lambda: parse(fake_response(entry, content), "benchmark", entry["url"]), repeat
+        )
+    return {"search": seconds}
+
+
+def bench_spley_page(scraper, entry, content, repeat):
+    data = json.loads(content)
+    if entry["kind"] == "search":
+        seconds, _ = time_call(lambda: json.loads(content), repeat)
+        return {"parse": seconds}
+
+    project = {"perParId": 2021, "pleyNum": 1, "titulo": "", "proyectoLey": ""}
+    full_data = {
+        "search_term_used": "benchmark",
+        "basic_info": project,
+        "detailed_info": data.get("data", {}),
+        "scraped_at": "",
+    }
+    parse_seconds, _ = time_call(lambda: json.loads(content), repeat)
+    extract_seconds, _ = time_call(lambda: scraper.standardize_result(full_data), repeat)
+    return {"parse": parse_seconds, "extract": extract_seconds}
+
+
+def run(periods=None, repeat=20):
+    """Return {period: {backend: {stage: {kind: median microseconds per page}}}}"""
+    with open(CORPUS_DIR / "manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    results = {}
+    scrapers = {}
+    for entry in manifest:
+        period_name = entry["period"]
+        if periods and period_name not in periods:
+            continue
+
+        if period_name not in scrapers:
+            scrapers[period_name] = load_scraper(period_name)()
+            scrapers[period_name].politeness = 0
+        scraper = scrapers[period_name]
+        content = (CORPUS_DIR / entry["path"]).read_bytes()
+
+        backends = ["json"] if period_name == "2021" else BACKENDS
+        for backend in backends:
+            if period_name == "2021":
+                timings = bench_spley_page(scraper, entry, content, repeat)
+            elif entry["kind"] == "search":
+                timings = bench_search_page(
+                    scraper, period_name, entry, content, backend, repeat
+                )
+            else:
+                timings = bench_html_page(
+                    scraper, period_name, entry, content, backend, repeat
+                )
+
+            stages = results.setdefault(period_name, {}).setdefault(backend, {})
+            for stage, seconds in timings.items():
+                samples = stages.setdefault(stage, {}).setdefault(entry["kind"], [])
+                samples.append(seconds * 1e6)
+
+    for backends in results.values():
+        for stages in backends.values():
+            for stage, kinds in stages.items():
+                stages[stage] = {
+                    kind: statistics.median(values) for kind, values in kinds.items()
+                }
+    return results
+
+
+def print_results(results):
+    stages = ["repair", "parse", "text", "terms", "extract", "search", "detect"]
+    header = f"{'period':7} {'backend':12} {'kind':10}" + "".join(f"{s:>10}" for s in stages)
+    print("Median microseconds per page")
+    print(header)
+    print("-" * len(header))
+    for period_name, backends in results.items():
+        for backend, timings in backends.items():
+            kinds = sorted({kind for values in timings.values() for kind in values})
+            for kind in kinds:
+                cells = "".join(
+                    f"{timings[s][kind]:>10.0f}" if kind in timings.get(s, {}) else f"{'':>10}"
+                    for s in stages
+                )
+                print(f"{period_name:7} {backend:12} {kind:10}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser micro-benchmarks")
+    parser.add_argument("--periods", nargs="+")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per page and stage")
+    args = parser.parse_args()
+
+    results = run(args.periods, args.repeat)
+    print_results(results)
+
+    RESULTS_FILE.parent.mkdir(exist_ok=True)
+    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📁 {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
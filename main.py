@@ -13,15 +13,107 @@ This script allows you to run scrapers for different periods:
 """
 
 import argparse
-from scrapers import (
-    Peru2021LGBTScraper,
-    Peru2016LGBTScraper,
-    Peru2011LGBTScraper,
-    Peru2006LGBTScraper,
-    Peru2001LGBTScraper,
-    Peru2000LGBTScraper,
-    Peru1995LGBTScraper,
-)
+import os
+from scrapers.periods import PERIODS, load_scraper, period_display_name
+
+# Exports of --base-url runs, kept apart from the data/exports the mock serves
+MOCK_OUTPUT_DIR = "data/mock/exports"
+
+
+def build_consolidated_dataset():
+    """Merge every period export into lgbt_laws_consolidated_*"""
+    from scrapers.utils.export import DataExporter
+    from scrapers.utils.logs import flush_logging
+    from scrapers.utils.merge import build_consolidated
+
+    print("🧩 Building consolidated cross-period dataset...")
+    build_consolidated(DataExporter())
+    flush_logging()
+
+
+def snapshot_repository():
+    from scrapers.utils.export import DataExporter
+    from scrapers.utils.snapshots import SnapshotRepository
+
+    return SnapshotRepository(DataExporter().output_dir.parent / "snapshots")
+
+
+def take_snapshot():
+    """Record the current exports as a new snapshot"""
+    from scrapers.utils.export import DataExporter
+
+    manifest = snapshot_repository().create(DataExporter().output_dir)
+    if manifest is None:
+        print("📸 Exports unchanged since the latest snapshot")
+        return
+    records = sum(len(hashes) for hashes in manifest["periods"].values())
+    print(f"📸 Snapshot {manifest['id']}: {records} records in {len(manifest['periods'])} files")
+
+
+def run_snapshot_command(args):
+    """Handle --snapshots, --checkout and --diff-snapshots"""
+    repository = snapshot_repository()
+
+    try:
+        _run_snapshot_command(args, repository)
+    except ValueError as e:
+        print(f"❌ {e}")
+
+
+def _run_snapshot_command(args, repository):
+    from scrapers.utils.export import DataExporter
+
+    if args.snapshots:
+        manifests = repository.list()
+        if not manifests:
+            print("No snapshots yet (create one with --snapshot)")
+        for manifest in manifests:
+            counts = ", ".join(
+                f"{period}: {len(hashes)}" for period, hashes in manifest["periods"].items()
+            )
+            print(f"  {manifest['id']}  {counts}")
+
+    elif args.checkout:
+        target = args.into or repository.root / "checkout" / args.checkout
+        manifest = repository.checkout(args.checkout, DataExporter(target))
+        print(f"📂 Snapshot {manifest['id']} checked out to {target}")
+
+    else:
+        old_ref, new_ref = args.diff_snapshots
+        counts = {"new": 0, "changed": 0, "removed": 0}
+        for change in repository.diff(old_ref, new_ref):
+            counts[change["change"]] += 1
+            detail = ", ".join(change.get("fields", {}))
+            print(
+                f"  {change['change']:8} [{change['period']}] {change['law_number']}"
+                + (f" ({detail})" if detail else "")
+            )
+        print(
+            f"📊 {counts['new']} new, {counts['changed']} changed, "
+            f"{counts['removed']} removed"
+        )
+
+
+def search_laws(query, period=None, status=None, limit=20):
+    """Print ranked full-text matches from the offline search index"""
+    from scrapers.utils.export import DataExporter
+
+    index = DataExporter().open_search_index()
+    try:
+        hits = index.search(query, limit=limit, period_name=period, status=status)
+    finally:
+        index.close()
+
+    if not hits:
+        print(f"🔎 No matches for '{query}'")
+        return
+
+    print(f"🔎 {len(hits)} match(es) for '{query}':")
+    for hit in hits:
+        print(f"  [{hit['period']}] {hit['law_number']} ({hit['date']}) - {hit['status']}")
+        print(f"    {hit['title']}")
+        print(f"    {hit['snippet']}")
+        print(f"    {hit['url']}")
 
 
 def main():
@@ -39,6 +131,11 @@ Examples:
   uv run python main.py --period 2000         # Scrape 2000-2001 period
   uv run python main.py --period 1995         # Scrape 1995-2000 period
   uv run python main.py --all                 # Scrape all periods
+  uv run python main.py --watch               # Poll 2021+ for new/changed bills
+  uv run python main.py --current --incremental  # Only bills since the last run
+  uv run python main.py --search "nombre social" --status "Al Archivo"
+  uv run python main.py --current --snapshot  # Scrape, then snapshot exports
+  uv run python main.py --diff-snapshots 20260101 latest
         """,
     )
 
@@ -48,71 +145,354 @@ Examples:
 
     parser.add_argument(
         "--period",
-        choices=["2016", "2011", "2006", "2001", "2000", "1995"],
+        choices=[period for period in PERIODS if period != "2021"],
         help="Scrape specific period",
     )
 
     parser.add_argument("--all", action="store_true", help="Scrape all periods")
 
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep polling the 2021+ API for new or changed bills (store + change log)",
+    )
+
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=900,
+        metavar="SECONDS",
+        help="Seconds between --watch polls",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="2021+: only search bills presented since the last run (plus --lookback), "
+        "upserting into the store",
+    )
+
+    parser.add_argument(
+        "--lookback",
+        type=int,
+        default=30,
+        metavar="DAYS",
+        help="Days of recent bills --incremental runs and --watch polls re-check for state changes",
+    )
+
     parser.add_argument(
         "--test", action="store_true", help="Run in test mode with limited results"
     )
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Append each record to lgbt_laws_{period}.jsonl as it is scraped",
+    )
+
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="Upsert records into data/exports/lgbt_laws.sqlite (deduplicated)",
+    )
+
+    parser.add_argument(
+        "--from-store",
+        action="store_true",
+        help="Re-export the selected periods from the SQLite store without scraping",
+    )
+
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Keep every raw page fetched in a compressed archive under data/archive/",
+    )
+
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Serve every request from data/archive/ (recorded with --archive), no network",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each period run: .pstats and collapsed stacks next to the exports",
+    )
+
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Scraper log level; DEBUG adds one line per document",
+    )
+
+    parser.add_argument(
+        "--log-format",
+        default="text",
+        choices=["text", "json"],
+        help="Console log format (json = one JSON object per line)",
+    )
+
+    parser.add_argument(
+        "--log-file",
+        metavar="PATH",
+        help="Also append the scraper logs to this file as JSON lines",
+    )
+
+    parser.add_argument(
+        "--prometheus",
+        action="store_true",
+        help="Also write each run report as lgbt_laws_{period}.prom (Prometheus text format)",
+    )
+
+    parser.add_argument(
+        "--base-url",
+        metavar="URL",
+        help="Send all requests to this host instead of congreso.gob.pe (e.g. the mock server)",
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        metavar="DIR",
+        help="Write exports to DIR instead of data/exports "
+        "(default with --base-url: data/mock/exports)",
+    )
+
+    parser.add_argument(
+        "--politeness",
+        type=float,
+        metavar="FACTOR",
+        help="Scale the pauses between requests (1 = normal, 0 = none)",
+    )
+
+    parser.add_argument(
+        "--columnar",
+        choices=["parquet", "arrow"],
+        help="Also write typed Parquet/Arrow files per period plus a combined dataset",
+    )
+
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Build one deduplicated cross-period dataset from the exports",
+    )
+
+    parser.add_argument(
+        "--search",
+        metavar="QUERY",
+        help="Query the offline full-text index (FTS5 syntax; plain words are ANDed)",
+    )
+
+    parser.add_argument(
+        "--status", help="Only show search hits with this status (e.g. 'Al Archivo')"
+    )
+
+    parser.add_argument(
+        "--limit", type=int, default=20, help="Maximum number of search hits"
+    )
+
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the search index from the selected periods' exports",
+    )
+
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Record the exports as a snapshot in data/snapshots/ (after scraping)",
+    )
+
+    parser.add_argument(
+        "--snapshots", action="store_true", help="List snapshots"
+    )
+
+    parser.add_argument(
+        "--checkout",
+        metavar="SNAPSHOT",
+        help="Restore a snapshot's JSON/CSV/TXT files (id, id prefix or 'latest')",
+    )
+
+    parser.add_argument(
+        "--into",
+        metavar="DIR",
+        help="Directory for --checkout (default: data/snapshots/checkout/<id>)",
+    )
+
+    parser.add_argument(
+        "--diff-snapshots",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="List bills new, changed or removed between two snapshots",
+    )
+
     args = parser.parse_args()
+    if args.replay and args.archive:
+        parser.error("--replay reads the archive; it cannot be combined with --archive")
+
+    from scrapers.utils.logs import flush_logging, setup_logging
+
+    setup_logging(args.log_level, args.log_format, args.log_file)
+
+    from scrapers.utils.export import DEFAULT_OUTPUT_DIR, OUTPUT_DIR_ENV
+
+    if args.output_dir or args.base_url:
+        # A run against the mock server must not overwrite the exports it serves
+        os.environ[OUTPUT_DIR_ENV] = args.output_dir or MOCK_OUTPUT_DIR
+
+    if args.snapshots or args.checkout or args.diff_snapshots:
+        run_snapshot_command(args)
+        return
+
+    if args.search:
+        search_laws(args.search, args.period, args.status, args.limit)
+        return
 
-    if not any([args.current, args.period, args.all]):
+    if not any([args.current, args.period, args.all, args.watch, args.merge, args.snapshot]):
         parser.print_help()
         return
 
+    # Only the selected periods are imported; each module loads on demand
     scrapers_to_run = []
 
-    if args.current or args.all:
-        scrapers_to_run.append(("Current Period (2021+)", Peru2021LGBTScraper))
+    for period in PERIODS:
+        if args.all or (period == "2021" and args.current) or args.period == period:
+            scrapers_to_run.append((period_display_name(period), period))
 
-    if args.period == "2016" or args.all:
-        scrapers_to_run.append(("Historical 2016-2021", Peru2016LGBTScraper))
+    if not scrapers_to_run and (args.merge or args.snapshot):
+        if args.merge:
+            build_consolidated_dataset()
+        if args.snapshot:
+            take_snapshot()
+        return
+
+    if args.reindex:
+        from scrapers.utils.export import DataExporter
+
+        exporter = DataExporter()
+        for name, period in scrapers_to_run:
+            print(f"🗂️  Indexing {name}...")
+            exporter.update_search_index(period)
+            flush_logging()
+        return
 
-    if args.period == "2011" or args.all:
-        scrapers_to_run.append(("Historical 2011-2016", Peru2011LGBTScraper))
+    if args.from_store:
+        from scrapers.utils.export import DataExporter
 
-    if args.period == "2006" or args.all:
-        scrapers_to_run.append(("Historical 2006-2011", Peru2006LGBTScraper))
+        exporter = DataExporter()
+        for name, period in scrapers_to_run:
+            print(f"📦 Exporting {name} from store...")
+            exporter.save_results_from_store(period)
+            if args.columnar:
+                exporter.save_columnar(period, args.columnar)
+            flush_logging()
+        if args.columnar:
+            exporter.save_columnar_dataset(args.columnar)
+        return
 
-    if args.period == "2001" or args.all:
-        scrapers_to_run.append(("Historical 2001-2006", Peru2001LGBTScraper))
+    # Read by the scrapers when they are created
+    from scrapers.utils.endpoints import BASE_URL_ENV, POLITENESS_ENV
 
-    if args.period == "2000" or args.all:
-        scrapers_to_run.append(("Historical 2000-2001", Peru2000LGBTScraper))
+    if args.base_url:
+        os.environ[BASE_URL_ENV] = args.base_url
+    if args.politeness is not None:
+        os.environ[POLITENESS_ENV] = str(args.politeness)
 
-    if args.period == "1995" or args.all:
-        scrapers_to_run.append(("Historical 1995-2000", Peru1995LGBTScraper))
+    if args.watch:
+        print(f"👀 Watching {period_display_name('2021')} (Ctrl+C to stop)")
+        scraper = load_scraper("2021")()
+        scraper.lookback_days = args.lookback
+        scraper.write_prometheus = args.prometheus
+        scraper.watch(args.watch_interval)
+        flush_logging()
+        return
 
     # Run selected scrapers
     print("🏳️‍🌈 Peru LGBT Laws Scraper")
     print(f"Running {len(scrapers_to_run)} scraper(s)...")
     print()
+    profilers = []
 
-    for name, scraper_class in scrapers_to_run:
+    for name, period in scrapers_to_run:
         print(f"🔍 Starting {name}...")
         print("-" * 50)
 
         try:
+            scraper_class = load_scraper(period)
             scraper = scraper_class()
+            scraper.streaming = args.stream
+            scraper.write_prometheus = args.prometheus
+            if args.store:
+                scraper.exporter.open_store()
+            if args.incremental and period == "2021":
+                scraper.incremental = True
+                scraper.lookback_days = args.lookback
+            if args.archive:
+                scraper.open_archive()
+            if args.replay:
+                scraper.open_replay()
+                print("⏪ Replaying archived pages (no network)")
             if args.test:
                 # Limit search terms for testing
                 scraper.search_terms = scraper.search_terms[:5]
                 print("🧪 Running in test mode (limited terms)")
+            if args.profile:
+                profilers.append(scraper.enable_profiling())
 
             scraper.run()
+            if args.columnar:
+                scraper.exporter.save_columnar(period, args.columnar)
+            scraper.exporter.update_search_index(period)
+            flush_logging()
             print(f"✅ {name} completed successfully")
 
         except Exception as e:
+            flush_logging()
             print(f"❌ {name} failed: {e}")
 
         print()
 
+    if args.columnar:
+        from scrapers.utils.export import DataExporter
+
+        DataExporter().save_columnar_dataset(args.columnar)
+
+    if args.merge:
+        build_consolidated_dataset()
+
+    if args.snapshot:
+        take_snapshot()
+
+    flush_logging()
     print("🎉 All scrapers completed!")
-    print("📁 Results saved in data/exports/ directory")
+    print(f"📁 Results saved in {os.environ.get(OUTPUT_DIR_ENV, DEFAULT_OUTPUT_DIR)}/ directory")
+
+    # Imported here so --help does not pay for loading requests
+    from scrapers.utils.http import connection_stats
+
+    stats = connection_stats()
+    if stats:
+        print("🔌 Connections per host:")
+        for host, host_stats in stats.items():
+            print(
+                f"  {host}: {host_stats['requests']} requests, "
+                f"{host_stats['connections_opened']} opened, "
+                f"{host_stats['connections_reused']} reused"
+            )
+
+        from scrapers.utils.latency import latency_tracker
+
+        print("⏱️  Latency per endpoint (p50/p95/p99):")
+        for name, summary in latency_tracker.snapshot().items():
+            print(
+                f"  {name}: {summary['samples']} samples, "
+                f"{summary['p50']:.2f}s / {summary['p95']:.2f}s / {summary['p99']:.2f}s"
+            )
+
+    for profiler in profilers:
+        print()
+        print(profiler.hot_spots())
 
 
 if __name__ == "__main__":
@@ -8,15 +8,30 @@ from Peru's Congress database across different legislative periods.
 __version__ = "1.0.0"
 __author__ = "LGBT Peru Law Research Project"
 
-from .periods.scraper_2021 import Peru2021LGBTScraper
-from .periods.scraper_2016 import Peru2016LGBTScraper
-from .periods.scraper_2011 import Peru2011LGBTScraper
-from .periods.scraper_2006 import Peru2006LGBTScraper
-from .periods.scraper_2001 import Peru2001LGBTScraper
-from .periods.scraper_2000 import Peru2000LGBTScraper
-from .periods.scraper_1995 import Peru1995LGBTScraper
+from .periods import PERIODS, load_scraper
+
+_SCRAPER_CLASSES = {class_name for _, class_name, _ in PERIODS.values()}
+_API_FUNCTIONS = {"iter_laws", "aiter_laws"}
+
+
+def __getattr__(name):
+    # Scraper classes are resolved lazily so importing the package stays cheap
+    if name in _SCRAPER_CLASSES:
+        from . import periods
+
+        return getattr(periods, name)
+    if name in _API_FUNCTIONS:
+        from . import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
+    "PERIODS",
+    "load_scraper",
+    "iter_laws",
+    "aiter_laws",
     "Peru2021LGBTScraper",
     "Peru2016LGBTScraper",
     "Peru2011LGBTScraper",
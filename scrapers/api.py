@@ -0,0 +1,156 @@
+"""
+Library API for Peru LGBT law scrapers
+
+iter_laws() runs the period scrapers in a background thread and yields
+each law as a standard record dict as soon as it is parsed, so a caller
+can start processing before the run finishes:
+
+    from scrapers import iter_laws
+
+    for law in iter_laws(periods=["2021", "2016"], terms=["unión civil"]):
+        index(law)
+
+Records pass through a bounded queue: when the consumer falls behind,
+the scraper blocks on its next record instead of buffering the period in
+memory. Nothing is written to data/exports/ unless export=True, in which
+case the usual files are written as well (the exporter then being one
+more consumer of the same records).
+
+aiter_laws() is the same stream as an async iterator.
+"""
+
+import asyncio
+import queue
+import threading
+
+from .periods import PERIODS, load_scraper
+
+DEFAULT_QUEUE_SIZE = 100
+
+# How often a blocked producer checks whether the consumer went away
+_PUT_TIMEOUT = 0.2
+
+_DONE = object()
+
+
+class ScrapeCancelled(BaseException):
+    """
+    Raised inside the scraper thread once the consumer has stopped reading.
+    A BaseException so the scrapers' per-document `except Exception`
+    handlers do not swallow it and carry on scraping.
+    """
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def _run_scrapers(periods, terms, export, offer):
+    from .utils.record import as_dict
+
+    def sink(record):
+        if not offer(as_dict(record)):
+            raise ScrapeCancelled()
+
+    for period in periods:
+        scraper = load_scraper(period)()
+        if terms is not None:
+            scraper.search_terms = list(terms)
+        scraper.export_results = export
+        scraper.add_sink(sink)
+        scraper.run()
+        if scraper.run_error is not None:
+            # run() only logs it; the consumer must not mistake it for the end
+            raise scraper.run_error
+
+
+def _start_scrapers(periods, terms, export, queue_size):
+    """Start the scraper thread; returns its record queue and the event stopping it"""
+    periods = list(periods or PERIODS)
+    for period in periods:
+        if period not in PERIODS:
+            raise KeyError(f"Unknown period: {period}")
+
+    records = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def offer(item):
+        """Put an item on the queue, returning False once the consumer is gone"""
+        while not stop.is_set():
+            try:
+                records.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            _run_scrapers(periods, terms, export, offer)
+        except ScrapeCancelled:
+            return
+        except BaseException as e:
+            offer(_Failure(e))
+            return
+        offer(_DONE)
+
+    thread = threading.Thread(target=produce, name="iter-laws", daemon=True)
+    thread.start()
+    return records, stop
+
+
+def _consume(records, stop):
+    """Yield the queued records until the scrapers finish or `stop` is set"""
+    try:
+        while not stop.is_set():
+            try:
+                item = records.get(timeout=_PUT_TIMEOUT)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+def iter_laws(periods=None, terms=None, export=False, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Yield law records (dicts in the standard field order) as they are scraped.
+
+    `periods` defaults to every period, newest first; `terms` defaults to
+    each scraper's full search term list. Errors raised by a scraper are
+    re-raised here after the records before them have been yielded.
+    Closing the generator early stops the scrape at its next record.
+    """
+    yield from _consume(*_start_scrapers(periods, terms, export, queue_size))
+
+
+async def aiter_laws(periods=None, terms=None, export=False, queue_size=DEFAULT_QUEUE_SIZE):
+    """Async iterator over the same records as iter_laws()"""
+    loop = asyncio.get_running_loop()
+    records, stop = _start_scrapers(periods, terms, export, queue_size)
+    laws = _consume(records, stop)
+    pending = None
+    try:
+        while True:
+            pending = loop.run_in_executor(None, next, laws, _DONE)
+            # Shielded so a cancelled caller leaves the executor future running
+            law = await asyncio.shield(pending)
+            pending = None
+            if law is _DONE:
+                return
+            yield law
+    finally:
+        stop.set()
+        if pending is not None:
+            # Cancelled while the executor was inside next(laws): the stop
+            # event makes it return, and the generator can only be closed then
+            try:
+                await pending
+            except Exception:
+                pass
+        laws.close()
@@ -2,31 +2,75 @@
 Base scraper class with shared functionality for Peru LGBT law scrapers
 """
 
-import requests
 import time
 import re
+from contextlib import contextmanager
 from datetime import datetime
-from fake_useragent import UserAgent
+from bs4 import BeautifulSoup
 from .utils.search_terms import LGBT_SEARCH_TERMS
 from .utils.export import DataExporter
+from .utils.fetch import Fetcher, is_transient_status
+from .utils.endpoints import api_base_url, legacy_base_url, politeness
+from .utils.http import create_session
+from .utils.logs import Progress, period_logger
+from .utils.metrics import RunMetrics
+from .utils.store import document_key
+from .utils.user_agents import random_user_agent
 
 
 class BaseLGBTScraper:
     """Base class for Peru LGBT law scrapers with shared functionality"""
 
     def __init__(self, period_name):
-        self.session = requests.Session()
-        self.ua = UserAgent()
+        # Sessions keep their own headers but share one keep-alive pool
+        self.session = create_session()
+        self.fetcher = Fetcher(self.session)
         self.period_name = period_name
+        self.log = period_logger(period_name)
+        self.progress = None
+        self._terms_done = 0
+        # Request, parse and export counters written as the run report
+        self.metrics = RunMetrics(period_name)
+        self.fetcher.metrics = self.metrics
+        self.write_prometheus = False
+        self._seen_keys = set()
+        # RunProfiler when the run is profiled (--profile)
+        self.profiler = None
+        # Congress hosts, overridable to point at a local stand-in server
+        self.legacy_base_url = legacy_base_url()
+        self.api_base_url = api_base_url()
+        self.politeness = politeness()
+        # BeautifulSoup tree builder used for every page
+        self.html_parser = "html.parser"
         self.search_terms = LGBT_SEARCH_TERMS
         self.results = []
+        self.result_count = 0
+        # In streaming mode records go straight to a JSONL file instead of
+        # accumulating in self.results
+        self.streaming = False
+        self._stream = None
+        # Callables receiving every record as it is parsed; the file exports
+        # are written only when export_results is set
+        self.sinks = []
+        self.export_results = True
+        # Items whose fetch failed after retries, re-run once at the end
+        self.retry_queue = []
+        self.failed_items = []
+        self._draining_retries = False
+        # Error that ended run() early (run() logs it instead of raising)
+        self.run_error = None
+        # Search terms an interrupted search did not complete
+        self.incomplete_terms = []
+        # WorkQueue when documents are handed to distributed workers
+        # instead of being fetched here
+        self.work_queue = None
         self.exporter = DataExporter()
         self.setup_session()
 
     def setup_session(self):
         """Setup HTTP session with appropriate headers"""
         headers = {
-            "User-Agent": self.ua.random,
+            "User-Agent": random_user_agent(),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
             "Accept-Encoding": "gzip, deflate, br",
@@ -60,6 +104,25 @@ class BaseLGBTScraper:
 
         return "N/A"
 
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the run, attributing profiler samples to it"""
+        with self.metrics.timer("stage_seconds", stage=name):
+            if self.profiler is None:
+                yield
+                return
+            with self.profiler.stage(name):
+                yield
+
+    def parse_html(self, markup):
+        """Build the soup for a page, timing it as the parse stage"""
+        with self.stage("parse"):
+            return BeautifulSoup(markup, self.html_parser)
+
+    def find_terms(self, page_text):
+        """Return the search terms that appear in a page's lowercased text"""
+        return [term for term in self.search_terms if term.lower() in page_text]
+
     def extract_snippet(self, text, terms, max_length=200):
         """Extract relevant text snippet around found terms"""
         for term in terms:
@@ -71,9 +134,204 @@ class BaseLGBTScraper:
                 return snippet[:max_length] if len(snippet) > max_length else snippet
         return text[:max_length]
 
+    def pause(self, seconds):
+        """Wait between requests to be respectful, scaled by the politeness factor"""
+        if self.politeness > 0:
+            time.sleep(seconds * self.politeness)
+
+    def open_archive(self):
+        """Keep every raw page fetched for this period in data/archive/"""
+        from .utils.archive import PageArchive
+
+        if self.fetcher.archive is None:
+            archive_dir = self.exporter.output_dir.parent / "archive"
+            self.fetcher.archive = PageArchive(archive_dir, self.period_name)
+        return self.fetcher.archive
+
+    def start_progress(self, total_terms):
+        """Start the progress display for a pass over `total_terms` search terms"""
+        self.progress = Progress(self.log, total_terms)
+        self._terms_done = 0
+
+    def advance_progress(self):
+        """Mark one search term as done"""
+        self._terms_done += 1
+        if self.progress is not None:
+            self.progress.update(self._terms_done, self.result_count)
+
+    def finish_progress(self):
+        if self.progress is not None:
+            self.progress.update(self._terms_done, self.result_count, final=True)
+            self.progress = None
+
+    def open_replay(self):
+        """Answer every request from data/archive/ instead of the network"""
+        from .utils.archive import PageArchive, ReplayAdapter
+
+        archive_dir = self.exporter.output_dir.parent / "archive"
+        if not (archive_dir / "pages.sqlite").exists():
+            raise FileNotFoundError(f"No page archive in {archive_dir}; record one with --archive")
+        adapter = ReplayAdapter(PageArchive(archive_dir, self.period_name))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Nothing to be polite to, and no slow responses worth hedging
+        self.politeness = 0
+        self.fetcher.hedge_after = None
+        return adapter
+
+    def enable_profiling(self):
+        """Profile the rest of the run; results are saved with the exports"""
+        from .utils.profiling import RunProfiler
+
+        self.profiler = RunProfiler(self.period_name)
+        self.profiler.start()
+        return self.profiler
+
+    def process_links(self, items, search_term, process, delay, key=None):
+        """
+        Run `process(item, search_term)` for every document found by a search,
+        pausing `delay` seconds between them. Returns how many succeeded.
+
+        With a work queue attached the documents are enqueued for the
+        workers instead, deduplicated by `key(item)` (the link's document
+        key by default), and the number of new tasks is returned.
+        """
+        if self.work_queue is not None:
+            key = key or (lambda item: document_key({"url": item["url"]}))
+            queued = 0
+            for item in items:
+                payload = {"method": process.__name__, "item": item, "term": search_term}
+                if self.work_queue.enqueue("document", self.period_name, key(item), payload):
+                    queued += 1
+            self.metrics.incr("documents_enqueued", queued)
+            return queued
+
+        processed = 0
+        for item in items:
+            if process(item, search_term):
+                processed += 1
+            self.pause(delay)
+        return processed
+
+    def add_sink(self, sink):
+        """Send every record to `sink(record)` as soon as it is parsed"""
+        self.sinks.append(sink)
+
+    def add_result(self, result):
+        """Record a scraped law, streaming it to disk when streaming is enabled"""
+        self.result_count += 1
+        self.count_result(result)
+        if self.progress is not None:
+            self.progress.update(self._terms_done, self.result_count)
+        for sink in self.sinks:
+            sink(result)
+        if self.exporter.store is not None:
+            self.exporter.store.add(result, self.period_name)
+
+        if not self.export_results:
+            return
+        if not self.streaming:
+            self.results.append(result)
+            return
+
+        if self._stream is None:
+            self._stream = self.exporter.open_stream(self.period_name)
+        self._stream.write(result)
+
+    def count_result(self, result):
+        """Count a record written, whether the store drops it as a repeat, and missing fields"""
+        self.metrics.incr("records_written")
+        if self.exporter.store is not None:
+            # Found again under another search term: the store upserts it onto
+            # the document already stored, so it never reaches the views. The
+            # file exports without a store keep every record.
+            key = document_key(result)
+            if key in self._seen_keys:
+                self.metrics.incr("duplicates_skipped")
+            self._seen_keys.add(key)
+
+        for name in ("title", "law_number", "date", "status"):
+            if result.get(name) in (None, "", "N/A"):
+                self.metrics.incr("extraction_misses", field=name)
+
+    def defer(self, func, *args):
+        """Queue a failed search or document to be retried at the end of the run"""
+        self.metrics.incr("deferred", item=func.__name__)
+        if self._draining_retries:
+            # Already the final attempt: record it as permanently failed
+            self.failed_items.append((func.__name__, args))
+            return
+        self.retry_queue.append((func, args))
+
+    def defer_http_error(self, status, func, *args):
+        """
+        Defer an item whose request answered with an HTTP error, unless the
+        error is permanent (404, 410...): a dead link is not retried
+        """
+        if is_transient_status(status):
+            self.defer(func, *args)
+        else:
+            self.metrics.incr("permanent_errors", item=func.__name__, status=str(status))
+
+    def drain_retry_queue(self):
+        """Retry every deferred item once, after the main pass has finished"""
+        if not self.retry_queue:
+            return
+
+        queue, self.retry_queue = self.retry_queue, []
+        self.log.info("Retrying %d failed item(s)...", len(queue))
+
+        self._draining_retries = True
+        try:
+            for func, args in queue:
+                func(*args)
+        finally:
+            self._draining_retries = False
+
+        if self.failed_items:
+            self.log.warning("%d item(s) still failed after retrying", len(self.failed_items))
+            self.metrics.incr("failed_items", len(self.failed_items))
+
+    def run_is_complete(self):
+        """
+        Whether this run searched every term and fetched every document it
+        found, so a bill it did not find is really gone from the listings
+        """
+        return (
+            set(LGBT_SEARCH_TERMS) <= set(self.search_terms)
+            and not self.incomplete_terms
+            and not self.failed_items
+            and self.run_error is None
+        )
+
     def save_results(self):
         """Save results using the shared exporter"""
-        self.exporter.save_results(self.results, self.period_name)
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self.fetcher.archive is not None:
+            self.fetcher.archive.close()
+            self.fetcher.archive = None
+        if not self.export_results:
+            if self.exporter.store is not None:
+                self.exporter.store.flush()
+            return
+
+        # A partial run only reports the bills it found as new or changed
+        complete = self.run_is_complete()
+        with self.stage("export"):
+            if self.exporter.store is not None:
+                # Views exported from the store are deduplicated by document
+                self.exporter.save_results_from_store(self.period_name, complete=complete)
+            elif self.streaming:
+                self.exporter.save_results_from_stream(self.period_name, complete=complete)
+            else:
+                self.exporter.save_results(self.results, self.period_name, complete=complete)
+
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.exporter.save_profile(self.profiler)
+        self.exporter.save_run_report(self.metrics, prometheus=self.write_prometheus)
 
     def run(self):
         """Main execution method - should be implemented by subclasses"""
@@ -0,0 +1,497 @@
+"""
+Local stand-in for the Congress Domino and spley endpoints
+
+Serves the routes the scrapers use so they can be load-tested and
+benchmarked without touching congreso.gob.pe:
+
+- GET  /Sicr/TraDocEstProc/CLProLey{year}.nsf/debusqueda[2]?SearchView&Query=...
+- GET  /Sicr/TraDocEstProc/CLProLey{year}.nsf/{view}/{unid}?OpenDocument
+- POST /spley-portal-service/proyecto-ley/lista-con-filtro
+- GET  /spley-portal-service/expediente/{perParId}/{pleyNum}
+
+Responses come from the raw page archive (--archive runs) when a page was
+recorded there, and are otherwise synthesized from the JSON exports.
+Latency, error rate and rate limiting are configurable. Point the
+scrapers at it with CONGRESO_BASE_URL (or main.py --base-url), e.g.:
+
+    uv run python -m scrapers.mock_server --port 8080 --latency-ms 80 --error-rate 0.02
+    uv run python main.py --all --base-url http://127.0.0.1:8080 --politeness 0
+
+Fixtures are read from data/exports/; main.py --base-url runs write their
+exports to data/mock/exports/ so they never overwrite them.
+"""
+
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from .utils.endpoints import API_BASE_URL, LEGACY_BASE_URL
+from .utils.export import DataExporter
+from .utils.merge import iter_period_records
+from .utils.store import document_key
+
+DOMINO_PERIODS = ["1995", "2000", "2001", "2006", "2011", "2016"]
+
+_NSF_RE = re.compile(r"^/Sicr/TraDocEstProc/CLProLey(\d{4})\.nsf/([^/?]+)(?:/([^/?]+))?$")
+_EXPEDIENTE_RE = re.compile(r"^/spley-portal-service/expediente/(\d+)/(\d+)$")
+_SEARCH_PATH = "/spley-portal-service/proyecto-ley/lista-con-filtro"
+
+
+class MockConfig:
+    """Fault and latency injection settings"""
+
+    def __init__(
+        self,
+        latency_ms=0.0,
+        jitter_ms=0.0,
+        tail_rate=0.0,
+        tail_latency_ms=0.0,
+        error_rate=0.0,
+        rate_limit=0.0,
+        seed=None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # A fraction of requests stalls for much longer, like the real
+        # Domino host's latency tail
+        self.tail_rate = tail_rate
+        self.tail_latency_ms = tail_latency_ms
+        self.error_rate = error_rate
+        # Requests per second before answering 429 (0 = unlimited)
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+
+    def delay(self):
+        delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        if self.tail_rate and self.random.random() < self.tail_rate:
+            delay += self.tail_latency_ms
+        return max(0.0, delay) / 1000
+
+    def should_fail(self):
+        return bool(self.error_rate) and self.random.random() < self.error_rate
+
+
+class TokenBucket:
+    """Per-server request rate limit"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+def _matches(record, term):
+    term = term.lower()
+    if record.get("search_term_used", "").lower() == term:
+        return True
+    if term in (found.lower() for found in record.get("found_terms") or []):
+        return True
+    text = f"{record.get('title', '')} {record.get('summary', '')}".lower()
+    return term in text
+
+
+def _presented_within(record, date_from, date_to):
+    """Apply the fecPresentacionDesde/Hasta filter (ISO dates compare as strings)"""
+    presented = (record.get("date") or "")[:10]
+    if date_from and presented < date_from:
+        return False
+    if date_to and presented > date_to:
+        return False
+    return True
+
+
+def _authors_text(authors):
+    if isinstance(authors, list):
+        return ", ".join(
+            author.get("name", "") if isinstance(author, dict) else str(author)
+            for author in authors
+        )
+    return authors or ""
+
+
+class ExportFixtures:
+    """Responses synthesized from the JSON exports, one document per bill"""
+
+    def __init__(self, exporter=None):
+        exporter = exporter or DataExporter()
+        # year -> {document unid: record}, plus (perParId, pleyNum) -> record
+        self.domino = {}
+        self.spley = {}
+
+        for period_name in DOMINO_PERIODS:
+            documents = {}
+            for record in iter_period_records(exporter, period_name):
+                key = document_key(record)
+                if re.fullmatch(r"[0-9a-f]{32}", key):
+                    documents.setdefault(key, record)
+            self.domino[period_name] = documents
+
+        for record in iter_period_records(exporter, "2021"):
+            per_par_id, _, pley_num = document_key(record).partition("/")
+            if pley_num:
+                self.spley.setdefault((per_par_id, pley_num), record)
+
+    def domino_search(self, year, database, query):
+        term = query.get("Query", [""])[0]
+        limit = int(query.get("SearchMax", query.get("Count", ["100"]))[0])
+        hits = [
+            (unid, record)
+            for unid, record in self.domino.get(year, {}).items()
+            if _matches(record, term)
+        ][:limit]
+
+        rows = []
+        for unid, record in hits:
+            view = urlsplit(record["url"]).path.split("/")[-2]
+            href = (
+                f"/Sicr/TraDocEstProc/CLProLey{year}.nsf/{view}/{unid}"
+                f"?OpenDocument&Highlight=0,{quote(term)}"
+            )
+            rows.append(
+                f'<tr><td><a href="{href}">{html.escape(record.get("law_number", ""))}</a></td>'
+                f"<td>{html.escape(record.get('title', ''))}</td></tr>"
+            )
+
+        body = (
+            f"<html><head><title>{database}</title></head><body>\n"
+            f"<h2>Resultados de la búsqueda: {html.escape(term)}</h2>\n"
+            "<table>\n" + "\n".join(rows) + "\n</table>\n</body></html>"
+        )
+        return 200, "text/html; charset=utf-8", body.encode("utf-8")
+
+    def domino_document(self, year, unid):
+        record = self.domino.get(year, {}).get(unid.lower())
+        if record is None:
+            return None
+
+        committees = ", ".join(record.get("committees") or [])
+        authors = _authors_text(record.get("authors"))
+        hidden = {
+            "TitIni": record.get("title", ""),
+            "CodIni_web": record.get("law_number", ""),
+            "FecPres": record.get("date", ""),
+            "CodUltEsta": record.get("status", ""),
+            "DesPropo": record.get("proponent", ""),
+            "DesPerio": record.get("period", ""),
+            "DesLegis": record.get("legislature", ""),
+            "SumIni": record.get("summary", ""),
+            "NomCongre": authors,
+            "DesComi": committees,
+        }
+        inputs = "\n".join(
+            f'<input type="hidden" name="{name}" value="{html.escape(str(value))}">'
+            for name, value in hidden.items()
+        )
+        labels = [
+            ("Período:", record.get("period", "")),
+            ("Legislatura:", record.get("legislature", "")),
+            ("Número:", record.get("law_number", "")),
+            ("Fecha Presentación:", record.get("date", "")),
+            ("Proponente:", record.get("proponent", "")),
+            ("Título:", record.get("title", "")),
+            ("Sumilla:", record.get("summary", "")),
+            ("Autores:", authors),
+            ("Comisiones:", committees),
+            ("Seguimiento:", f"{record.get('status', '')} Decretado a... {committees}"),
+        ]
+        rows = "\n".join(
+            f"<tr><td>{label}</td><td>{html.escape(str(value))}</td></tr>"
+            for label, value in labels
+        )
+        # The 2016 layout lists authors on the line after the group
+        rows += f"\n<tr><td>Grupo Parlamentario:</td></tr>\n<tr><td>{html.escape(authors)}</td></tr>"
+        body = (
+            f"<html><head><title>{html.escape(record.get('law_number', ''))}</title></head>\n"
+            f'<body><form method="post">\n{inputs}\n<table>\n{rows}\n</table>\n'
+            f"<p>Objeto del Proyecto de Ley:\n{html.escape(record.get('summary', ''))}</p>\n"
+            f"<p>{html.escape(record.get('content_snippet', ''))}</p>\n"
+            "</form></body></html>"
+        )
+        return 200, "text/html; charset=iso-8859-1", body.encode("iso-8859-1", "replace")
+
+    def spley_search(self, payload):
+        term = payload.get("palabras") or ""
+        start = payload.get("rowStart") or 0
+        size = payload.get("pageSize") or 50
+        date_from = payload.get("fecPresentacionDesde")
+        date_to = payload.get("fecPresentacionHasta")
+        hits = [
+            record
+            for record in self.spley.values()
+            if _matches(record, term) and _presented_within(record, date_from, date_to)
+        ]
+
+        projects = []
+        for record in hits[start : start + size]:
+            per_par_id, _, pley_num = document_key(record).partition("/")
+            projects.append(
+                {
+                    "perParId": int(per_par_id),
+                    "pleyNum": int(pley_num),
+                    "proyectoLey": record.get("law_number"),
+                    "titulo": record.get("title"),
+                    "fecPresentacion": record.get("date"),
+                    "desEstado": record.get("status"),
+                    "autores": record.get("authors"),
+                    "desProponente": record.get("proponent"),
+                }
+            )
+
+        data = {
+            "code": 200,
+            "status": "success",
+            "data": {"proyectos": projects, "rowsTotal": len(hits)},
+        }
+        return 200, "application/json", json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def spley_detail(self, per_par_id, pley_num):
+        record = self.spley.get((per_par_id, pley_num))
+        if record is None:
+            return None
+        data = {
+            "code": 200,
+            "status": "success",
+            "data": {
+                "general": {
+                    "sumilla": record.get("summary"),
+                    "desPerParAbrev": record.get("period"),
+                    "desLegis": record.get("legislature"),
+                },
+                "comisiones": [{"nombre": name} for name in record.get("committees") or []],
+            },
+        }
+        return 200, "application/json", json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class ArchiveFixtures:
+    """Recorded responses from the raw page archive, looked up by request"""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.lock = threading.Lock()
+
+    def lookup(self, method, path, body):
+        host = API_BASE_URL if path.startswith("/spley-portal") else LEGACY_BASE_URL
+        with self.lock:
+            page = self.archive.lookup(method, host + path, body)
+            if page is None:
+                return None
+            return page["status"], page["content_type"], self.archive.read(page["hash"])
+
+
+class MockCongressServer:
+    """ThreadingHTTPServer answering the Congress routes from fixtures"""
+
+    def __init__(self, fixtures=None, archive=None, config=None, host="127.0.0.1", port=0):
+        self.fixtures = fixtures or ExportFixtures()
+        self.recorded = ArchiveFixtures(archive) if archive is not None else None
+        self.config = config or MockConfig()
+        self.bucket = TokenBucket(self.config.rate_limit) if self.config.rate_limit else None
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread and return the base URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count(self, outcome, amount=1):
+        with self._stats_lock:
+            self.stats[outcome] += amount
+
+    def respond(self, method, raw_path, body):
+        """Return (status, content type, body bytes, extra headers) for a request"""
+        if raw_path == "/__stats":
+            with self._stats_lock:
+                stats = dict(self.stats)
+            return 200, "application/json", json.dumps(stats).encode("utf-8"), {}
+
+        time.sleep(self.config.delay())
+        self.count("requests")
+
+        if self.bucket is not None and not self.bucket.take():
+            self.count("429")
+            return 429, "text/plain", b"Too Many Requests", {"Retry-After": "1"}
+        if self.config.should_fail():
+            self.count("500")
+            return 500, "text/plain", b"Internal Server Error", {}
+
+        response = None
+        if self.recorded is not None:
+            response = self.recorded.lookup(method, raw_path, body)
+            if response is not None:
+                self.count("archive")
+        if response is None:
+            response = self._synthesize(method, raw_path, body)
+            if response is not None:
+                self.count("synthesized")
+        if response is None:
+            self.count("404")
+            return 404, "text/plain", b"Not Found", {}
+
+        status, content_type, content = response
+        content = self._rewrite_links(content)
+        self.count("bytes", len(content))
+        return status, content_type, content, {}
+
+    def _synthesize(self, method, raw_path, body):
+        parts = urlsplit(raw_path)
+        query = parse_qs(parts.query, keep_blank_values=True)
+
+        if method == "POST" and parts.path == _SEARCH_PATH:
+            return self.fixtures.spley_search(json.loads(body or b"{}"))
+
+        match = _EXPEDIENTE_RE.match(parts.path)
+        if method == "GET" and match:
+            return self.fixtures.spley_detail(*match.groups())
+
+        match = _NSF_RE.match(parts.path)
+        if method == "GET" and match:
+            year, database, unid = match.groups()
+            if "SearchView" in query:
+                return self.fixtures.domino_search(year, database, query)
+            if unid and "OpenDocument" in query:
+                return self.fixtures.domino_document(year, unid)
+
+        return None
+
+    def _rewrite_links(self, content):
+        # Recorded pages link to the real hosts; keep the scrapers on the mock
+        for host in (LEGACY_BASE_URL, API_BASE_URL):
+            content = content.replace(host.encode(), self.base_url.encode())
+        return content
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffer the response so headers and body leave in one write,
+            # and never hold small segments back: on keep-alive connections
+            # separate writes hit Nagle / delayed-ACK stalls (~40 ms each)
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _serve(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                status, content_type, content, headers = server.respond(
+                    method, self.path, body
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve recorded/synthesized Congress pages for load tests"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter")
+    parser.add_argument(
+        "--tail-rate", type=float, default=0.0, help="Fraction of requests that stall"
+    )
+    parser.add_argument(
+        "--tail-latency-ms", type=float, default=0.0, help="Extra latency for stalled requests"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests answered 500"
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Requests/s before answering 429"
+    )
+    parser.add_argument(
+        "--no-archive", action="store_true", help="Only serve pages synthesized from exports"
+    )
+    parser.add_argument("--seed", type=int, help="Seed for latency and error injection")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tail_rate=args.tail_rate,
+        tail_latency_ms=args.tail_latency_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+
+    exporter = DataExporter()
+    archive = None
+    archive_dir = exporter.output_dir.parent / "archive"
+    if not args.no_archive and (archive_dir / "pages.sqlite").exists():
+        from .utils.archive import PageArchive
+
+        archive = PageArchive(archive_dir, "mock")
+
+    server = MockCongressServer(
+        ExportFixtures(exporter), archive, config, host=args.host, port=args.port
+    )
+    print(f"🧪 Mock Congress server on {server.base_url}")
+    print(f"   Scrape it with: main.py --base-url {server.base_url} --politeness 0")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed: {dict(server.stats)}")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
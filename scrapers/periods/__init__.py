@@ -9,17 +9,53 @@ Each scraper covers a specific legislative period:
 - 2001-2006: Web scraper for 2001-2006 period
 - 2000-2001: Web scraper for 2000-2001 period
 - 1995-2000: Web scraper for 1995-2000 period
+
+Scraper modules are imported lazily: a module (and its parsing
+dependencies) is only loaded when its period is actually selected.
 """
 
-from .scraper_2021 import Peru2021LGBTScraper
-from .scraper_2016 import Peru2016LGBTScraper
-from .scraper_2011 import Peru2011LGBTScraper
-from .scraper_2006 import Peru2006LGBTScraper
-from .scraper_2001 import Peru2001LGBTScraper
-from .scraper_2000 import Peru2000LGBTScraper
-from .scraper_1995 import Peru1995LGBTScraper
+import importlib
+
+# period -> (module name, class name, display name)
+PERIODS = {
+    "2021": ("scraper_2021", "Peru2021LGBTScraper", "Current Period (2021+)"),
+    "2016": ("scraper_2016", "Peru2016LGBTScraper", "Historical 2016-2021"),
+    "2011": ("scraper_2011", "Peru2011LGBTScraper", "Historical 2011-2016"),
+    "2006": ("scraper_2006", "Peru2006LGBTScraper", "Historical 2006-2011"),
+    "2001": ("scraper_2001", "Peru2001LGBTScraper", "Historical 2001-2006"),
+    "2000": ("scraper_2000", "Peru2000LGBTScraper", "Historical 2000-2001"),
+    "1995": ("scraper_1995", "Peru1995LGBTScraper", "Historical 1995-2000"),
+}
+
+_CLASS_TO_PERIOD = {class_name: period for period, (_, class_name, _) in PERIODS.items()}
+
+
+def load_scraper(period):
+    """Import and return the scraper class for a period (e.g. "2016")"""
+    if period not in PERIODS:
+        raise KeyError(f"Unknown period: {period}")
+
+    module_name, class_name, _ = PERIODS[period]
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, class_name)
+
+
+def period_display_name(period):
+    """Return the human-readable name of a period"""
+    return PERIODS[period][2]
+
+
+def __getattr__(name):
+    # Keep `from scrapers.periods import Peru2016LGBTScraper` working
+    if name in _CLASS_TO_PERIOD:
+        return load_scraper(_CLASS_TO_PERIOD[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
+    "PERIODS",
+    "load_scraper",
+    "period_display_name",
     "Peru2021LGBTScraper",
     "Peru2016LGBTScraper",
     "Peru2011LGBTScraper",
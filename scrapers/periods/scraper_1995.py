@@ -1,10 +1,10 @@
 import requests
-import time
 from datetime import datetime
 from urllib.parse import urljoin, quote
-from bs4 import BeautifulSoup
 import re
 from ..base import BaseLGBTScraper
+from ..utils.logs import setup_logging
+from ..utils.record import LawRecord
 
 
 class Peru1995LGBTScraper(BaseLGBTScraper):
@@ -12,32 +12,38 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
         super().__init__("1995")
 
         # 1995 search URL - uses different endpoint
-        self.search_base_1995 = "https://www2.congreso.gob.pe/Sicr/TraDocEstProc/CLProLey1995.nsf/debusqueda"
+        self.search_base_1995 = f"{self.legacy_base_url}/Sicr/TraDocEstProc/CLProLey1995.nsf/debusqueda"
 
     def search_laws_1995(self, search_term, max_results=100):
         """Search for laws in 1995-2000 period using the legacy interface"""
-        print(f"Searching 1995-2000 period for: {search_term}")
+        self.log.debug(
+            "Searching 1995-2000 period for: %s", search_term, extra={"term": search_term}
+        )
 
         # Construct the search URL - 1995 uses Start/Count parameters
         encoded_term = quote(search_term)
         search_url = f"{self.search_base_1995}?SearchView&Query={encoded_term}&SearchOrder=4&Start=0&Count={max_results}"
 
         try:
-            response = self.session.get(search_url, timeout=15)
+            response = self.fetcher.get(search_url, endpoint="search", hedge=False)
 
             if response.status_code == 200:
                 return self.parse_search_results_1995(response, search_term, search_url)
             else:
-                print(f"  HTTP error {response.status_code}")
+                self.log.warning(
+                    "Search HTTP error %s", response.status_code, extra={"term": search_term}
+                )
+                self.defer(self.search_laws_1995, search_term, max_results)
                 return 0
 
         except Exception as e:
-            print(f"  Search failed: {e}")
+            self.log.warning("Search failed: %s", e, extra={"term": search_term})
+            self.defer(self.search_laws_1995, search_term, max_results)
             return 0
 
     def parse_search_results_1995(self, response, search_term, search_url):
         """Parse the search results page for 1995"""
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = self.parse_html(response.content)
 
         # Look for links with the 1995 pattern
         law_links = []
@@ -51,9 +57,9 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
                 # This is likely a law detail link
                 # Handle both relative and absolute URLs
                 if href.startswith("/"):
-                    full_url = f"https://www2.congreso.gob.pe{href}"
+                    full_url = f"{self.legacy_base_url}{href}"
                 elif not href.startswith("http"):
-                    full_url = f"https://www2.congreso.gob.pe/{href}"
+                    full_url = f"{self.legacy_base_url}/{href}"
                 else:
                     full_url = href
 
@@ -71,21 +77,17 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
                     }
                 )
 
-        print(f"  Found {len(law_links)} law detail links")
-
-        # Process each law link
-        processed = 0
-        for link_info in law_links:
-            if self.process_law_page_1995(link_info, search_term):
-                processed += 1
-            time.sleep(1.2)  # Be respectful with older servers
+        self.log.debug(
+            "Found %d law detail links", len(law_links), extra={"term": search_term}
+        )
 
-        return processed
+        # Process each law link, pausing to be respectful with older servers
+        return self.process_links(law_links, search_term, self.process_law_page_1995, 1.2)
 
     def process_law_page_1995(self, link_info, search_term):
         """Process individual law page from 1995"""
         try:
-            print(f"    Accessing URL: {link_info['url']}")
+            self.log.debug("Accessing URL: %s", link_info["url"])
 
             # Use curl-compatible headers
             headers = {
@@ -94,10 +96,17 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
                 "Accept-Encoding": "gzip, deflate, br",
             }
 
-            response = self.session.get(link_info["url"], timeout=15, headers=headers)
+            response = self.fetcher.get(
+                link_info["url"], endpoint="detail", headers=headers
+            )
 
             if response.status_code != 200:
-                print(f"    HTTP error {response.status_code}")
+                self.log.warning(
+                    "HTTP error %s", response.status_code, extra={"url": link_info["url"]}
+                )
+                self.defer_http_error(
+                    response.status_code, self.process_law_page_1995, link_info, search_term
+                )
                 return False
 
             # Handle encoding correctly - the server returns ISO-8859-1
@@ -105,74 +114,79 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
                 response.encoding = "iso-8859-1"
 
             # Fix malformed HTML before parsing
-            html_content = response.text
-            # Fix common HTML issues in 1995 pages
-            html_content = html_content.replace("</script", "</script>")
-            # Fix malformed attributes with mixed quotes and commas
-            html_content = re.sub(
-                r"width='([^']*)',\s*align=\"([^\"]*)\"",
-                r'width="\1" align="\2"',
-                html_content,
-            )
-            html_content = re.sub(
-                r"width=\"([^\"]*)\",\s*align=\"([^\"]*)\"",
-                r'width="\1" align="\2"',
-                html_content,
-            )
-            # Additional fixes for 1995-specific patterns
-            html_content = re.sub(
-                r"border='([^']*)',\s*cellpadding=\"([^\"]*)\"",
-                r'border="\1" cellpadding="\2"',
-                html_content,
-            )
-
-            soup = BeautifulSoup(html_content, "html.parser")
+            html_content = self._repair_html_1995(response.text)
+            soup = self.parse_html(html_content)
 
             page_text = soup.get_text().lower()
 
             # Check if any of our search terms appear in the page (for metadata)
-            found_terms = []
-            for term in self.search_terms:
-                if term.lower() in page_text:
-                    found_terms.append(term)
+            found_terms = self.find_terms(page_text)
 
             # Process the law - search already filtered relevant results
             # Extract law information
-            law_info = self.extract_law_info_1995(soup, link_info["url"])
-
-            result = {
-                "search_term_used": search_term,
-                "found_terms": found_terms,
-                "url": link_info["url"],
-                "title": law_info.get("title", link_info["title"]),
-                "law_number": law_info.get("law_number", "N/A"),
-                "date": law_info.get("date", "N/A"),
-                "status": law_info.get("status", "N/A"),
-                "summary": law_info.get("summary", ""),
-                "authors": law_info.get("authors", ""),
-                "proponent": law_info.get("proponent", ""),
-                "committees": law_info.get("committees", []),
-                "period": law_info.get("period", ""),
-                "legislature": law_info.get("legislature", ""),
-                "content_snippet": self.extract_snippet(
+            with self.stage("extract"):
+                law_info = self.extract_law_info_1995(soup, link_info["url"])
+
+            result = LawRecord(
+                search_term_used=search_term,
+                found_terms=found_terms,
+                url=link_info["url"],
+                title=law_info.get("title", link_info["title"]),
+                law_number=law_info.get("law_number", "N/A"),
+                date=law_info.get("date", "N/A"),
+                status=law_info.get("status", "N/A"),
+                summary=law_info.get("summary", ""),
+                authors=law_info.get("authors", ""),
+                proponent=law_info.get("proponent", ""),
+                committees=law_info.get("committees", []),
+                period=law_info.get("period", ""),
+                legislature=law_info.get("legislature", ""),
+                content_snippet=self.extract_snippet(
                     page_text, found_terms + [search_term]
                 ),
-                "year": "1995-2000",
-                "scraped_at": datetime.now().isoformat(),
-            }
+                year="1995-2000",
+                scraped_at=datetime.now().isoformat(),
+            )
 
-            self.results.append(result)
+            self.add_result(result)
 
-            print(
-                f"    ✓ {law_info.get('law_number', 'N/A')}: {law_info.get('title', link_info['title'])[:60]}..."
+            self.log.debug(
+                "✓ %s: %s...",
+                result.law_number,
+                result.title[:60],
+                extra={"url": result.url, "law_number": result.law_number},
             )
             return True
 
         except Exception as e:
-            print(f"    Error processing {link_info['url']}: {e}")
+            self.log.warning("Error processing %s: %s", link_info["url"], e)
+            self.defer(self.process_law_page_1995, link_info, search_term)
 
         return False
 
+    def _repair_html_1995(self, html_content):
+        """Fix the malformed markup of 1995 pages before parsing"""
+        # Fix common HTML issues in 1995 pages
+        html_content = html_content.replace("</script", "</script>")
+        # Fix malformed attributes with mixed quotes and commas
+        html_content = re.sub(
+            r"width='([^']*)',\s*align=\"([^\"]*)\"",
+            r'width="\1" align="\2"',
+            html_content,
+        )
+        html_content = re.sub(
+            r"width=\"([^\"]*)\",\s*align=\"([^\"]*)\"",
+            r'width="\1" align="\2"',
+            html_content,
+        )
+        # Additional fixes for 1995-specific patterns
+        html_content = re.sub(
+            r"border='([^']*)',\s*cellpadding=\"([^\"]*)\"",
+            r'border="\1" cellpadding="\2"',
+            html_content,
+        )
+        return html_content
+
     def extract_law_info_1995(self, soup, url):
         """Extract structured information from a 1995 law page"""
         info = {}
@@ -230,6 +244,7 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
 
         # Only use text parsing for fields not found in other methods
         if not info.get("title"):
+            self.metrics.incr("extraction_fallbacks", field="title")
             title_patterns = [
                 r"Título:\s*([^\n]+)",
                 r"LEY\s+[^.\n]+",
@@ -247,11 +262,13 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
                         break
 
         if not info.get("law_number"):
+            self.metrics.incr("extraction_fallbacks", field="law_number")
             law_match = re.search(r"(\d{4,5}/\d{4}-[A-Z]+)", text, re.IGNORECASE)
             if law_match:
                 info["law_number"] = law_match.group(1)
 
         if not info.get("status"):
+            self.metrics.incr("extraction_fallbacks", field="status")
             status_patterns = [
                 "Al Archivo",
                 "En comisión",
@@ -338,31 +355,35 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
                                         break
 
         except Exception as e:
-            print(f"    Table parsing failed: {e}")
+            self.log.warning("Table parsing failed: %s", e)
 
     def search_all_terms_1995(self):
         """Search all LGBT terms for 1995-2000 period"""
-        print("Starting LGBT rights law search for Peru Congress 1995-2000...")
-        print(f"Search terms: {len(self.search_terms)} terms")
-        print()
+        self.log.info(
+            "Starting LGBT rights law search for Peru Congress 1995-2000 (%d terms)",
+            len(self.search_terms),
+        )
+        self.start_progress(len(self.search_terms))
 
         total_found = 0
 
-        for i, term in enumerate(self.search_terms):
+        for index, term in enumerate(self.search_terms):
             try:
-                print(f"  Searching term {i + 1}/{len(self.search_terms)}: {term}")
                 found = self.search_laws_1995(term)
                 total_found += found
-                time.sleep(2)  # Be respectful between searches
+                self.advance_progress()
+                self.pause(2)  # Be respectful between searches
 
                 # Continue processing all results
 
             except KeyboardInterrupt:
-                print("\nSearch interrupted by user")
+                self.log.warning("Search interrupted by user")
+                self.incomplete_terms = self.search_terms[index:]
                 break
 
-        print(
-            f"\nSearch completed. Found {len(self.results)} LGBT-related laws from 1995-2000"
+        self.finish_progress()
+        self.log.info(
+            "Search completed. Found %d LGBT-related laws from 1995-2000", self.result_count
         )
         return total_found
 
@@ -370,12 +391,15 @@ class Peru1995LGBTScraper(BaseLGBTScraper):
         """Main execution method"""
         try:
             self.search_all_terms_1995()
+            self.drain_retry_queue()
         except Exception as e:
-            print(f"Search error: {e}")
+            self.log.error("Search error: %s", e)
+            self.run_error = e
         finally:
             self.save_results()
 
 
 if __name__ == "__main__":
+    setup_logging()
     scraper = Peru1995LGBTScraper()
     scraper.run()
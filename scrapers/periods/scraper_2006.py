@@ -1,10 +1,12 @@
-import requests
-import time
 from datetime import datetime
-from urllib.parse import urljoin, quote
-from bs4 import BeautifulSoup
+from urllib.parse import quote
 import re
+
+from bs4 import Comment, Doctype
+
 from ..base import BaseLGBTScraper
+from ..utils.logs import setup_logging
+from ..utils.record import LawRecord
 
 
 class Peru2006LGBTScraper(BaseLGBTScraper):
@@ -12,32 +14,38 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
         super().__init__("2006")
 
         # 2006 search URL - uses different endpoint than 2011/2016
-        self.search_base_2006 = "https://www2.congreso.gob.pe/Sicr/TraDocEstProc/CLProLey2006.nsf/debusqueda"
+        self.search_base_2006 = f"{self.legacy_base_url}/Sicr/TraDocEstProc/CLProLey2006.nsf/debusqueda"
 
     def search_laws_2006(self, search_term, max_results=100):
         """Search for laws in 2006-2011 period using the legacy interface"""
-        print(f"Searching 2006-2011 period for: {search_term}")
+        self.log.debug(
+            "Searching 2006-2011 period for: %s", search_term, extra={"term": search_term}
+        )
 
         # Construct the search URL
         encoded_term = quote(search_term)
         search_url = f"{self.search_base_2006}?SearchView&Query={encoded_term}&SearchOrder=4&SearchMax={max_results}"
 
         try:
-            response = self.session.get(search_url, timeout=15)
+            response = self.fetcher.get(search_url, endpoint="search", hedge=False)
 
             if response.status_code == 200:
                 return self.parse_search_results_2006(response, search_term, search_url)
             else:
-                print(f"  HTTP error {response.status_code}")
+                self.log.warning(
+                    "Search HTTP error %s", response.status_code, extra={"term": search_term}
+                )
+                self.defer(self.search_laws_2006, search_term, max_results)
                 return 0
 
         except Exception as e:
-            print(f"  Search failed: {e}")
+            self.log.warning("Search failed: %s", e, extra={"term": search_term})
+            self.defer(self.search_laws_2006, search_term, max_results)
             return 0
 
     def parse_search_results_2006(self, response, search_term, search_url):
         """Parse the search results page for 2006"""
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = self.parse_html(response.content)
 
         # Look for links with the 2006 pattern
         law_links = []
@@ -51,9 +59,9 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
                 # This is likely a law detail link
                 # Handle both relative and absolute URLs
                 if href.startswith("/"):
-                    full_url = f"https://www2.congreso.gob.pe{href}"
+                    full_url = f"{self.legacy_base_url}{href}"
                 elif not href.startswith("http"):
-                    full_url = f"https://www2.congreso.gob.pe/{href}"
+                    full_url = f"{self.legacy_base_url}/{href}"
                 else:
                     full_url = href
 
@@ -71,21 +79,17 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
                     }
                 )
 
-        print(f"  Found {len(law_links)} law detail links")
-
-        # Process each law link
-        processed = 0
-        for link_info in law_links:
-            if self.process_law_page_2006(link_info, search_term):
-                processed += 1
-            time.sleep(1.2)  # Be respectful with older servers
+        self.log.debug(
+            "Found %d law detail links", len(law_links), extra={"term": search_term}
+        )
 
-        return processed
+        # Process each law link, pausing to be respectful with older servers
+        return self.process_links(law_links, search_term, self.process_law_page_2006, 1.2)
 
     def process_law_page_2006(self, link_info, search_term):
         """Process individual law page from 2006"""
         try:
-            print(f"    Accessing URL: {link_info['url']}")
+            self.log.debug("Accessing URL: %s", link_info["url"])
 
             # Try to match curl's headers exactly
             headers = {
@@ -94,69 +98,114 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
                 "Accept-Encoding": "gzip, deflate, br",
             }
 
-            response = self.session.get(link_info["url"], timeout=15, headers=headers)
-            print(f"    Content-Length: {len(response.content)} bytes")
+            response = self.fetcher.get(
+                link_info["url"], endpoint="detail", headers=headers
+            )
+            self.log.debug("Content-Length: %d bytes", len(response.content))
 
             if response.status_code != 200:
-                print(f"    HTTP error {response.status_code}")
+                self.log.warning(
+                    "HTTP error %s", response.status_code, extra={"url": link_info["url"]}
+                )
+                self.defer_http_error(
+                    response.status_code, self.process_law_page_2006, link_info, search_term
+                )
                 return False
 
-            # Handle encoding correctly - the server returns ISO-8859-1
-            if "charset=iso-8859-1" in response.headers.get("content-type", "").lower():
-                response.encoding = "iso-8859-1"
+            soup = self._parse_page_2006(response)
 
-            # Fix malformed HTML before parsing
-            html_content = response.text
-            # Fix the malformed script tag that's breaking parsing
-            html_content = html_content.replace("</script", "</script>")
-
-            soup = BeautifulSoup(html_content, "html.parser")
+            # Some documents answer with a JavaScript stub that redirects the
+            # browser; race the alternative URL forms to get the real page
+            if self._is_javascript_redirect_page_2006(soup):
+                self.log.debug("JavaScript redirect page, trying alternative URLs")
+                soup = self._fetch_redirect_target_2006(link_info["url"], headers)
+                if soup is None:
+                    self.log.warning(
+                        "No alternative URL returned the document", extra={"url": link_info["url"]}
+                    )
+                    self.defer(self.process_law_page_2006, link_info, search_term)
+                    return False
 
             page_text = soup.get_text().lower()
 
             # Check if any of our search terms appear in the page (for metadata)
-            found_terms = []
-            for term in self.search_terms:
-                if term.lower() in page_text:
-                    found_terms.append(term)
+            found_terms = self.find_terms(page_text)
 
             # Process the law - search already filtered relevant results
             # Extract law information
-            law_info = self.extract_law_info_2006(soup, link_info["url"])
-
-            result = {
-                "search_term_used": search_term,
-                "found_terms": found_terms,
-                "url": link_info["url"],
-                "title": law_info.get("title", link_info["title"]),
-                "law_number": law_info.get("law_number", "N/A"),
-                "date": law_info.get("date", "N/A"),
-                "status": law_info.get("status", "N/A"),
-                "summary": law_info.get("summary", ""),
-                "authors": law_info.get("authors", ""),
-                "proponent": law_info.get("proponent", ""),
-                "committees": law_info.get("committees", []),
-                "period": law_info.get("period", ""),
-                "legislature": law_info.get("legislature", ""),
-                "content_snippet": self.extract_snippet(
+            with self.stage("extract"):
+                law_info = self.extract_law_info_2006(soup, link_info["url"])
+
+            result = LawRecord(
+                search_term_used=search_term,
+                found_terms=found_terms,
+                url=link_info["url"],
+                title=law_info.get("title", link_info["title"]),
+                law_number=law_info.get("law_number", "N/A"),
+                date=law_info.get("date", "N/A"),
+                status=law_info.get("status", "N/A"),
+                summary=law_info.get("summary", ""),
+                authors=law_info.get("authors", ""),
+                proponent=law_info.get("proponent", ""),
+                committees=law_info.get("committees", []),
+                period=law_info.get("period", ""),
+                legislature=law_info.get("legislature", ""),
+                content_snippet=self.extract_snippet(
                     page_text, found_terms + [search_term]
                 ),
-                "year": "2006-2011",
-                "scraped_at": datetime.now().isoformat(),
-            }
+                year="2006-2011",
+                scraped_at=datetime.now().isoformat(),
+            )
 
-            self.results.append(result)
+            self.add_result(result)
 
-            print(
-                f"    ✓ {law_info.get('law_number', 'N/A')}: {law_info.get('title', link_info['title'])[:60]}..."
+            self.log.debug(
+                "✓ %s: %s...",
+                result.law_number,
+                result.title[:60],
+                extra={"url": result.url, "law_number": result.law_number},
             )
             return True
 
         except Exception as e:
-            print(f"    Error processing {link_info['url']}: {e}")
+            self.log.warning("Error processing %s: %s", link_info["url"], e)
+            self.defer(self.process_law_page_2006, link_info, search_term)
 
         return False
 
+    def _parse_page_2006(self, response):
+        """Decode and repair a 2006 detail page, returning its soup"""
+        # Handle encoding correctly - the server returns ISO-8859-1
+        if "charset=iso-8859-1" in response.headers.get("content-type", "").lower():
+            response.encoding = "iso-8859-1"
+
+        return self.parse_html(self._repair_html_2006(response.text))
+
+    def _repair_html_2006(self, html_content):
+        """Fix the malformed markup of 2006 pages before parsing"""
+        # Fix the malformed script tag that's breaking parsing
+        return html_content.replace("</script", "</script>")
+
+    def _fetch_redirect_target_2006(self, original_url, headers):
+        """Race the alternative URLs of a redirect stub, returning the first real page"""
+
+        def accept(response):
+            if response.status_code != 200:
+                return None
+            soup = self._parse_page_2006(response)
+            # Another stub is not the document; anything else is
+            return None if self._is_javascript_redirect_page_2006(soup) else soup
+
+        url, _, soup = self.fetcher.race(
+            self._construct_full_url_2006(original_url),
+            accept,
+            endpoint="detail",
+            headers=headers,
+        )
+        if url:
+            self.log.debug("Resolved redirect via: %s", url)
+        return soup
+
     def extract_law_info_2006(self, soup, url):
         """Extract structured information from a 2006 law page"""
         info = {}
@@ -216,6 +265,7 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
 
         # Only use text parsing for fields not found in other methods
         if not info.get("title"):
+            self.metrics.incr("extraction_fallbacks", field="title")
             title_patterns = [
                 r"Título:\s*([^\n]+)",
                 r"LEY\s+[^.\n]+",
@@ -232,11 +282,13 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
                         break
 
         if not info.get("law_number"):
+            self.metrics.incr("extraction_fallbacks", field="law_number")
             law_match = re.search(r"(\d{4,5}/\d{4}-[A-Z]+)", text, re.IGNORECASE)
             if law_match:
                 info["law_number"] = law_match.group(1)
 
         if not info.get("status"):
+            self.metrics.incr("extraction_fallbacks", field="status")
             status_patterns = ["Al Archivo", "En comisión", "Presentado", "Aprobado"]
             for pattern in status_patterns:
                 if pattern.lower() in text.lower():
@@ -316,25 +368,28 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
                                         break
 
         except Exception as e:
-            print(f"    Table parsing failed: {e}")
+            self.log.warning("Table parsing failed: %s", e)
 
     def _is_javascript_redirect_page_2006(self, soup):
-        """Check if this is a JavaScript-based redirect page"""
-        # Look for signs of a minimal JavaScript page
-        scripts = soup.find_all("script")
-        forms = soup.find_all("form")
-        inputs = soup.find_all("input")
-
-        # If we have scripts but no hidden inputs, it's likely a redirect page
-        if len(scripts) > 0 and len(inputs) == 0:
-            return True
-
-        # Check if the body is very minimal
-        body_text = soup.get_text().strip()
-        if len(body_text) < 50:  # Very minimal content
-            return True
-
-        return False
+        """Check if this is the JavaScript stub that redirects to the real document"""
+        # The stub's script sends the browser on with location.href, usually
+        # to the &Click= form of the URL
+        redirects = any(
+            "location.href" in script.get_text() or "&Click=" in script.get_text()
+            for script in soup.find_all("script")
+        )
+        if not redirects:
+            return False
+
+        # ... and the stub has no content of its own besides the script
+        if soup.find(["input", "table"]) is not None:
+            return False
+        return not any(
+            text.strip()
+            for text in soup.find_all(string=True)
+            if text.parent.name not in ("script", "style")
+            and not isinstance(text, (Comment, Doctype))
+        )
 
     def _construct_full_url_2006(self, original_url):
         """Try to construct the full content URL from the original URL"""
@@ -360,31 +415,38 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
             base_url = original_url.split("?")[0]
             alternatives.append(f"{base_url}?OpenDocument")
 
-        return alternatives
+        # The forms can coincide (e.g. a URL without Highlight is already the
+        # plain OpenDocument one); race each distinct URL once, and not the
+        # original, which answered with the stub
+        return [url for url in dict.fromkeys(alternatives) if url != original_url]
 
     def search_all_terms_2006(self):
         """Search all LGBT terms for 2006-2011 period"""
-        print("Starting LGBT rights law search for Peru Congress 2006-2011...")
-        print(f"Search terms: {len(self.search_terms)} terms")
-        print()
+        self.log.info(
+            "Starting LGBT rights law search for Peru Congress 2006-2011 (%d terms)",
+            len(self.search_terms),
+        )
+        self.start_progress(len(self.search_terms))
 
         total_found = 0
 
-        for i, term in enumerate(self.search_terms):
+        for index, term in enumerate(self.search_terms):
             try:
-                print(f"  Searching term {i + 1}/{len(self.search_terms)}: {term}")
                 found = self.search_laws_2006(term)
                 total_found += found
-                time.sleep(2)  # Be respectful between searches
+                self.advance_progress()
+                self.pause(2)  # Be respectful between searches
 
                 # Continue processing all results
 
             except KeyboardInterrupt:
-                print("\nSearch interrupted by user")
+                self.log.warning("Search interrupted by user")
+                self.incomplete_terms = self.search_terms[index:]
                 break
 
-        print(
-            f"\nSearch completed. Found {len(self.results)} LGBT-related laws from 2006-2011"
+        self.finish_progress()
+        self.log.info(
+            "Search completed. Found %d LGBT-related laws from 2006-2011", self.result_count
         )
         return total_found
 
@@ -392,12 +454,15 @@ class Peru2006LGBTScraper(BaseLGBTScraper):
         """Main execution method"""
         try:
             self.search_all_terms_2006()
+            self.drain_retry_queue()
         except Exception as e:
-            print(f"Search error: {e}")
+            self.log.error("Search error: %s", e)
+            self.run_error = e
         finally:
             self.save_results()
 
 
 if __name__ == "__main__":
+    setup_logging()
     scraper = Peru2006LGBTScraper()
     scraper.run()
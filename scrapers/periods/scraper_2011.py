@@ -1,11 +1,11 @@
 from os import link
 import requests
-import time
 from datetime import datetime
 from urllib.parse import urljoin, quote
-from bs4 import BeautifulSoup
 import re
 from ..base import BaseLGBTScraper
+from ..utils.logs import setup_logging
+from ..utils.record import LawRecord
 
 
 class Peru2011LGBTScraper(BaseLGBTScraper):
@@ -13,32 +13,38 @@ class Peru2011LGBTScraper(BaseLGBTScraper):
         super().__init__("2011")
 
         # 2011 search URL
-        self.search_base_2011 = "https://www2.congreso.gob.pe/Sicr/TraDocEstProc/CLProLey2011.nsf/debusqueda2"
+        self.search_base_2011 = f"{self.legacy_base_url}/Sicr/TraDocEstProc/CLProLey2011.nsf/debusqueda2"
 
     def search_laws_2011(self, search_term, max_results=50):
         """Search for laws in 2011 using the historical interface"""
-        print(f"Searching 2011 period for: {search_term}")
+        self.log.debug(
+            "Searching 2011 period for: %s", search_term, extra={"term": search_term}
+        )
 
         # Construct the search URL
         encoded_term = quote(search_term)
         search_url = f"{self.search_base_2011}?SearchView&Query={encoded_term}&SearchOrder=4&SearchMax={max_results}"
 
         try:
-            response = self.session.get(search_url, timeout=15)
+            response = self.fetcher.get(search_url, endpoint="search", hedge=False)
 
             if response.status_code == 200:
                 return self.parse_search_results_2011(response, search_term, search_url)
             else:
-                print(f"  HTTP error {response.status_code}")
+                self.log.warning(
+                    "Search HTTP error %s", response.status_code, extra={"term": search_term}
+                )
+                self.defer(self.search_laws_2011, search_term, max_results)
                 return 0
 
         except Exception as e:
-            print(f"  Search failed: {e}")
+            self.log.warning("Search failed: %s", e, extra={"term": search_term})
+            self.defer(self.search_laws_2011, search_term, max_results)
             return 0
 
     def parse_search_results_2011(self, response, search_term, search_url):
         """Parse the search results page for 2011"""
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = self.parse_html(response.content)
 
         # Look for links with the 2011 pattern
         law_links = []
@@ -50,7 +56,7 @@ class Peru2011LGBTScraper(BaseLGBTScraper):
             href = link.get("href")
             if href and "opendocument" in href.lower() and "CLProLey2011.nsf" in href:
                 # This is likely a law detail link
-                full_url = urljoin("https://www2.congreso.gob.pe", href)
+                full_url = urljoin(self.legacy_base_url, href)
                 text = link.get_text().strip()
 
                 # Try to extract project number from the text or surrounding context
@@ -65,16 +71,12 @@ class Peru2011LGBTScraper(BaseLGBTScraper):
                     }
                 )
 
-        print(f"  Found {len(law_links)} law detail links")
-
-        # Process each law link
-        processed = 0
-        for link_info in law_links:
-            if self.process_law_page_2011(link_info, search_term):
-                processed += 1
-            time.sleep(1.0)  # Be respectful with older servers
+        self.log.debug(
+            "Found %d law detail links", len(law_links), extra={"term": search_term}
+        )
 
-        return processed
+        # Process each law link, pausing to be respectful with older servers
+        return self.process_links(law_links, search_term, self.process_law_page_2011, 1.0)
 
     def extract_project_number(self, text, link_element=None):
         """Extract project number from link text or surrounding context"""
@@ -105,56 +107,61 @@ class Peru2011LGBTScraper(BaseLGBTScraper):
     def process_law_page_2011(self, link_info, search_term):
         """Process individual law page from 2011"""
         try:
-            response = self.session.get(link_info["url"], timeout=15)
+            response = self.fetcher.get(link_info["url"], endpoint="detail")
 
             if response.status_code != 200:
+                self.defer_http_error(
+                    response.status_code, self.process_law_page_2011, link_info, search_term
+                )
                 return False
 
-            soup = BeautifulSoup(response.content, "html.parser")
+            soup = self.parse_html(response.content)
             page_text = soup.get_text().lower()
 
             # Check if any of our search terms appear in the page (for metadata)
-            found_terms = []
-            for term in self.search_terms:
-                if term.lower() in page_text:
-                    found_terms.append(term)
+            found_terms = self.find_terms(page_text)
 
             # Process the law - search already filtered relevant results
             # Extract law information
-            law_info = self.extract_law_info_2011(soup, link_info["url"])
-
-            result = {
-                "search_term_used": search_term,
-                "found_terms": found_terms,
-                "url": link_info["url"],
-                "title": law_info.get("title", link_info["title"]),
-                "law_number": law_info.get(
+            with self.stage("extract"):
+                law_info = self.extract_law_info_2011(soup, link_info["url"])
+
+            result = LawRecord(
+                search_term_used=search_term,
+                found_terms=found_terms,
+                url=link_info["url"],
+                title=law_info.get("title", link_info["title"]),
+                law_number=law_info.get(
                     "law_number", link_info.get("project_number", "N/A")
                 ),
-                "date": law_info.get("date", "N/A"),
-                "status": law_info.get("status", "N/A"),
-                "summary": law_info.get("summary", ""),
-                "authors": law_info.get("authors", ""),
-                "proponent": law_info.get("proponent", ""),
-                "committees": law_info.get("committees", []),
-                "period": law_info.get("period", ""),
-                "legislature": law_info.get("legislature", ""),
-                "content_snippet": self.extract_snippet(
+                date=law_info.get("date", "N/A"),
+                status=law_info.get("status", "N/A"),
+                summary=law_info.get("summary", ""),
+                authors=law_info.get("authors", ""),
+                proponent=law_info.get("proponent", ""),
+                committees=law_info.get("committees", []),
+                period=law_info.get("period", ""),
+                legislature=law_info.get("legislature", ""),
+                content_snippet=self.extract_snippet(
                     page_text, found_terms + [search_term]
                 ),
-                "year": "2011-2016",
-                "scraped_at": datetime.now().isoformat(),
-            }
+                year="2011-2016",
+                scraped_at=datetime.now().isoformat(),
+            )
 
-            self.results.append(result)
+            self.add_result(result)
 
-            print(
-                f"    ✓ {law_info.get('law_number', 'N/A')}: {law_info.get('title', link_info['title'])[:60]}..."
+            self.log.debug(
+                "✓ %s: %s...",
+                result.law_number,
+                result.title[:60],
+                extra={"url": result.url, "law_number": result.law_number},
             )
             return True
 
         except Exception as e:
-            print(f"    Error processing {link_info['url']}: {e}")
+            self.log.warning("Error processing %s: %s", link_info["url"], e)
+            self.defer(self.process_law_page_2011, link_info, search_term)
 
         return False
 
@@ -305,28 +312,29 @@ class Peru2011LGBTScraper(BaseLGBTScraper):
 
     def search_all_terms_2011(self):
         """Search all LGBT terms for 2011"""
-        print("Starting LGBT rights law search for Peru Congress 2011-2016...")
-        print(f"Search terms: {len(self.search_terms)} terms")
-        print()
+        self.log.info(
+            "Starting LGBT rights law search for Peru Congress 2011-2016 (%d terms)",
+            len(self.search_terms),
+        )
+        self.start_progress(len(self.search_terms))
 
         total_found = 0
 
-        for i, term in enumerate(self.search_terms):
+        for index, term in enumerate(self.search_terms):
             try:
                 found = self.search_laws_2011(term)
                 total_found += found
-                time.sleep(2)  # Be respectful between searches
-
-                # Progress indicator
-                if (i + 1) % 5 == 0:
-                    print(f"  Processed {i + 1}/{len(self.search_terms)} terms")
+                self.advance_progress()
+                self.pause(2)  # Be respectful between searches
 
             except KeyboardInterrupt:
-                print("\nSearch interrupted by user")
+                self.log.warning("Search interrupted by user")
+                self.incomplete_terms = self.search_terms[index:]
                 break
 
-        print(
-            f"\nSearch completed. Found {len(self.results)} LGBT-related laws from 2011-2016 period"
+        self.finish_progress()
+        self.log.info(
+            "Search completed. Found %d LGBT-related laws from 2011-2016 period", self.result_count
         )
         return total_found
 
@@ -334,12 +342,15 @@ class Peru2011LGBTScraper(BaseLGBTScraper):
         """Main execution method"""
         try:
             self.search_all_terms_2011()
+            self.drain_retry_queue()
         except Exception as e:
-            print(f"Search error: {e}")
+            self.log.error("Search error: %s", e)
+            self.run_error = e
         finally:
             self.save_results()
 
 
 if __name__ == "__main__":
+    setup_logging()
     scraper = Peru2011LGBTScraper()
     scraper.run()
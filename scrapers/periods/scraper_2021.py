@@ -1,8 +1,26 @@
 import json
 import time
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from ..base import BaseLGBTScraper
-import pandas as pd
+from ..utils.changes import fingerprint
+from ..utils.logs import setup_logging
+from ..utils.record import LawRecord
+from ..utils.store import document_key
+
+# Format of the fecPresentacionDesde/fecPresentacionHasta search filters
+API_DATE_FORMAT = "%Y-%m-%d"
+
+# Seconds between watch mode polls
+WATCH_INTERVAL = 900
+
+# Incremental runs and watch polls search bills presented since the
+# high-water mark (the latest presentation date seen), and at least this
+# many days back so state changes of recent bills are picked up
+LOOKBACK_DAYS = 30
+
+# Record fields the search listing already carries; a bill whose listing
+# fields are unchanged is not fetched again in watch mode
+LISTING_FIELDS = ["law_number", "title", "date", "status", "authors", "proponent"]
 
 
 class Peru2021LGBTScraper(BaseLGBTScraper):
@@ -10,10 +28,15 @@ class Peru2021LGBTScraper(BaseLGBTScraper):
         super().__init__("2021")
 
         # API endpoints discovered
-        self.search_api = "https://wb2server.congreso.gob.pe/spley-portal-service/proyecto-ley/lista-con-filtro"
-        self.detail_api = (
-            "https://wb2server.congreso.gob.pe/spley-portal-service/expediente"
-        )
+        self.search_api = f"{self.api_base_url}/spley-portal-service/proyecto-ley/lista-con-filtro"
+        self.detail_api = f"{self.api_base_url}/spley-portal-service/expediente"
+        # Document key -> listing fingerprint of every bill known in watch mode
+        self.listing_index = None
+        # Incremental mode: only search the window since the high-water mark
+        self.incremental = False
+        self.lookback_days = LOOKBACK_DAYS
+        self.high_water_mark = None
+        self.latest_presented = None
 
     def setup_session(self):
         """Override base setup for API-specific headers"""
@@ -22,17 +45,22 @@ class Peru2021LGBTScraper(BaseLGBTScraper):
         api_headers = {
             "Accept": "application/json, text/plain, */*",
             "Content-Type": "application/json",
-            "Referer": "https://wb2server.congreso.gob.pe/spley-portal/",
-            "Origin": "https://wb2server.congreso.gob.pe",
+            "Referer": f"{self.api_base_url}/spley-portal/",
+            "Origin": self.api_base_url,
             "Sec-Fetch-Dest": "empty",
             "Sec-Fetch-Mode": "cors",
             "Sec-Fetch-Site": "same-origin",
         }
         self.session.headers.update(api_headers)
 
-    def search_laws(self, search_term, max_results=50):
-        """Search for laws using the discovered API endpoint"""
-        print(f"Searching for: {search_term}")
+    def search_laws(self, search_term, max_results=50, date_from=None, date_to=None, row_start=0):
+        """
+        Search for laws using the discovered API endpoint, optionally by
+        presentation date, `max_results` per page until every match is listed
+        """
+        self.log.debug(
+            "Searching for: %s", search_term, extra={"term": search_term}
+        )
 
         payload = {
             "perParId": 2021,  # Current parliamentary period
@@ -43,43 +71,154 @@ class Peru2021LGBTScraper(BaseLGBTScraper):
             "grupoParlamentarioId": None,
             "proponenteId": None,
             "legislaturaId": None,
-            "fecPresentacionDesde": None,
-            "fecPresentacionHasta": None,
+            "fecPresentacionDesde": date_from.strftime(API_DATE_FORMAT) if date_from else None,
+            "fecPresentacionHasta": date_to.strftime(API_DATE_FORMAT) if date_to else None,
             "pleyNum": None,
             "palabras": search_term,  # This is the search field
             "tipoFirmanteId": None,
             "pageSize": max_results,
-            "rowStart": 0,
+            "rowStart": row_start,
         }
 
-        try:
-            response = self.session.post(self.search_api, json=payload, timeout=15)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                if data.get("code") == 200 and data.get("status") == "success":
-                    projects = data.get("data", {}).get("proyectos", [])
-                    total_rows = data.get("data", {}).get("rowsTotal", 0)
-
-                    print(f"  Found {len(projects)} results (total: {total_rows})")
-
-                    for project in projects:
-                        # Get detailed information for each project
-                        self.get_project_details(project, search_term)
-                        time.sleep(0.5)  # Be respectful
+        found = 0
+        while True:
+            try:
+                response = self.fetcher.post(
+                    self.search_api, endpoint="api-search", json=payload
+                )
 
-                    return len(projects)
+                if response.status_code != 200:
+                    self.log.warning(
+                        "Search HTTP error %s", response.status_code, extra={"term": search_term}
+                    )
+                    data = None
                 else:
-                    print(f"  API error: {data}")
-                    return 0
-            else:
-                print(f"  HTTP error {response.status_code}")
-                return 0
+                    data = response.json()
+                    if data.get("code") != 200 or data.get("status") != "success":
+                        self.log.warning("API error: %s", data, extra={"term": search_term})
+                        data = None
+
+            except Exception as e:
+                self.log.warning("Search failed: %s", e, extra={"term": search_term})
+                data = None
+
+            if data is None:
+                # Retry from the page that failed; the pages before it are done
+                self.defer(
+                    self.search_laws, search_term, max_results, date_from, date_to, row_start
+                )
+                return found
+
+            projects = data.get("data", {}).get("proyectos", [])
+            total_rows = data.get("data", {}).get("rowsTotal", 0)
+            for project in projects:
+                self.note_presented(project.get("fecPresentacion"))
+
+            self.log.debug(
+                "Found %d results from row %d (total: %s)",
+                len(projects),
+                row_start,
+                total_rows,
+                extra={"term": search_term},
+            )
+
+            # Get detailed information for each project
+            self.process_links(
+                self.changed_projects(projects),
+                search_term,
+                self.get_project_details,
+                0.5,
+                key=lambda project: f"{project.get('perParId')}/{project.get('pleyNum')}",
+            )
+
+            found += len(projects)
+            row_start += len(projects)
+            if not projects or row_start >= total_rows:
+                return found
+            payload["rowStart"] = row_start
+            self.pause(0.5)
+
+    def note_presented(self, value):
+        """Track the latest presentation date listed ("2025-09-09T00:00:00.000-0500")"""
+        try:
+            presented = date.fromisoformat((value or "")[:10])
+        except ValueError:
+            return
+        if self.latest_presented is None or presented > self.latest_presented:
+            self.latest_presented = presented
+
+    def load_state(self):
+        value = self.exporter.load_state(self.period_name).get("high_water_mark")
+        self.high_water_mark = date.fromisoformat(value) if value else None
+
+    def save_state(self):
+        """
+        Advance the high-water mark to the latest bill listed, unless a
+        fetch failed or a search term was not completed
+        """
+        if self.incomplete_terms:
+            # The terms left out may list bills older than the new mark
+            self.log.warning(
+                "Keeping the high-water mark at %s: %d search term(s) not completed",
+                self.high_water_mark,
+                len(self.incomplete_terms),
+            )
+            return
+        if self.failed_items:
+            # Bills behind the failed items could be skipped by a later window
+            self.log.warning(
+                "Keeping the high-water mark at %s: %d item(s) failed",
+                self.high_water_mark,
+                len(self.failed_items),
+            )
+            return
+        if self.latest_presented is None:
+            return
+        if self.high_water_mark is None or self.latest_presented > self.high_water_mark:
+            self.high_water_mark = self.latest_presented
+        self.exporter.save_state(
+            self.period_name,
+            {
+                "high_water_mark": self.high_water_mark.isoformat(),
+                "lookback_days": self.lookback_days,
+                "updated_at": datetime.now().isoformat(),
+            },
+        )
 
-        except Exception as e:
-            print(f"  Search failed: {e}")
-            return 0
+    def window_start(self):
+        """
+        First presentation date to search: the high-water mark for new bills,
+        or `lookback_days` ago if earlier, for state changes. None (search
+        everything) until a first run has set the high-water mark.
+        """
+        if self.high_water_mark is None:
+            return None
+        return min(self.high_water_mark, date.today() - timedelta(days=self.lookback_days))
+
+    def listing_fingerprint(self, record):
+        """Hash of the fields a bill's search listing shows"""
+        return fingerprint({name: record.get(name) for name in LISTING_FIELDS})
+
+    def changed_projects(self, projects):
+        """Projects to fetch in detail: all of them, or in watch mode the new or changed ones"""
+        if self.listing_index is None:
+            return projects
+
+        changed = []
+        for project in projects:
+            # Standardized without details, so the fields match a stored record's
+            record = self.standardize_result(
+                {
+                    "search_term_used": "",
+                    "basic_info": project,
+                    "detailed_info": {},
+                    "scraped_at": "",
+                }
+            )
+            if self.listing_index.get(document_key(record)) != self.listing_fingerprint(record):
+                changed.append(project)
+        self.metrics.incr("details_skipped", len(projects) - len(changed))
+        return changed
 
     def get_project_details(self, project, search_term):
         """Get detailed information about a specific project"""
@@ -95,7 +234,7 @@ class Peru2021LGBTScraper(BaseLGBTScraper):
         detail_url = f"{self.detail_api}/{per_par_id}/{pley_num}"
 
         try:
-            response = self.session.get(detail_url, timeout=15)
+            response = self.fetcher.get(detail_url, endpoint="api-detail")
 
             if response.status_code == 200:
                 detail_data = response.json()
@@ -109,113 +248,216 @@ class Peru2021LGBTScraper(BaseLGBTScraper):
                         "scraped_at": datetime.now().isoformat(),
                     }
 
-                    self.results.append(full_data)
-
-                    titulo = project.get("titulo", "Sin título")
-                    estado = project.get("desEstado", "Sin estado")
-                    fecha = project.get("fecPresentacion", "Sin fecha")
-
-                    print(
-                        f"    ✓ {project.get('proyectoLey', 'N/A')}: {titulo[:80]}..."
+                    # Standardize right away so records can be streamed
+                    with self.stage("extract"):
+                        result = self.standardize_result(full_data)
+                    self.add_result(result)
+
+                    self.log.debug(
+                        "✓ %s: %s... (Estado: %s, Fecha: %s)",
+                        result.law_number,
+                        result.title[:80],
+                        result.status,
+                        result.date,
+                        extra={"url": result.url, "law_number": result.law_number},
                     )
-                    print(f"      Estado: {estado}, Fecha: {fecha}")
                 else:
-                    print(f"    Detail API error for {project.get('proyectoLey')}")
+                    self.log.warning("Detail API error for %s", project.get("proyectoLey"))
             else:
-                print(
-                    f"    Detail HTTP error {response.status_code} for {project.get('proyectoLey')}"
+                self.log.warning(
+                    "Detail HTTP error %s for %s", response.status_code, project.get("proyectoLey")
+                )
+                self.defer_http_error(
+                    response.status_code, self.get_project_details, project, search_term
                 )
 
         except Exception as e:
-            print(f"    Detail fetch failed for {project.get('proyectoLey')}: {e}")
+            self.log.warning("Detail fetch failed for %s: %s", project.get("proyectoLey"), e)
+            self.defer(self.get_project_details, project, search_term)
 
     def search_all_terms(self):
         """Search for all LGBT-related terms"""
-        print("Starting LGBT rights law search using Peru Congress API...")
-        print(f"Search terms: {', '.join(self.search_terms)}")
-        print()
+        self.log.info(
+            "Starting LGBT rights law search using Peru Congress API (%d terms)",
+            len(self.search_terms),
+        )
+        self.start_progress(len(self.search_terms))
+
+        date_from = self.window_start() if self.incremental else None
+        if date_from is not None:
+            self.log.info("Incremental search of bills presented since %s", date_from)
 
         total_found = 0
+        self.incomplete_terms = []
 
-        for term in self.search_terms:
+        for index, term in enumerate(self.search_terms):
             try:
-                found = self.search_laws(term)
+                found = self.search_laws(term, date_from=date_from)
                 total_found += found
-                time.sleep(1)  # Be respectful between searches
+                self.advance_progress()
+                self.pause(1)  # Be respectful between searches
 
             except KeyboardInterrupt:
-                print("\nSearch interrupted by user")
+                self.log.warning("Search interrupted by user")
+                self.incomplete_terms = self.search_terms[index:]
                 break
 
-        print(
-            f"\nTotal search completed. Found {len(self.results)} LGBT-related laws/projects"
+        self.finish_progress()
+        self.log.info(
+            "Total search completed. Found %d LGBT-related laws/projects", self.result_count
         )
         return total_found
 
-    def save_results(self):
-        """Save results using the base exporter with API-specific formatting"""
-        if not self.results:
-            print("No LGBT-related laws found.")
-            return
-
-        # Transform API results to standard format
-        standardized_results = []
-        for result in self.results:
-            basic = result["basic_info"]
-            detailed = result["detailed_info"]
-
-            standard = {
-                "search_term_used": result["search_term_used"],
-                "found_terms": [],  # API doesn't track individual found terms
-                "url": f"https://wb2server.congreso.gob.pe/spley-portal/#/expediente/main/{basic.get('perParId')}/{basic.get('pleyNum')}",
-                "title": basic.get("titulo", "Sin título"),
-                "law_number": basic.get("proyectoLey", "N/A"),
-                "date": basic.get("fecPresentacion", "Sin fecha"),
-                "status": basic.get("desEstado", "Sin estado"),
-                "summary": detailed.get("general", {}).get("sumilla", "Sin sumilla")
-                if detailed
-                else "Sin detalles",
-                "authors": basic.get("autores", "Sin autores"),
-                "proponent": basic.get("desProponente", "Sin proponente"),
-                "committees": [
-                    c.get("nombre", "Sin nombre")
-                    for c in detailed.get("comisiones", [])
-                ]
-                if detailed
-                else [],
-                "period": detailed.get("general", {}).get(
-                    "desPerParAbrev", "Sin período"
-                )
-                if detailed
-                else "Sin período",
-                "legislature": detailed.get("general", {}).get(
-                    "desLegis", "Sin legislatura"
-                )
-                if detailed
-                else "Sin legislatura",
-                "content_snippet": (
-                    detailed.get("general", {}).get("sumilla", "")[:200] + "..."
+    def watch(self, interval=WATCH_INTERVAL, cycles=None):
+        """
+        Poll for bills presented since the high-water mark (and in the last
+        `lookback_days` days) every `interval` seconds, until interrupted
+        (or for `cycles` polls).
+
+        The session, connection pool and latency estimates stay warm between
+        polls. Only bills that are new or whose listing (status, title...)
+        changed are fetched in detail; they are upserted into the SQLite
+        store and appended to lgbt_laws_2021_changes.jsonl. Export the
+        files with `main.py --current --from-store`.
+        """
+        store = self.exporter.open_store()
+        self.export_results = False
+        self.load_state()
+        self.listing_index = {
+            key: self.listing_fingerprint(item["fields"])
+            for key, item in self.exporter.load_change_index(self.period_name).items()
+        }
+        updates = []
+
+        def collect(record):
+            # Known as soon as fetched, so other terms finding it skip it
+            updates.append(record)
+            self.listing_index[document_key(record)] = self.listing_fingerprint(record)
+
+        self.add_sink(collect)
+
+        def record_poll():
+            store.flush()
+            changes = self.exporter.record_updates(updates, self.period_name)
+            updates.clear()
+            return changes
+
+        self.log.info(
+            "Watching %d terms every %gs (high-water mark %s, %d days lookback)",
+            len(self.search_terms),
+            interval,
+            self.high_water_mark,
+            self.lookback_days,
+        )
+        cycle = 0
+        try:
+            while cycles is None or cycle < cycles:
+                cycle += 1
+                started = time.monotonic()
+                requests_before = self.metrics.total("requests")
+                # Repeats are counted within a poll, not across the whole watch
+                self._seen_keys.clear()
+
+                self.poll(self.window_start())
+                changes = record_poll()
+                self.save_state()
+                self.failed_items.clear()
+                self.metrics.incr("watch_cycles")
+
+                new = sum(1 for change in changes if change["change"] == "new")
+                self.log.info(
+                    "Poll %d: %d new, %d changed bill(s), %d requests in %.1fs",
+                    cycle,
+                    new,
+                    len(changes) - new,
+                    self.metrics.total("requests") - requests_before,
+                    time.monotonic() - started,
+                    extra={"cycle": cycle, "new": new, "changed": len(changes) - new},
                 )
-                if detailed and detailed.get("general", {}).get("sumilla")
-                else basic.get("titulo", "Sin contenido")[:200] + "...",
-                "year": "2021",
-                "scraped_at": datetime.now().isoformat(),
-            }
-            standardized_results.append(standard)
+                self.exporter.save_run_report(self.metrics, prometheus=self.write_prometheus)
+
+                if cycles is None or cycle < cycles:
+                    time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            self.log.warning("Watch stopped by user")
+            # Keep the bills an interrupted poll fetched, but not its high-water mark
+            record_poll()
+            self.exporter.save_run_report(self.metrics, prometheus=self.write_prometheus)
+        finally:
+            store.close()
+            self.exporter.store = None
 
-        # Use base class exporter
-        self.exporter.save_results(standardized_results, self.period_name)
+    def poll(self, date_from, date_to=None):
+        """Search every term for bills presented between two dates, retrying failures once"""
+        self.incomplete_terms = []
+        for index, term in enumerate(self.search_terms):
+            try:
+                self.search_laws(term, date_from=date_from, date_to=date_to)
+                self.pause(1)  # Be respectful between searches
+            except KeyboardInterrupt:
+                self.incomplete_terms = self.search_terms[index:]
+                raise
+        self.drain_retry_queue()
+
+    def standardize_result(self, result):
+        """Transform a combined API result to the standard record format"""
+        basic = result["basic_info"]
+        detailed = result["detailed_info"]
+
+        return LawRecord(
+            search_term_used=result["search_term_used"],
+            found_terms=[],  # API doesn't track individual found terms
+            url=f"{self.api_base_url}/spley-portal/#/expediente/main/{basic.get('perParId')}/{basic.get('pleyNum')}",
+            title=basic.get("titulo", "Sin título"),
+            law_number=basic.get("proyectoLey", "N/A"),
+            date=basic.get("fecPresentacion", "Sin fecha"),
+            status=basic.get("desEstado", "Sin estado"),
+            summary=detailed.get("general", {}).get("sumilla", "Sin sumilla")
+            if detailed
+            else "Sin detalles",
+            authors=basic.get("autores", "Sin autores"),
+            proponent=basic.get("desProponente", "Sin proponente"),
+            committees=[
+                c.get("nombre", "Sin nombre") for c in detailed.get("comisiones", [])
+            ]
+            if detailed
+            else [],
+            period=detailed.get("general", {}).get("desPerParAbrev", "Sin período")
+            if detailed
+            else "Sin período",
+            legislature=detailed.get("general", {}).get(
+                "desLegis", "Sin legislatura"
+            )
+            if detailed
+            else "Sin legislatura",
+            content_snippet=(
+                detailed.get("general", {}).get("sumilla", "")[:200] + "..."
+            )
+            if detailed and detailed.get("general", {}).get("sumilla")
+            else basic.get("titulo", "Sin contenido")[:200] + "...",
+            year="2021",
+            scraped_at=result["scraped_at"],
+        )
 
     def run(self):
         """Main execution method"""
+        if self.incremental:
+            # A window only covers recent bills; the store keeps the rest
+            self.exporter.open_store()
+            self.load_state()
         try:
             self.search_all_terms()
+            self.drain_retry_queue()
+            if self.incremental:
+                self.save_state()
         except Exception as e:
-            print(f"Search error: {e}")
+            self.log.error("Search error: %s", e)
+            self.run_error = e
         finally:
             self.save_results()
 
 
 if __name__ == "__main__":
+    setup_logging()
     scraper = Peru2021LGBTScraper()
     scraper.run()
@@ -4,5 +4,6 @@ Shared utilities for Peru LGBT law scrapers
 
 from .search_terms import LGBT_SEARCH_TERMS
 from .export import DataExporter
+from .record import LawRecord
 
-__all__ = ["LGBT_SEARCH_TERMS", "DataExporter"]
+__all__ = ["LGBT_SEARCH_TERMS", "DataExporter", "LawRecord"]
@@ -0,0 +1,323 @@
+"""
+Compressed archive of raw pages fetched by the scrapers
+
+Domino detail pages from one `.nsf` database are mostly identical
+boilerplate, so each period gets a compression dictionary trained on its
+first pages and every page is compressed against it. Pages are stored
+once per content hash (sha256) in an append-only pack file per period,
+and a SQLite index maps (method, url, body) to the blob's offset, so a
+re-parse can decompress just the documents it needs.
+
+zstd is used when the optional `zstandard` package is installed; otherwise
+zlib with a preset dictionary built from the same samples.
+
+ReplayAdapter serves a session's requests from the archive instead of the
+network, so a recorded run can be re-parsed or profiled offline.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import zstandard
+except ImportError:  # optional: uv sync --extra archive
+    zstandard = None
+
+CODEC = "zstd" if zstandard is not None else "zlib"
+
+logger = logging.getLogger(__name__)
+
+# Pages collected before training a period's dictionary
+TRAIN_SAMPLES = 32
+ZSTD_DICT_SIZE = 112 * 1024
+ZSTD_LEVEL = 19
+# zlib only looks back 32 KiB, so a larger preset dictionary is wasted
+ZLIB_DICT_SIZE = 32 * 1024
+ZLIB_LEVEL = 9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dictionaries (
+    id INTEGER PRIMARY KEY,
+    period TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL,
+    UNIQUE (period, codec)
+);
+
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    period TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    codec TEXT NOT NULL,
+    dict_id INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    period TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    body TEXT NOT NULL DEFAULT '',
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    hash TEXT NOT NULL REFERENCES blobs(hash),
+    fetched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_url ON pages(url, method, body);
+CREATE INDEX IF NOT EXISTS idx_pages_period ON pages(period);
+"""
+
+
+def train_zlib_dictionary(samples, size=ZLIB_DICT_SIZE):
+    """
+    Build a zlib preset dictionary from the lines shared between samples.
+    The most common lines go last, where matches are cheapest to encode.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(sample.splitlines(keepends=True)))
+
+    shared = [line for line, n in counts.items() if n > 1 and len(line) > 4]
+    shared.sort(key=lambda line: (counts[line], len(line)))
+    return b"".join(shared)[-size:]
+
+
+def train_dictionary(samples, codec=CODEC):
+    """Train a compression dictionary for `codec`, or None if samples are too few"""
+    if len(samples) < 2:
+        return None
+    if codec == "zstd":
+        try:
+            return zstandard.train_dictionary(ZSTD_DICT_SIZE, samples).as_bytes()
+        except zstandard.ZstdError:
+            return None
+    return train_zlib_dictionary(samples) or None
+
+
+def compress(data, codec, dictionary=None):
+    if codec == "zstd":
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+    if dictionary:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(ZLIB_LEVEL)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data, codec, dictionary=None):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError(
+                "This page was archived with zstd; install it with: uv sync --extra archive"
+            )
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def _body_text(body):
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        return body.decode("utf-8", "replace")
+    return str(body)
+
+
+class PageArchive:
+    """Content-addressed, dictionary-compressed store of raw fetched pages"""
+
+    def __init__(self, root, period_name):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.period_name = period_name
+        self.pack_path = self.root / f"{period_name}.pack"
+        self.conn = sqlite3.connect(str(self.root / "pages.sqlite"), check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        # Hedged and raced fetches archive from worker threads
+        self._lock = threading.Lock()
+        self._dictionaries = {}
+        self._dict_id = self._load_dictionary_id()
+        # Pages waiting for the period's dictionary to be trained
+        self._pending = []
+        self.pages_added = 0
+
+    def _load_dictionary_id(self):
+        row = self.conn.execute(
+            "SELECT id FROM dictionaries WHERE period = ? AND codec = ?",
+            (self.period_name, CODEC),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _dictionary(self, dict_id):
+        if dict_id is None:
+            return None
+        if dict_id not in self._dictionaries:
+            row = self.conn.execute(
+                "SELECT data FROM dictionaries WHERE id = ?", (dict_id,)
+            ).fetchone()
+            self._dictionaries[dict_id] = row[0]
+        return self._dictionaries[dict_id]
+
+    def add(self, method, url, response):
+        """Archive a fetched response under the request that produced it"""
+        content = response.content
+        page = (
+            self.period_name,
+            method,
+            url,
+            _body_text(response.request.body if response.request else None),
+            response.status_code,
+            response.headers.get("Content-Type"),
+            hashlib.sha256(content).hexdigest(),
+            datetime.now().isoformat(),
+        )
+
+        with self._lock:
+            self.pages_added += 1
+            if self._dict_id is None:
+                self._pending.append((page, content))
+                if len(self._pending) >= TRAIN_SAMPLES:
+                    self._train_and_flush()
+                return
+            with self.conn:
+                self._store(page, content)
+
+    def _train_and_flush(self):
+        dictionary = train_dictionary([content for _, content in self._pending])
+        with self.conn:
+            if dictionary is not None:
+                self._dict_id = self.conn.execute(
+                    "INSERT INTO dictionaries (period, codec, data) VALUES (?, ?, ?)",
+                    (self.period_name, CODEC, dictionary),
+                ).lastrowid
+            for page, content in self._pending:
+                self._store(page, content)
+        self._pending = []
+
+    def _store(self, page, content):
+        digest = page[6]
+        exists = self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if not exists:
+            blob = compress(content, CODEC, self._dictionary(self._dict_id))
+            with open(self.pack_path, "ab") as pack:
+                offset = pack.tell()
+                pack.write(blob)
+            self.conn.execute(
+                "INSERT INTO blobs (hash, period, offset, length, raw_size, codec, dict_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest, self.period_name, offset, len(blob), len(content), CODEC, self._dict_id),
+            )
+        self.conn.execute(
+            "INSERT INTO pages (period, method, url, body, status, content_type, hash, "
+            "fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            page,
+        )
+
+    def lookup(self, method, url, body=None):
+        """Latest archived page for a request as a dict, or None"""
+        row = self.conn.execute(
+            "SELECT status, content_type, hash, fetched_at FROM pages "
+            "WHERE url = ? AND method = ? AND body = ? ORDER BY id DESC LIMIT 1",
+            (url, method, _body_text(body)),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["status", "content_type", "hash", "fetched_at"], row))
+
+    def read(self, digest):
+        """Decompress one blob by content hash, reading only its bytes from the pack"""
+        row = self.conn.execute(
+            "SELECT period, offset, length, codec, dict_id FROM blobs WHERE hash = ?",
+            (digest,),
+        ).fetchone()
+        if row is None:
+            return None
+        period_name, offset, length, codec, dict_id = row
+        with open(self.root / f"{period_name}.pack", "rb") as pack:
+            pack.seek(offset)
+            blob = pack.read(length)
+        return decompress(blob, codec, self._dictionary(dict_id))
+
+    def get(self, url, method="GET", body=None):
+        """Raw bytes of the latest archived page for a request, or None"""
+        page = self.lookup(method, url, body)
+        return self.read(page["hash"]) if page else None
+
+    def stats(self):
+        """Page, blob and byte counts for this period's archive"""
+        pages = self.conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE period = ?", (self.period_name,)
+        ).fetchone()[0]
+        blobs, raw_size, stored = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(length), 0) "
+            "FROM blobs WHERE period = ?",
+            (self.period_name,),
+        ).fetchone()
+        return {"pages": pages, "blobs": blobs, "raw_bytes": raw_size, "stored_bytes": stored}
+
+    def close(self):
+        """Compress any pages still waiting for a dictionary and close the index"""
+        with self._lock:
+            if self._pending:
+                self._train_and_flush()
+        stats = self.stats()
+        if self.pages_added:
+            logger.info(
+                "  - Archive: %d pages, %d unique, %.1f MB raw -> %.2f MB (%s)",
+                stats["pages"],
+                stats["blobs"],
+                stats["raw_bytes"] / 1e6,
+                stats["stored_bytes"] / 1e6,
+                CODEC,
+                extra=stats,
+            )
+        self.conn.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering requests with archived pages (404 if never fetched)"""
+
+    def __init__(self, archive):
+        super().__init__()
+        self.archive = archive
+        self.hits = 0
+        self.misses = 0
+
+    def send(self, request, **kwargs):
+        page = self.archive.lookup(request.method, request.url, request.body)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.connection = self
+
+        if page is None:
+            self.misses += 1
+            response.status_code = 404
+            response.reason = "Not Archived"
+            response._content = b""
+            return response
+
+        self.hits += 1
+        response.status_code = page["status"]
+        response.reason = "OK" if page["status"] == 200 else ""
+        response.headers = CaseInsensitiveDict({"Content-Type": page["content_type"] or ""})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.archive.read(page["hash"])
+        return response
+
+    def close(self):
+        pass
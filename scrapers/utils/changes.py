@@ -0,0 +1,100 @@
+"""
+Run-to-run change detection for Peru LGBT law exports
+
+Each export overwrites lgbt_laws_{period}_results.json, so before that
+happens the previous run's records are kept as a key index: document key
+-> hash of the record's material fields (plus the fields themselves).
+Comparing the new run against it gives the bills that were newly found,
+changed (with per-field old/new values) or no longer found, appended to
+lgbt_laws_{period}_changes.jsonl for downstream consumers.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from .record import as_dict
+from .store import document_key
+
+# Fields whose change is meaningful. Search provenance, snippets, the
+# scrape timestamp and the URL (its Highlight= query depends on the search
+# term) vary between runs without the bill itself changing.
+MATERIAL_FIELDS = [
+    "law_number",
+    "title",
+    "date",
+    "status",
+    "summary",
+    "authors",
+    "proponent",
+    "committees",
+    "legislature",
+]
+
+
+def material_fields(record):
+    return {name: record.get(name) for name in MATERIAL_FIELDS}
+
+
+def fingerprint(fields):
+    """Stable hash of a record's material fields"""
+    payload = json.dumps(fields, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def build_index(records):
+    """
+    Map document key -> {"hash", "url", "fields"}. A bill found by several
+    search terms keeps its first record.
+    """
+    index = {}
+    for record in records:
+        record = as_dict(record)
+        key = document_key(record)
+        if key in index:
+            continue
+        fields = material_fields(record)
+        index[key] = {"hash": fingerprint(fields), "url": record.get("url"), "fields": fields}
+    return index
+
+
+def load_index(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_index(index, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+
+
+def diff_indexes(previous, current, period_name):
+    """Yield new/changed/removed entries between two key indexes"""
+    detected_at = datetime.now().isoformat()
+
+    def entry(change, key, item, **extra):
+        return {
+            "change": change,
+            "doc_key": key,
+            "period": period_name,
+            "law_number": item["fields"].get("law_number"),
+            "url": item["url"],
+            "detected_at": detected_at,
+            **extra,
+        }
+
+    for key, item in current.items():
+        old = previous.get(key)
+        if old is None:
+            yield entry("new", key, item, record=item["fields"])
+        elif old["hash"] != item["hash"]:
+            deltas = {
+                name: {"old": old["fields"].get(name), "new": value}
+                for name, value in item["fields"].items()
+                if old["fields"].get(name) != value
+            }
+            yield entry("changed", key, item, fields=deltas)
+
+    for key, item in previous.items():
+        if key not in current:
+            yield entry("removed", key, item, record=item["fields"])
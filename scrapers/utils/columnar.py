@@ -0,0 +1,165 @@
+"""
+Columnar (Parquet / Arrow IPC) export for Peru LGBT law scrapers
+
+The CSV export flattens lists into semicolon strings and keeps dates as
+text, so every analysis has to re-parse it. The columnar files keep proper
+types instead: dates as date32, low-cardinality fields (status, proponent,
+period...) dictionary-encoded, and authors/committees/found terms as
+list<string> columns.
+
+Requires the optional pyarrow dependency (`uv sync --extra columnar`).
+"""
+
+import json
+import re
+from datetime import date, datetime
+
+from .store import normalize_date
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Low-cardinality text columns stored dictionary-encoded
+DICTIONARY_COLUMNS = [
+    "period",
+    "search_term_used",
+    "status",
+    "proponent",
+    "legislature",
+    "year",
+]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Columnar export requires pyarrow: install it with "
+            "`uv sync --extra columnar`"
+        ) from e
+    return pyarrow
+
+
+def schema():
+    pa = _require_pyarrow()
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("period", dictionary),
+            ("search_term_used", dictionary),
+            ("found_terms", pa.list_(pa.string())),
+            ("url", pa.string()),
+            ("title", pa.string()),
+            ("law_number", pa.string()),
+            ("date", pa.date32()),
+            ("date_text", pa.string()),
+            ("status", dictionary),
+            ("summary", pa.string()),
+            ("authors", pa.list_(pa.string())),
+            ("proponent", dictionary),
+            ("committees", pa.list_(pa.string())),
+            ("legislature", dictionary),
+            ("content_snippet", pa.string()),
+            ("year", dictionary),
+            ("scraped_at", pa.timestamp("us")),
+        ]
+    )
+
+
+def split_authors(authors):
+    """Authors as a list: API lists, "a; b" (2021) or "a,b" (legacy) strings"""
+    if isinstance(authors, list):
+        return [
+            author.get("name", "") if isinstance(author, dict) else str(author)
+            for author in authors
+        ]
+    if not authors:
+        return []
+    # 2021 names contain commas ("Last, First") and are separated by ";"
+    separator = ";" if ";" in authors else ","
+    return [name.strip() for name in authors.split(separator) if name.strip()]
+
+
+def _as_date(value):
+    iso = normalize_date(value)
+    return date.fromisoformat(iso) if iso else None
+
+
+def _as_timestamp(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    if not value:
+        return []
+    return [item.strip() for item in re.split(r";\s*", str(value)) if item.strip()]
+
+
+def to_table(records, period_name):
+    """Build a typed Arrow table from standard record dicts"""
+    pa = _require_pyarrow()
+    columns = {name: [] for name in schema().names}
+
+    for record in records:
+        columns["period"].append(period_name)
+        columns["search_term_used"].append(record.get("search_term_used"))
+        columns["found_terms"].append(_as_list(record.get("found_terms")))
+        columns["url"].append(record.get("url"))
+        columns["title"].append(record.get("title"))
+        columns["law_number"].append(record.get("law_number"))
+        columns["date"].append(_as_date(record.get("date")))
+        columns["date_text"].append(record.get("date"))
+        columns["status"].append(record.get("status"))
+        columns["summary"].append(record.get("summary"))
+        columns["authors"].append(split_authors(record.get("authors")))
+        columns["proponent"].append(record.get("proponent"))
+        columns["committees"].append(_as_list(record.get("committees")))
+        columns["legislature"].append(record.get("legislature"))
+        columns["content_snippet"].append(record.get("content_snippet"))
+        columns["year"].append(record.get("year"))
+        columns["scraped_at"].append(_as_timestamp(record.get("scraped_at")))
+
+    return pa.Table.from_pydict(columns, schema=schema())
+
+
+def write_table(table, path, fmt="parquet"):
+    """Write a table as Parquet (zstd, dictionary pages) or Arrow IPC"""
+    pa = _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(
+            table,
+            path,
+            compression="zstd",
+            use_dictionary=DICTIONARY_COLUMNS,
+        )
+    elif fmt == "arrow":
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, path, compression="zstd")
+    else:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+
+
+def read_table(path, columns=None):
+    """Read a Parquet or Arrow IPC file, loading only the requested columns"""
+    _require_pyarrow()
+    if str(path).endswith(".arrow"):
+        import pyarrow.feather as feather
+
+        return feather.read_table(path, columns=columns)
+
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, columns=columns)
+
+
+def load_json_records(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,31 @@
+"""
+Congress endpoints and politeness settings for Peru LGBT law scrapers
+
+Both hosts can be pointed elsewhere (e.g. at the local stand-in server in
+scrapers/mock_server.py) with the CONGRESO_BASE_URL environment variable,
+and the pauses scrapers take between requests can be scaled with
+SCRAPER_POLITENESS (1 = normal, 0 = no pauses).
+"""
+
+import os
+
+LEGACY_BASE_URL = "https://www2.congreso.gob.pe"
+API_BASE_URL = "https://wb2server.congreso.gob.pe"
+
+BASE_URL_ENV = "CONGRESO_BASE_URL"
+POLITENESS_ENV = "SCRAPER_POLITENESS"
+
+
+def legacy_base_url():
+    """Base URL of the Lotus Domino portal (1995-2016 periods)"""
+    return os.environ.get(BASE_URL_ENV, LEGACY_BASE_URL).rstrip("/")
+
+
+def api_base_url():
+    """Base URL of the spley portal and its API (2021+ period)"""
+    return os.environ.get(BASE_URL_ENV, API_BASE_URL).rstrip("/")
+
+
+def politeness():
+    """Factor applied to every pause between requests"""
+    return float(os.environ.get(POLITENESS_ENV, "1"))
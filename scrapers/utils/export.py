@@ -2,16 +2,94 @@
 Data export utilities for Peru LGBT law scrapers
 """
 
+import csv
 import json
-import pandas as pd
+import logging
+import os
+import textwrap
+import time
 from datetime import datetime
 from pathlib import Path
 
+from .record import RECORD_FIELDS, as_dict
+
+logger = logging.getLogger(__name__)
+
+# Records written to a stream between fsyncs, and the longest time a
+# written record may sit in the OS cache before being forced to disk
+FSYNC_EVERY = 25
+FSYNC_INTERVAL = 5.0
+
+# Where exports are written; runs against the mock server write elsewhere
+# (SCRAPER_OUTPUT_DIR) so they never overwrite the exports it serves
+DEFAULT_OUTPUT_DIR = "data/exports"
+OUTPUT_DIR_ENV = "SCRAPER_OUTPUT_DIR"
+
+# Column order of the CSV export, following the standard record schema.
+# Keys outside the schema are not exported to CSV (they stay in the JSON).
+CSV_COLUMNS = list(RECORD_FIELDS)
+
+# List columns written to CSV as "a; b" rather than as a Python list
+JOINED_COLUMNS = {"committees", "periods", "search_terms"}
+
+
+class JsonlStreamWriter:
+    """Append-only JSON Lines writer that fsyncs in batches"""
+
+    def __init__(self, path, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # A new run starts a new stream; the previous run's derived views
+        # stay on disk until this one is finalized
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps(as_dict(record), ensure_ascii=False) + "\n")
+        self.count += 1
+        self._unsynced += 1
+
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def sync(self):
+        """Flush buffered records and force them to disk"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+
+
+def iter_jsonl(path):
+    """Yield records from a JSON Lines file one at a time"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a truncated last line behind
+                    continue
+
 
 class DataExporter:
     """Utility class for exporting scraped law data in multiple formats"""
 
-    def __init__(self, output_dir="data/exports"):
+    def __init__(self, output_dir=None):
+        output_dir = output_dir or os.environ.get(OUTPUT_DIR_ENV, DEFAULT_OUTPUT_DIR)
         # Make path relative to project root, not current working directory
         if not Path(output_dir).is_absolute():
             # Find project root by looking for pyproject.toml
@@ -28,72 +106,360 @@ class DataExporter:
             self.output_dir = Path(output_dir)
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.store = None
 
-    def save_results(self, results, period_name):
-        """Save results in multiple formats (JSON, CSV, TXT)"""
+    def save_results(self, results, period_name, complete=True):
+        """
+        Save results in multiple formats (JSON, CSV, TXT). Pass complete=False
+        for a limited or partial run, so bills it did not find are not
+        reported as removed.
+        """
         if not results:
-            print(f"No LGBT-related laws found for {period_name} period.")
+            logger.info("No LGBT-related laws found for %s period.", period_name)
             return
 
-        # Save detailed JSON
+        self._write_views(lambda: iter(results), len(results), period_name, complete=complete)
+
+    def save_views(self, records, period_name, columns=None):
+        """
+        Write the JSON, CSV and TXT views of an in-memory list of records
+        without recording them in the change log (derived datasets and
+        snapshot checkouts)
+        """
+        self._write_views(
+            lambda: iter(records), len(records), period_name, columns=columns, track_changes=False
+        )
+
+    def _write_views(
+        self,
+        records,
+        total,
+        period_name,
+        extra_files=(),
+        columns=None,
+        track_changes=True,
+        complete=True,
+    ):
+        """
+        Write the JSON, CSV and TXT views. `records` is called once per view
+        and must return a fresh iterator, so records are never all in memory
+        unless the caller already holds them.
+        """
         json_file = self.output_dir / f"lgbt_laws_{period_name}_results.json"
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # Read the previous run's state before its export is overwritten
+        previous = self.load_change_index(period_name) if track_changes else None
+        self._write_json(records(), json_file)
 
-        # Save as CSV - flatten complex fields
-        csv_results = self._flatten_for_csv(results)
         csv_file = self.output_dir / f"lgbt_laws_{period_name}.csv"
-        df = pd.DataFrame(csv_results)
-        df.to_csv(csv_file, index=False, encoding="utf-8")
+        self._write_csv(records(), csv_file, columns or CSV_COLUMNS)
 
         # Create human-readable summary
         txt_file = self.output_dir / f"lgbt_laws_{period_name}_summary.txt"
-        self._create_summary(results, txt_file, period_name)
-
-        print(f"Results saved:")
-        print(f"  - {json_file} (detailed)")
-        print(f"  - {csv_file} (spreadsheet)")
-        print(f"  - {txt_file} (human readable)")
-
-    def _flatten_for_csv(self, results):
-        """Flatten complex fields for CSV export"""
-        csv_results = []
-        for result in results:
-            csv_result = result.copy()
-
-            # Flatten authors
-            if isinstance(csv_result.get("authors"), list):
-                author_names = [
-                    author.get("name", "") if isinstance(author, dict) else str(author)
-                    for author in csv_result["authors"]
-                ]
-                csv_result["authors"] = "; ".join(author_names)
+        self._create_summary(records(), txt_file, period_name, total)
+
+        logger.info("Results saved:")
+        for extra in extra_files:
+            logger.info("  - %s", extra)
+        logger.info("  - %s (detailed)", json_file)
+        logger.info("  - %s (spreadsheet)", csv_file)
+        logger.info("  - %s (human readable)", txt_file)
+
+        if track_changes:
+            self.record_changes(records(), previous, period_name, complete=complete)
+
+    def changes_path(self, period_name):
+        return self.output_dir / f"lgbt_laws_{period_name}_changes.jsonl"
+
+    def _index_path(self, period_name):
+        return self.output_dir / f"lgbt_laws_{period_name}_index.json"
+
+    def load_change_index(self, period_name):
+        """Key index of the last export, rebuilt from its JSON if none was saved"""
+        from .changes import build_index, load_index
+
+        index_file = self._index_path(period_name)
+        if index_file.exists():
+            return load_index(index_file)
+
+        json_file = self.output_dir / f"lgbt_laws_{period_name}_results.json"
+        if json_file.exists():
+            with open(json_file, encoding="utf-8") as f:
+                return build_index(json.load(f))
+        return {}
+
+    def record_changes(self, records, previous, period_name, complete=True):
+        """
+        Append new/changed/removed bills since the previous export to the
+        change log. A run that was not complete only covered some of the
+        bills: the ones it did not find are kept in the index instead of
+        being reported as removed.
+        """
+        from .changes import build_index, diff_indexes, save_index
+
+        current = build_index(records)
+        if complete:
+            changes = list(diff_indexes(previous, current, period_name))
+        else:
+            covered = {key: previous[key] for key in current if key in previous}
+            changes = list(diff_indexes(covered, current, period_name))
+            current = {**previous, **current}
+        self._append_changes(changes, period_name)
+        save_index(current, self._index_path(period_name))
+
+        counts = {kind: 0 for kind in ("new", "changed", "removed")}
+        for change in changes:
+            counts[change["change"]] += 1
+        logger.info(
+            "  - %s (%d new, %d changed, %d removed)",
+            self.changes_path(period_name),
+            counts["new"],
+            counts["changed"],
+            counts["removed"],
+        )
+        return changes
+
+    def record_updates(self, records, period_name):
+        """
+        Append the bills among `records` that are new or changed since the
+        last export (or update) to the change log. Unlike record_changes, a
+        bill missing from `records` is not reported as removed: an update
+        only covers the bills that were re-fetched.
+        """
+        from .changes import build_index, diff_indexes, save_index
+
+        index = self.load_change_index(period_name)
+        updates = build_index(records)
+        previous = {key: index[key] for key in updates if key in index}
+        changes = list(diff_indexes(previous, updates, period_name))
+        self._append_changes(changes, period_name)
+
+        index.update(updates)
+        save_index(index, self._index_path(period_name))
+        return changes
+
+    def _append_changes(self, changes, period_name):
+        if not changes:
+            return
+        with open(self.changes_path(period_name), "a", encoding="utf-8") as f:
+            for change in changes:
+                f.write(json.dumps(change, ensure_ascii=False) + "\n")
+
+    def load_state(self, period_name):
+        """Incremental scraping state of a period ({} before the first run)"""
+        state_file = self.output_dir / f"lgbt_laws_{period_name}_state.json"
+        if not state_file.exists():
+            return {}
+        with open(state_file, encoding="utf-8") as f:
+            return json.load(f)
 
-            # Flatten tracking
-            if isinstance(csv_result.get("tracking"), list):
-                tracking_summary = [
-                    f"{t.get('date', '')}: {t.get('action', '')[:50]}..."
-                    for t in csv_result["tracking"][:3]  # First 3 entries
-                ]
-                csv_result["tracking"] = "; ".join(tracking_summary)
+    def save_state(self, period_name, state):
+        state_file = self.output_dir / f"lgbt_laws_{period_name}_state.json"
+        # Write then rename so an interrupted run never leaves a partial state
+        tmp_file = state_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        tmp_file.replace(state_file)
 
-            # Flatten committees
-            if isinstance(csv_result.get("committees"), list):
-                csv_result["committees"] = "; ".join(csv_result["committees"])
+    def save_run_report(self, metrics, prometheus=False):
+        """Write a run's metrics as JSON, and in the Prometheus text format if asked"""
+        period_name = metrics.period_name
+        report_file = self.output_dir / f"lgbt_laws_{period_name}_run.json"
+        metrics.write_json(report_file)
+        logger.info("  - %s (run report)", report_file)
 
-            csv_results.append(csv_result)
+        if prometheus:
+            prom_file = self.output_dir / f"lgbt_laws_{period_name}.prom"
+            metrics.write_prometheus(prom_file)
+            logger.info("  - %s (Prometheus metrics)", prom_file)
 
-        return csv_results
+    def save_profile(self, profiler):
+        """Write a run's cProfile stats and collapsed sampled stacks"""
+        period_name = profiler.period_name
+        pstats_file = self.output_dir / f"lgbt_laws_{period_name}.pstats"
+        stacks_file = self.output_dir / f"lgbt_laws_{period_name}_stacks.txt"
+        profiler.write_pstats(pstats_file)
+        profiler.write_collapsed(stacks_file)
+        logger.info("  - %s (cProfile stats)", pstats_file)
+        logger.info("  - %s (collapsed stacks for flamegraphs)", stacks_file)
 
-    def _create_summary(self, results, txt_file, period_name):
+    def _write_json(self, records, json_file):
+        """Write records as a JSON array one at a time (same layout as json.dump indent=2)"""
+        with open(json_file, "w", encoding="utf-8") as f:
+            f.write("[\n")
+            for i, record in enumerate(records):
+                if i:
+                    f.write(",\n")
+                f.write(
+                    textwrap.indent(
+                        json.dumps(as_dict(record), indent=2, ensure_ascii=False), "  "
+                    )
+                )
+            f.write("\n]")
+
+    def _write_csv(self, records, csv_file, columns=CSV_COLUMNS):
+        """Write records row by row with the standard csv module"""
+        with open(csv_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(columns)
+            for record in records:
+                writer.writerow(self._csv_row(record, columns))
+
+    def open_store(self):
+        """Open (creating if needed) the SQLite store shared by all periods"""
+        if self.store is None:
+            from .store import ResultStore
+
+            self.store = ResultStore(self.output_dir / "lgbt_laws.sqlite")
+        return self.store
+
+    def save_results_from_store(self, period_name, complete=True):
+        """Export a period's deduplicated records from the store as JSON/CSV/TXT"""
+        store = self.open_store()
+        total = store.count(period_name)
+        if not total:
+            logger.info("No LGBT-related laws found for %s period.", period_name)
+            return
+
+        self._write_views(
+            lambda: store.iter_records(period_name), total, period_name, complete=complete
+        )
+
+    def open_work_queue(self, **kwargs):
+        """Open (creating if needed) the task queue shared by distributed workers"""
+        from .work_queue import WorkQueue
+
+        return WorkQueue(self.output_dir / "lgbt_laws_queue.sqlite", **kwargs)
+
+    def open_search_index(self):
+        from .search_index import SearchIndex
+
+        return SearchIndex(self.output_dir / "lgbt_laws_search.sqlite")
+
+    def update_search_index(self, period_name):
+        """Incrementally index a period's exported records for full-text search"""
+        from .merge import iter_period_records
+
+        index = self.open_search_index()
+        try:
+            added, updated, unchanged, removed = index.update(
+                iter_period_records(self, period_name), period_name
+            )
+        finally:
+            index.close()
+        logger.info(
+            "  - Search index: %d added, %d updated, %d unchanged, %d removed",
+            added,
+            updated,
+            unchanged,
+            removed,
+        )
+
+    def save_columnar(self, period_name, fmt="parquet"):
+        """Write a period's exported results as a typed Parquet/Arrow file"""
+        from . import columnar
+
+        json_file = self.output_dir / f"lgbt_laws_{period_name}_results.json"
+        if not json_file.exists():
+            logger.info("No results to convert for %s period.", period_name)
+            return None
+
+        table = columnar.to_table(columnar.load_json_records(json_file), period_name)
+        path = self.output_dir / f"lgbt_laws_{period_name}{columnar.FORMATS[fmt]}"
+        columnar.write_table(table, path, fmt)
+        logger.info("  - %s (columnar, %d rows)", path, table.num_rows)
+        return path
+
+    def save_columnar_dataset(self, fmt="parquet"):
+        """Combine every per-period columnar file into lgbt_laws_all"""
+        from . import columnar
+
+        pa = columnar._require_pyarrow()
+        suffix = columnar.FORMATS[fmt]
+        combined = self.output_dir / f"lgbt_laws_all{suffix}"
+        paths = sorted(
+            path
+            for path in self.output_dir.glob(f"lgbt_laws_*{suffix}")
+            if path != combined
+        )
+        if not paths:
+            return None
+
+        table = pa.concat_tables(
+            [columnar.read_table(path) for path in paths], promote_options="permissive"
+        )
+        columnar.write_table(table, combined, fmt)
+        logger.info("  - %s (combined, %d rows)", combined, table.num_rows)
+        return combined
+
+    def stream_path(self, period_name):
+        return self.output_dir / f"lgbt_laws_{period_name}.jsonl"
+
+    def open_stream(self, period_name):
+        """Start a JSON Lines stream that records are appended to as they are parsed"""
+        return JsonlStreamWriter(self.stream_path(period_name))
+
+    def save_results_from_stream(self, period_name, complete=True):
+        """Derive the JSON, CSV and TXT views from a period's JSONL stream"""
+        stream_file = self.stream_path(period_name)
+        total = sum(1 for _ in iter_jsonl(stream_file)) if stream_file.exists() else 0
+        if not total:
+            logger.info("No LGBT-related laws found for %s period.", period_name)
+            return
+
+        self._write_views(
+            lambda: iter_jsonl(stream_file),
+            total,
+            period_name,
+            extra_files=[f"{stream_file} (stream)"],
+            complete=complete,
+        )
+
+    def load_dataframe(self, period_name):
+        """Load a period's CSV export into pandas (needs the analysis extra)"""
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError(
+                "pandas is only needed for analysis: `uv sync --extra analysis`"
+            ) from e
+
+        return pd.read_csv(self.output_dir / f"lgbt_laws_{period_name}.csv")
+
+    def _csv_row(self, result, columns=CSV_COLUMNS):
+        """Flatten complex fields of one record into a CSV row"""
+        row = []
+        for column in columns:
+            value = result.get(column)
+
+            if column == "authors" and isinstance(value, list):
+                # Flatten authors
+                value = "; ".join(
+                    author.get("name", "") if isinstance(author, dict) else str(author)
+                    for author in value
+                )
+            elif column in JOINED_COLUMNS and isinstance(value, list):
+                # Flatten committees and provenance lists
+                value = "; ".join(value)
+            elif value is None:
+                value = ""
+            elif isinstance(value, list):
+                value = str(value)
+
+            row.append(value)
+        return row
+
+    def _create_summary(self, results, txt_file, period_name, total=None):
         """Create human-readable summary file"""
+        if total is None:
+            total = len(results)
+
         with open(txt_file, "w", encoding="utf-8") as f:
             f.write(f"LEYES SOBRE DERECHOS LGBT EN PERÚ - {period_name.upper()}\\n")
             f.write("=" * 50 + "\\n")
             f.write(
                 f"Búsqueda realizada: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\\n"
             )
-            f.write(f"Total de proyectos encontrados: {len(results)}\\n\\n")
+            f.write(f"Total de proyectos encontrados: {total}\\n\\n")
 
             for i, law in enumerate(results, 1):
                 f.write(
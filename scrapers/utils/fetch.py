@@ -0,0 +1,403 @@
+"""
+Fetch strategies shared by Peru LGBT law scrapers
+
+The legacy Domino host (www2.congreso.gob.pe) has a long latency tail: most
+pages come back quickly but a few stall for many seconds. Fetcher wraps a
+session with two strategies for that:
+
+- hedged GETs: if a response has not arrived after `hedge_after` seconds a
+  duplicate request is sent and whichever answers first wins
+- racing: several URL variants for the same document are requested at once
+  and the first response accepted by a caller-supplied check wins
+
+When an archive is attached, every successful response is also kept in
+it for replay and re-parsing. When run metrics are attached, every
+request attempt is counted by endpoint and outcome with its latency and
+the bytes received.
+
+Every request also goes through a retry policy (jittered exponential
+backoff limited by a retry budget) and a per-host circuit breaker. While a
+host's circuit is open, fetches to it pause instead of hammering a server
+that is down.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+
+from .latency import latency_tracker
+
+logger = logging.getLogger(__name__)
+
+# Hedge legacy page GETs that have not answered after this many seconds;
+# once an endpoint has enough samples its p95 latency is used instead
+HEDGE_AFTER = 5.0
+HEDGE_PERCENTILE = 95
+MIN_HEDGE_AFTER = 1.0
+
+# Threads available for hedges and races; losing requests finish in the
+# background and their connections go back to the shared pool
+MAX_WORKERS = 8
+
+# How often callers waiting on a half-open circuit check the probe's outcome,
+# and after how long a probe that never reported back is replaced
+PROBE_POLL = 0.5
+PROBE_TIMEOUT = 120.0
+
+# HTTP statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def is_transient_status(status):
+    """Whether an HTTP error may go away on a later attempt (throttling or 5xx)"""
+    return status == 429 or status >= 500
+
+
+class RetryPolicy:
+    """Jittered exponential backoff with a budget capping retry volume"""
+
+    def __init__(
+        self,
+        max_attempts=4,
+        base_delay=1.0,
+        max_delay=30.0,
+        budget_ratio=0.2,
+        budget_min_tokens=10,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Each request earns `budget_ratio` retry tokens and each retry spends
+        # one, so retries stay a bounded fraction of the overall traffic
+        self.budget_ratio = budget_ratio
+        self.budget_max_tokens = budget_min_tokens
+        self._tokens = float(budget_min_tokens)
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        """Delay before retry number `attempt` (1-based), with full jitter"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def record_request(self):
+        with self._lock:
+            self._tokens = min(
+                self.budget_max_tokens, self._tokens + self.budget_ratio
+            )
+
+    def try_spend_retry(self):
+        """Take a token from the retry budget, returning False if exhausted"""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised when a host's circuit is open and the caller chose not to wait"""
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: opens after consecutive failures, then lets one
+    probe request through per cooldown while the other callers keep waiting
+    """
+
+    def __init__(self, host, failure_threshold=5, cooldown=30.0, max_cooldown=300.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        # When the half-open probe was let through, None if none is in flight
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    def wait_until_closed(self):
+        """
+        Block while the circuit is open; this pauses the whole period run.
+        Once the cooldown is over, the first caller returns as the probe and
+        the others wait for its outcome.
+        """
+        warned = False
+        while True:
+            with self._lock:
+                if self.opened_at is None:
+                    return
+                now = time.monotonic()
+                remaining = self.opened_at + self.cooldown - now
+                if remaining <= 0:
+                    # A probe that never reported back (its caller failed
+                    # before sending) is eventually replaced
+                    if self.probe_started is None or now - self.probe_started > PROBE_TIMEOUT:
+                        self.probe_started = now
+                        return
+                    remaining = PROBE_POLL
+
+            if not warned:
+                logger.warning(
+                    "Circuit open for %s: pausing %.0fs after %d consecutive failures",
+                    self.host,
+                    remaining,
+                    self.failures,
+                )
+                warned = True
+            time.sleep(remaining)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+            self.cooldown = self.base_cooldown
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_started = None
+            if self.opened_at is not None:
+                # The half-open probe failed: stay open for longer
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self.opened_at = time.monotonic()
+            elif self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url):
+    """Return the circuit breaker shared by every request to the URL's host"""
+    host = urlsplit(url).netloc
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="fetch"
+            )
+        return _executor
+
+
+class Fetcher:
+    """Issue requests through a session using hedging and racing strategies"""
+
+    def __init__(self, session, hedge_after=HEDGE_AFTER, retry_policy=None):
+        self.session = session
+        self.hedge_after = hedge_after
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.latency = latency_tracker
+        # Optional PageArchive receiving every successful response
+        self.archive = None
+        # Optional RunMetrics receiving request counts, latencies and bytes
+        self.metrics = None
+        # Optional limiter whose wait(url) spaces requests to a host, shared
+        # by every worker of a distributed run
+        self.rate_limiter = None
+
+    def get(self, url, endpoint="page", hedge=True, **kwargs):
+        """GET a URL with retries, sending one duplicate request if the first is slow"""
+        delay = self._hedge_delay(url, endpoint) if hedge else None
+
+        def send(**request_kwargs):
+            if not delay:
+                return self.session.get(url, **request_kwargs)
+            return self._hedged(url, endpoint, delay, **request_kwargs)
+
+        # A hedged attempt records the latency of each of its requests itself;
+        # the attempt's own duration is only the faster one's
+        response = self._with_retries(url, endpoint, send, kwargs, record_latency=not delay)
+        return self._archived("GET", url, response)
+
+    def post(self, url, endpoint="api", **kwargs):
+        """POST a URL with retries (never hedged)"""
+
+        def send(**request_kwargs):
+            return self.session.post(url, **request_kwargs)
+
+        return self._archived("POST", url, self._with_retries(url, endpoint, send, kwargs))
+
+    def _archived(self, method, url, response):
+        if self.archive is not None and response.status_code == 200:
+            self.archive.add(method, url, response)
+        return response
+
+    def _measured(self, endpoint, seconds, response=None, error=None):
+        if self.metrics is None:
+            return
+        outcome = str(response.status_code) if response is not None else type(error).__name__
+        self.metrics.incr("requests", endpoint=endpoint, outcome=outcome)
+        self.metrics.observe("request_seconds", seconds, endpoint=endpoint)
+        if response is not None:
+            self.metrics.incr("bytes_in", len(response.content), endpoint=endpoint)
+
+    def _hedge_delay(self, url, endpoint):
+        if not self.hedge_after:
+            return None
+        observed = self.latency.percentile(url, endpoint, HEDGE_PERCENTILE)
+        if observed is None:
+            return self.hedge_after
+        return max(MIN_HEDGE_AFTER, observed)
+
+    def _with_retries(self, url, endpoint, send, kwargs, record_latency=True, stop=None):
+        """
+        Call `send(**kwargs)` under the retry policy and the host's circuit breaker.
+
+        Unless the caller fixes a timeout, each attempt gets an adaptive
+        (connect, read) timeout from the endpoint's observed latency.
+        Returns the last response (possibly a non-200 one) once retries are
+        exhausted or the optional `stop` event is set, or re-raises the last
+        connection error, so callers keep their existing error handling.
+        """
+        breaker = get_circuit_breaker(url)
+        policy = self.retry_policy
+        fixed_timeout = "timeout" in kwargs
+        attempt = 0
+
+        while True:
+            attempt += 1
+            breaker.wait_until_closed()
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+            policy.record_request()
+
+            if not fixed_timeout:
+                kwargs["timeout"] = self.latency.timeout(url, endpoint, attempt)
+
+            started = time.monotonic()
+            try:
+                response = send(**kwargs)
+            except requests.RequestException as e:
+                if record_latency and isinstance(e, requests.Timeout):
+                    # Censored sample: the page took at least this long
+                    self.latency.record(url, endpoint, time.monotonic() - started)
+                self._measured(endpoint, time.monotonic() - started, error=e)
+                breaker.record_failure()
+                response, error = None, e
+            else:
+                if record_latency:
+                    self.latency.record(url, endpoint, time.monotonic() - started)
+                self._measured(endpoint, time.monotonic() - started, response)
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                error = None
+
+            if (
+                attempt >= policy.max_attempts
+                or (stop is not None and stop.is_set())
+                or not policy.try_spend_retry()
+            ):
+                if error is not None:
+                    raise error
+                return response
+
+            if self.metrics is not None:
+                self.metrics.incr("retries", endpoint=endpoint)
+            delay = policy.backoff(attempt)
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            logger.info(
+                "Retry %d/%d in %.1fs (%s)",
+                attempt,
+                policy.max_attempts - 1,
+                delay,
+                reason,
+                extra={"url": url, "endpoint": endpoint},
+            )
+            time.sleep(delay)
+
+    def _hedged(self, url, endpoint, delay, **kwargs):
+        executor = _get_executor()
+        pending = {self._submit_timed(executor, url, endpoint, **kwargs)}
+        done, pending = wait(pending, timeout=delay)
+
+        if not done:
+            # Slow tail response: race a second copy against the first
+            pending.add(self._submit_timed(executor, url, endpoint, **kwargs))
+
+        error = None
+        while True:
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def _submit_timed(self, executor, url, endpoint, **kwargs):
+        """Submit a GET that records its own latency when it finishes"""
+        started = time.monotonic()
+        future = executor.submit(self.session.get, url, **kwargs)
+
+        def record(future):
+            error = future.exception()
+            # A timeout is a censored sample: the page took at least this long
+            if error is None or isinstance(error, requests.Timeout):
+                self.latency.record(url, endpoint, time.monotonic() - started)
+
+        future.add_done_callback(record)
+        return future
+
+    def race(self, urls, accept, endpoint="page", **kwargs):
+        """
+        GET all URL variants concurrently and return the first accepted one.
+
+        `accept(response)` returns a parsed value for a usable response or
+        None to reject it. Returns (url, response, value), or
+        (None, None, None) if no variant was accepted. Each variant goes
+        through the circuit breaker, rate limiter and retry policy like a
+        plain GET; variants still running once one is accepted stop retrying.
+        """
+        if not urls:
+            return None, None, None
+
+        executor = _get_executor()
+        stop = threading.Event()
+
+        def fetch(url):
+            def send(**request_kwargs):
+                return self.session.get(url, **request_kwargs)
+
+            return self._with_retries(url, endpoint, send, dict(kwargs), stop=stop)
+
+        futures = {executor.submit(fetch, url): url for url in urls}
+        pending = set(futures)
+
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        response = future.result()
+                        value = accept(response)
+                    except Exception:
+                        continue
+                    if value is not None:
+                        self._archived("GET", futures[future], response)
+                        return futures[future], response, value
+        finally:
+            stop.set()
+
+        return None, None, None
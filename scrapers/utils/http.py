@@ -0,0 +1,115 @@
+"""
+Shared HTTP transport for Peru LGBT law scrapers
+
+Every scraper gets its own requests.Session (so period-specific headers do
+not leak between scrapers), but all sessions are mounted on one shared
+connection pool. Running several periods in a row therefore reuses the
+keep-alive TLS connections to www2.congreso.gob.pe and wb2server instead of
+handshaking again for each period.
+"""
+
+import socket
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+# Number of hosts to keep pools for, and connections kept alive per host.
+# The scrapers only talk to a couple of Congress hosts, but concurrent
+# fetches need more than requests' default of 10 connections per host.
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 32
+
+# Probe idle connections so the legacy servers' NAT/firewall does not
+# silently drop them between searches
+KEEPALIVE_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, "TCP_KEEPIDLE"):
+    KEEPALIVE_SOCKET_OPTIONS += [
+        (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30),
+        (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10),
+        (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3),
+    ]
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTP adapter with explicit pool sizing and per-host request counters"""
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+        self._lock = threading.Lock()
+        self._requests = Counter()
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault(
+            "socket_options",
+            HTTPConnection.default_socket_options + KEEPALIVE_SOCKET_OPTIONS,
+        )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).netloc
+        with self._lock:
+            self._requests[host] += 1
+        return super().send(request, **kwargs)
+
+    def connection_stats(self):
+        """Return per-host connection metrics for the shared pool"""
+        stats = {}
+        pools = self.poolmanager.pools
+
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+
+            host = key.key_host
+            if key.key_port and key.key_port not in (80, 443):
+                host = f"{host}:{key.key_port}"
+
+            # Idle slots in the queue are None until a connection is returned
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            stats[host] = {
+                "requests": self._requests.get(host, 0),
+                "connections_opened": pool.num_connections,
+                "connections_reused": max(0, pool.num_requests - pool.num_connections),
+                "idle_connections": idle,
+                "pool_maxsize": pool.pool.maxsize,
+            }
+
+        return stats
+
+
+_shared_adapter = None
+_shared_adapter_lock = threading.Lock()
+
+
+def get_shared_adapter():
+    """Return the process-wide connection pool shared by all scrapers"""
+    global _shared_adapter
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            _shared_adapter = PooledHTTPAdapter()
+        return _shared_adapter
+
+
+def create_session():
+    """Create a requests.Session backed by the shared connection pool"""
+    session = requests.Session()
+    adapter = get_shared_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def connection_stats():
+    """Per-host connection metrics of the shared pool (empty if unused)"""
+    if _shared_adapter is None:
+        return {}
+    return _shared_adapter.connection_stats()
@@ -0,0 +1,124 @@
+"""
+Latency tracking and adaptive timeouts for Peru LGBT law scrapers
+
+Request latencies are recorded per (host, endpoint) in log-spaced
+histograms. Timeouts are then derived from a high percentile plus a margin
+instead of a fixed 15 s: a dead connection is abandoned quickly on a fast
+endpoint, while endpoints whose pages are legitimately slow (Domino
+full-text searches) keep a long read timeout.
+"""
+
+import math
+import threading
+from urllib.parse import urlsplit
+
+# Used until an endpoint has enough samples to trust its percentiles
+DEFAULT_TIMEOUT = (5.0, 15.0)
+MIN_SAMPLES = 20
+
+# Connect timeout: slightly above a multiple of the 3 s TCP retransmit window
+CONNECT_TIMEOUT = 3.05
+
+# Read timeout = percentile * factor + margin, clamped to these bounds
+READ_PERCENTILE = 99
+READ_FACTOR = 1.5
+READ_MARGIN = 1.0
+MIN_READ_TIMEOUT = 4.0
+MAX_READ_TIMEOUT = 90.0
+
+# Histogram buckets: 10 ms doubling every four buckets up to ~3 minutes
+_BUCKET_START = 0.01
+_BUCKET_GROWTH = 2 ** 0.25
+_BUCKET_COUNT = 58
+
+
+class LatencyHistogram:
+    """Fixed-size log-bucketed histogram of request latencies in seconds"""
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.total = 0
+
+    def record(self, seconds):
+        if seconds <= _BUCKET_START:
+            index = 0
+        else:
+            index = int(math.log(seconds / _BUCKET_START, _BUCKET_GROWTH)) + 1
+        self.counts[min(index, _BUCKET_COUNT - 1)] += 1
+        self.total += 1
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the given percentile"""
+        if not self.total:
+            return None
+        threshold = self.total * pct / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return _BUCKET_START * _BUCKET_GROWTH**index
+        return _BUCKET_START * _BUCKET_GROWTH ** (_BUCKET_COUNT - 1)
+
+
+class LatencyTracker:
+    """Per-host, per-endpoint latency histograms and the timeouts derived from them"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, url, endpoint):
+        key = (urlsplit(url).netloc, endpoint)
+        if key not in self._histograms:
+            self._histograms[key] = LatencyHistogram()
+        return self._histograms[key]
+
+    def record(self, url, endpoint, seconds):
+        with self._lock:
+            self._histogram(url, endpoint).record(seconds)
+
+    def percentile(self, url, endpoint, pct):
+        """Latency percentile, or None while there are too few samples"""
+        with self._lock:
+            histogram = self._histogram(url, endpoint)
+            if histogram.total < MIN_SAMPLES:
+                return None
+            return histogram.percentile(pct)
+
+    def timeout(self, url, endpoint, attempt=1):
+        """
+        (connect, read) timeout for a request.
+
+        Retries double the timeout, so a slow but alive page still gets a
+        longer chance after a fast first attempt gave up on it.
+        """
+        read_pct = self.percentile(url, endpoint, READ_PERCENTILE)
+        if read_pct is None:
+            connect, read = DEFAULT_TIMEOUT
+        else:
+            connect = CONNECT_TIMEOUT
+            read = read_pct * READ_FACTOR + READ_MARGIN
+            read = min(MAX_READ_TIMEOUT, max(MIN_READ_TIMEOUT, read))
+
+        scale = 2 ** (attempt - 1)
+        return (
+            min(connect * scale, MAX_READ_TIMEOUT),
+            min(read * scale, MAX_READ_TIMEOUT),
+        )
+
+    def snapshot(self):
+        """Summary of every tracked endpoint: sample count and p50/p95/p99"""
+        with self._lock:
+            return {
+                f"{host} {endpoint}": {
+                    "samples": histogram.total,
+                    "p50": histogram.percentile(50),
+                    "p95": histogram.percentile(95),
+                    "p99": histogram.percentile(99),
+                }
+                for (host, endpoint), histogram in self._histograms.items()
+            }
+
+
+# Shared by every scraper, since they talk to the same hosts
+latency_tracker = LatencyTracker()
@@ -0,0 +1,181 @@
+"""
+Logging setup for Peru LGBT law scrapers
+
+Scrapers log through the standard `logging` module under the "scrapers"
+logger instead of printing from the fetch loop. setup_logging() puts a
+QueueHandler on that logger, so the scraper thread only enqueues records
+and a QueueListener thread formats and writes them:
+
+- to the console, as plain messages (or JSON lines with --log-format json),
+  with progress records redrawn in place on a terminal
+- optionally to a JSON Lines file for the log pipeline
+
+Per-document lines are DEBUG and hidden by default; a progress line with
+rates and an ETA replaces them.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from datetime import datetime
+
+ROOT_LOGGER = "scrapers"
+
+# Attributes every LogRecord has; anything else was passed in `extra`
+_RECORD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+_listener = None
+_queue = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the `extra` fields at the top level"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Stream handler that redraws progress records in place on a terminal"""
+
+    def __init__(self, stream=None, redraw=True):
+        super().__init__(stream or sys.stdout)
+        self.redraw = redraw
+        self._progress_shown = False
+
+    def emit(self, record):
+        try:
+            interactive = self.redraw and self.stream.isatty()
+        except (AttributeError, ValueError):
+            interactive = False
+
+        if getattr(record, "progress", False) and interactive:
+            self.stream.write("\r\x1b[2K" + self.format(record))
+            if getattr(record, "final", False):
+                self.stream.write("\n")
+            self.stream.flush()
+            self._progress_shown = not getattr(record, "final", False)
+            return
+
+        if self._progress_shown:
+            self.stream.write("\r\x1b[2K")
+            self._progress_shown = False
+        super().emit(record)
+
+
+class PeriodLogger(logging.LoggerAdapter):
+    """Logger adapter adding the period to every record, merged with call-site extras"""
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return msg, kwargs
+
+
+def period_logger(period_name):
+    return PeriodLogger(logging.getLogger(f"{ROOT_LOGGER}.periods"), {"period": period_name})
+
+
+def setup_logging(level="INFO", fmt="text", log_file=None):
+    """Route the scrapers' logs through a queue to the console and an optional JSON file"""
+    global _listener, _queue
+    stop_logging()
+
+    console = ConsoleHandler(redraw=fmt == "text")
+    console.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter("%(message)s"))
+    handlers = [console]
+
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    _queue = queue.Queue()
+    _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers = [logging.handlers.QueueHandler(_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+    atexit.register(stop_logging)
+
+
+def flush_logging():
+    """Wait until every queued record has been written"""
+    if _queue is not None:
+        _queue.join()
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    """Throttled progress records for a period run: terms done, laws found, rate and ETA"""
+
+    def __init__(self, log, total, interval=1.0):
+        self.log = log
+        self.total = total
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last = self.started
+
+    def update(self, done, records, final=False):
+        now = time.monotonic()
+        if not final and now - self._last < self.interval:
+            return
+        self._last = now
+
+        elapsed = max(now - self.started, 1e-9)
+        rate = records / elapsed
+        eta = (self.total - done) * elapsed / done if done else None
+        message = (
+            f"  [{self.log.extra['period']}] {done}/{self.total} terms · {records} laws "
+            f"· {rate:.1f} laws/s · {_duration(elapsed)} elapsed"
+        )
+        if not final and eta is not None:
+            message += f" · ETA {_duration(eta)}"
+
+        self.log.info(
+            message,
+            extra={
+                "progress": True,
+                "final": final,
+                "terms_done": done,
+                "terms_total": self.total,
+                "records": records,
+                "records_per_s": round(rate, 3),
+                "eta_s": round(eta, 1) if eta is not None else None,
+            },
+        )
@@ -0,0 +1,138 @@
+"""
+Cross-period consolidation of Peru LGBT law exports
+
+The legislative periods overlap (the 2000 scraper labels its records
+"1995-2001", and adjacent Domino databases share bills), and each search
+term finds the same bill again. This module streams every period export
+once and merges records that describe the same bill, keyed by a hash of the
+normalized law number and title, while keeping track of where each bill was
+found.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+
+from .record import RECORD_FIELDS, as_dict
+from .store import document_key
+
+# Oldest first, so a bill's base record comes from the period that introduced it
+PERIOD_ORDER = ["1995", "2000", "2001", "2006", "2011", "2016", "2021"]
+
+PROVENANCE_COLUMNS = ["periods", "search_terms", "occurrences"]
+
+logger = logging.getLogger(__name__)
+
+_LAW_NUMBER_RE = re.compile(r"(\d{1,5})\s*/\s*(\d{4})")
+
+
+def normalize_law_number(value):
+    """Canonical "NNNNN/YYYY" form of a bill number, or "" when unknown"""
+    if not value or value == "N/A":
+        return ""
+    match = _LAW_NUMBER_RE.search(value)
+    if match:
+        return f"{int(match.group(1)):05d}/{match.group(2)}"
+    return re.sub(r"[^0-9A-Z]", "", value.upper())
+
+
+def normalize_title(value):
+    """Lowercase, accent-free, punctuation-free title for matching"""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", value.lower()).split())
+
+
+def merge_key(record):
+    """Hash key identifying a bill across periods"""
+    number = normalize_law_number(record.get("law_number"))
+    if number:
+        identity = f"{number}|{normalize_title(record.get('title'))}"
+    else:
+        # Without a bill number the title alone is too weak; use the document
+        identity = f"doc|{document_key(record)}"
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+
+def iter_period_records(exporter, period_name):
+    """
+    Yield a period's exported records from the newer of its JSONL stream
+    and its JSON export, so a stream left by an earlier --stream run does
+    not shadow a later normal export
+    """
+    from .export import iter_jsonl
+
+    stream_file = exporter.stream_path(period_name)
+    json_file = exporter.output_dir / f"lgbt_laws_{period_name}_results.json"
+    candidates = [path for path in (stream_file, json_file) if path.exists()]
+    if not candidates:
+        return
+
+    newest = max(candidates, key=lambda path: path.stat().st_mtime)
+    if newest == stream_file:
+        yield from iter_jsonl(stream_file)
+        return
+
+    with open(json_file, encoding="utf-8") as f:
+        yield from json.load(f)
+
+
+def consolidate(records_by_period):
+    """
+    Merge (period, records) pairs into one record per bill, in linear time.
+
+    The first occurrence provides the base fields; later occurrences only
+    fill fields that are still empty. Each merged record lists the periods
+    and search terms it was found with and how many times it was seen.
+    """
+    merged = {}
+
+    for period_name, records in records_by_period:
+        for record in records:
+            record = as_dict(record)
+            key = merge_key(record)
+            entry = merged.get(key)
+
+            if entry is None:
+                entry = {name: record.get(name) for name in RECORD_FIELDS}
+                entry.update(periods=[], search_terms=[], occurrences=0)
+                merged[key] = entry
+            else:
+                for name in RECORD_FIELDS:
+                    if entry.get(name) in (None, "", "N/A", []) and record.get(name):
+                        entry[name] = record[name]
+
+            entry["occurrences"] += 1
+            if period_name not in entry["periods"]:
+                entry["periods"].append(period_name)
+            for term in [record.get("search_term_used")] + list(
+                record.get("found_terms") or []
+            ):
+                if term and term not in entry["search_terms"]:
+                    entry["search_terms"].append(term)
+
+    return merged
+
+
+def build_consolidated(exporter, periods=None):
+    """Build lgbt_laws_consolidated_* from every available period export"""
+    periods = periods or PERIOD_ORDER
+    merged = consolidate(
+        (period_name, iter_period_records(exporter, period_name))
+        for period_name in periods
+    )
+
+    if not merged:
+        logger.info("No period exports found to consolidate.")
+        return None
+
+    total_seen = sum(entry["occurrences"] for entry in merged.values())
+    logger.info("Consolidated %d records into %d unique bills", total_seen, len(merged))
+
+    records = list(merged.values())
+    exporter.save_views(records, "consolidated", columns=list(RECORD_FIELDS) + PROVENANCE_COLUMNS)
+    return records
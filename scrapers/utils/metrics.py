@@ -0,0 +1,163 @@
+"""
+Run instrumentation for Peru LGBT law scrapers
+
+Each scraper run owns a RunMetrics that the fetch, parse and export paths
+report into: request counts by endpoint and outcome, request latencies,
+bytes received, parse/extract/export timings, extraction fallbacks and
+records written. At the end of the run it is written as a JSON report,
+and optionally as a Prometheus text-format file for the node exporter's
+textfile collector, so throughput and error rates can be graphed and
+alerted on.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from .latency import LatencyHistogram
+
+METRIC_PREFIX = "lgbt_scraper"
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _label_text(key):
+    return ",".join(f"{name}={value}" for name, value in key)
+
+
+class Timing:
+    """Count, sum and latency histogram of one timed operation"""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.histogram = LatencyHistogram()
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.histogram.record(seconds)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.histogram.percentile(50),
+            "p95": self.histogram.percentile(95),
+            "p99": self.histogram.percentile(99),
+        }
+
+
+class RunMetrics:
+    """Thread-safe counters and timings for one period run"""
+
+    def __init__(self, period_name):
+        self.period_name = period_name
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self.counters = defaultdict(lambda: defaultdict(int))
+        self.timings = defaultdict(lambda: defaultdict(Timing))
+
+    def incr(self, name, amount=1, **labels):
+        with self._lock:
+            self.counters[name][_label_key(labels)] += amount
+
+    def observe(self, name, seconds, **labels):
+        with self._lock:
+            self.timings[name][_label_key(labels)].observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def total(self, name):
+        with self._lock:
+            return sum(self.counters[name].values())
+
+    def report(self):
+        """The run as a JSON-serializable dict"""
+        wall = time.monotonic() - self._started
+        requests = self.total("requests")
+        with self._lock:
+            failed = sum(
+                value
+                for key, value in self.counters["requests"].items()
+                if not dict(key).get("outcome", "").startswith(("2", "3"))
+            )
+            counters = {
+                name: {_label_text(key): value for key, value in values.items()}
+                for name, values in self.counters.items()
+            }
+            timings = {
+                name: {_label_text(key): timing.summary() for key, timing in values.items()}
+                for name, values in self.timings.items()
+            }
+
+        records = counters.get("records_written", {}).get("", 0)
+        return {
+            "period": self.period_name,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "wall_seconds": round(wall, 3),
+            "throughput": {
+                "records_per_s": round(records / wall, 3) if wall else 0,
+                "requests_per_s": round(requests / wall, 3) if wall else 0,
+                "error_rate": round(failed / requests, 4) if requests else 0,
+            },
+            "counters": counters,
+            "timings": timings,
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path):
+        """Write counters and timing summaries in the Prometheus text format"""
+        lines = []
+        base_labels = {"period": self.period_name}
+
+        def labels_text(key):
+            labels = dict(base_labels, **dict(key))
+            return ",".join(f'{name}="{value}"' for name, value in sorted(labels.items()))
+
+        with self._lock:
+            for name, values in sorted(self.counters.items()):
+                metric = f"{METRIC_PREFIX}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in values.items():
+                    lines.append(f"{metric}{{{labels_text(key)}}} {value:g}")
+
+            for name, values in sorted(self.timings.items()):
+                metric = f"{METRIC_PREFIX}_{name}"
+                lines.append(f"# TYPE {metric} summary")
+                for key, timing in values.items():
+                    for quantile in (50, 95, 99):
+                        value = timing.histogram.percentile(quantile)
+                        if value is None:
+                            continue
+                        quantile_key = key + (("quantile", quantile / 100),)
+                        lines.append(f"{metric}{{{labels_text(quantile_key)}}} {value:g}")
+                    lines.append(f"{metric}_sum{{{labels_text(key)}}} {timing.sum:g}")
+                    lines.append(f"{metric}_count{{{labels_text(key)}}} {timing.count}")
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge")
+        lines.append(
+            f"{METRIC_PREFIX}_last_run_timestamp_seconds{{{labels_text(())}}} {time.time():.0f}"
+        )
+
+        # Write then rename so the collector never reads a partial file
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        tmp_path.replace(path)
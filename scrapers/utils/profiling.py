@@ -0,0 +1,124 @@
+"""
+Profiling of scraper runs
+
+A RunProfiler records one period run in two ways at once:
+
+- cProfile over the scraper thread, saved as a .pstats file (open it with
+  `python -m pstats` or snakeviz) and used for the hot spot summary
+- a sampling profiler that snapshots the scraper thread's stack every few
+  milliseconds and writes collapsed stacks, one "frame;frame;... count"
+  line per distinct stack, ready for flamegraph.pl or speedscope. Each
+  stack is rooted at the stage it was taken in (search, parse, extract,
+  export...), so time can be split between network, BeautifulSoup, regex
+  extraction and export.
+
+Run it together with --replay to profile parsing without network noise.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+SAMPLE_INTERVAL = 0.005
+HOT_SPOTS = 15
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class RunProfiler:
+    """cProfile plus a stack sampler, with samples tagged by run stage"""
+
+    def __init__(self, period_name, interval=SAMPLE_INTERVAL):
+        self.period_name = period_name
+        self.interval = interval
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+        self.stage_samples = Counter()
+        self._stages = []
+        self._thread_id = None
+        self._sampler = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start profiling the calling thread"""
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name="profile-sampler", daemon=True
+        )
+        self._sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    @contextmanager
+    def stage(self, name):
+        """Attribute samples taken inside the block to a stage"""
+        self._stages.append(name)
+        try:
+            yield
+        finally:
+            self._stages.pop()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+
+            if self._stages:
+                stage = self._stages[-1]
+            elif any("(fetch.py:" in label for label in labels):
+                # Requests are not a scraper stage; the Fetcher frames show them
+                stage = "fetch"
+            else:
+                stage = "other"
+            labels.append(f"stage:{stage}")
+            labels.reverse()
+
+            self.stacks[";".join(labels)] += 1
+            self.stage_samples[stage] += 1
+
+    def write_pstats(self, path):
+        self.profile.dump_stats(str(path))
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def hot_spots(self, limit=HOT_SPOTS):
+        """Text summary: share of samples per stage and the top functions by own time"""
+        lines = [f"🔥 Profile for {self.period_name}"]
+
+        total = sum(self.stage_samples.values())
+        if total:
+            shares = ", ".join(
+                f"{stage} {count / total:.0%}" for stage, count in self.stage_samples.most_common()
+            )
+            lines.append(f"  Samples by stage: {shares}")
+
+        out = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=out)
+        stats.strip_dirs().sort_stats("tottime").print_stats(limit)
+        # Keep only the table, without pstats' header lines
+        table = out.getvalue().splitlines()
+        start = next((i for i, line in enumerate(table) if "ncalls" in line), 0)
+        lines.extend("  " + line for line in table[start:] if line.strip())
+        return "\n".join(lines)
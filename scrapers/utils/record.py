@@ -0,0 +1,82 @@
+"""
+Compact record type for scraped laws
+
+Every scraper produces the same fields per document. LawRecord stores them
+in a slotted dataclass instead of a 16-key dict, and interns the
+low-cardinality values ("Al Archivo", "Congreso", "2016 - 2021",
+legislature names...) so thousands of records share one copy of each
+string. Records are only turned into dicts when exported.
+"""
+
+import sys
+from dataclasses import dataclass, field, fields
+
+# Fields whose values repeat across most records of a period
+INTERNED_FIELDS = (
+    "search_term_used",
+    "status",
+    "proponent",
+    "period",
+    "legislature",
+    "year",
+)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
+class LawRecord:
+    """One scraped law/bill, in the standard export field order"""
+
+    search_term_used: str
+    found_terms: list = field(default_factory=list)
+    url: str = ""
+    title: str = ""
+    law_number: str = "N/A"
+    date: str = "N/A"
+    status: str = "N/A"
+    summary: str = ""
+    authors: str = ""
+    proponent: str = ""
+    committees: list = field(default_factory=list)
+    period: str = ""
+    legislature: str = ""
+    content_snippet: str = ""
+    year: str = ""
+    scraped_at: str = ""
+
+    def __post_init__(self):
+        for name in INTERNED_FIELDS:
+            setattr(self, name, _intern(getattr(self, name)))
+        self.found_terms = [_intern(term) for term in self.found_terms]
+        if isinstance(self.committees, list):
+            self.committees = [_intern(committee) for committee in self.committees]
+
+    def get(self, key, default=None):
+        """dict-style access so exporters can treat records and dicts alike"""
+        return getattr(self, key, default)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in RECORD_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in RECORD_FIELDS if name in data})
+
+
+RECORD_FIELDS = tuple(f.name for f in fields(LawRecord))
+
+
+def as_dict(record):
+    """Plain dict for a LawRecord (dicts are passed through unchanged)"""
+    if isinstance(record, LawRecord):
+        return record.to_dict()
+    return record
@@ -0,0 +1,170 @@
+"""
+Offline full-text search over scraped laws
+
+Builds a SQLite FTS5 index over the title, summary, content snippet and
+authors of every exported record, so questions like "which bills mention
+nombre social" are answered from disk in milliseconds instead of grepping
+seven JSON files. The index is updated incrementally: only records whose
+indexed text changed are rewritten, and documents no longer in a period's
+export are dropped.
+"""
+
+import hashlib
+import json
+import sqlite3
+
+from .record import as_dict
+from .store import document_key
+
+INDEXED_FIELDS = ["title", "summary", "content_snippet", "authors"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT NOT NULL UNIQUE,
+    period TEXT NOT NULL,
+    law_number TEXT,
+    status TEXT,
+    date TEXT,
+    url TEXT,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_docs_period ON docs(period);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, summary, content_snippet, authors,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _indexed_text(record):
+    values = []
+    for name in INDEXED_FIELDS:
+        value = record.get(name) or ""
+        if isinstance(value, list):
+            value = "; ".join(
+                item.get("name", "") if isinstance(item, dict) else str(item)
+                for item in value
+            )
+        values.append(value)
+    return values
+
+
+class SearchIndex:
+    """SQLite FTS5 index of scraped laws with incremental updates"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(_SCHEMA)
+
+    def update(self, records, period_name):
+        """
+        Index a period's records, skipping documents whose text is unchanged
+        and removing the period's documents missing from `records`.
+        Returns (added, updated, unchanged, removed) counts.
+        """
+        added = updated = unchanged = 0
+        seen = set()
+
+        with self.conn:
+            for record in records:
+                record = as_dict(record)
+                key = document_key(record)
+                # The same bill is found by several terms; index it once per run
+                if key in seen:
+                    continue
+                seen.add(key)
+                values = _indexed_text(record)
+                content_hash = hashlib.sha1(
+                    json.dumps(values, ensure_ascii=False).encode("utf-8")
+                ).hexdigest()
+
+                row = self.conn.execute(
+                    "SELECT id, content_hash FROM docs WHERE doc_key = ?", (key,)
+                ).fetchone()
+                if row and row[1] == content_hash:
+                    unchanged += 1
+                    continue
+
+                metadata = (
+                    period_name,
+                    record.get("law_number"),
+                    record.get("status"),
+                    record.get("date"),
+                    record.get("url"),
+                    content_hash,
+                )
+                if row:
+                    doc_id = row[0]
+                    self.conn.execute(
+                        "UPDATE docs SET period = ?, law_number = ?, status = ?, "
+                        "date = ?, url = ?, content_hash = ? WHERE id = ?",
+                        metadata + (doc_id,),
+                    )
+                    self.conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+                    updated += 1
+                else:
+                    doc_id = self.conn.execute(
+                        "INSERT INTO docs (doc_key, period, law_number, status, date, "
+                        "url, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key,) + metadata,
+                    ).lastrowid
+                    added += 1
+
+                self.conn.execute(
+                    "INSERT INTO docs_fts (rowid, title, summary, content_snippet, authors) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [doc_id] + values,
+                )
+
+            stale = [
+                doc_id
+                for doc_id, key in self.conn.execute(
+                    "SELECT id, doc_key FROM docs WHERE period = ?", (period_name,)
+                )
+                if key not in seen
+            ]
+            for doc_id in stale:
+                self.conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+                self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+        return added, updated, unchanged, len(stale)
+
+    def search(self, query, limit=20, period_name=None, status=None):
+        """
+        Ranked (bm25) matches for an FTS5 query, with [highlighted] terms.
+        A query that is not valid FTS5 syntax is searched as a phrase.
+        """
+        try:
+            return self._search(query, limit, period_name, status)
+        except sqlite3.OperationalError:
+            phrase = '"' + query.replace('"', '""') + '"'
+            return self._search(phrase, limit, period_name, status)
+
+    def _search(self, query, limit, period_name, status):
+        sql = """
+            SELECT docs.period, docs.law_number, docs.status, docs.date, docs.url,
+                   highlight(docs_fts, 0, '[', ']'),
+                   snippet(docs_fts, -1, '[', ']', '…', 16),
+                   bm25(docs_fts, 10.0, 4.0, 2.0, 1.0) AS rank
+            FROM docs_fts
+            JOIN docs ON docs.id = docs_fts.rowid
+            WHERE docs_fts MATCH ?
+        """
+        params = [query]
+        if period_name:
+            sql += " AND docs.period = ?"
+            params.append(period_name)
+        if status:
+            sql += " AND docs.status = ?"
+            params.append(status)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        columns = ["period", "law_number", "status", "date", "url", "title", "snippet", "rank"]
+        return [dict(zip(columns, row)) for row in self.conn.execute(sql, params)]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,194 @@
+"""
+Content-addressed snapshot history of the exported datasets
+
+Every export overwrites the previous one, so snapshots keep citable
+versions of data/exports. Each record version is identified by the sha256
+of its JSON without volatile fields (scraped_at changes on every run
+without the bill changing), and a snapshot is a manifest listing the
+record hashes of every period, in export order. The records a snapshot
+adds are written in one compressed pack, data/snapshots/packs/{id}.pack,
+and appended to objects.idx (record hash -> pack), so a daily run where a
+few bills changed adds a small pack, a few index lines and one manifest,
+without reading earlier manifests. A record keeps the scraped_at of the
+run that first stored it.
+
+Checking out a snapshot rewrites its JSON/CSV/TXT views into a
+directory; diffing two snapshots reports new/changed/removed bills.
+"""
+
+import hashlib
+import json
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from .changes import build_index, diff_indexes
+
+SNAPSHOT_ID_FORMAT = "%Y%m%dT%H%M%S%f"
+
+# Fields left out of a record's hash: they change between runs on their own
+VOLATILE_FIELDS = ("scraped_at",)
+
+
+def record_digest(record):
+    """sha256 of a record's canonical JSON, volatile fields excluded"""
+    canonical = {name: value for name, value in record.items() if name not in VOLATILE_FIELDS}
+    data = json.dumps(canonical, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class SnapshotRepository:
+    """Object packs plus manifests under data/snapshots/"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.packs_dir = self.root / "packs"
+        self.manifests_dir = self.root / "manifests"
+        self.objects_file = self.root / "objects.idx"
+        self.packs_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self._packs = {}
+        self._objects = None
+
+    def _pack_path(self, pack_id):
+        return self.packs_dir / f"{pack_id}.pack"
+
+    def _load_pack(self, pack_id):
+        pack = self._packs.get(pack_id)
+        if pack is None:
+            pack = json.loads(zlib.decompress(self._pack_path(pack_id).read_bytes()))
+            self._packs[pack_id] = pack
+        return pack
+
+    def _stored_objects(self):
+        """Hash -> pack id of every record stored by any snapshot"""
+        if self._objects is None:
+            self._objects = {}
+            if self.objects_file.exists():
+                with open(self.objects_file, encoding="utf-8") as f:
+                    for line in f:
+                        fields = line.split()
+                        # A line cut short by an interrupted snapshot is skipped;
+                        # its manifest was never written
+                        if len(fields) == 2:
+                            self._objects[fields[0]] = fields[1]
+        return self._objects
+
+    def _add_objects(self, digests, pack_id):
+        with open(self.objects_file, "a", encoding="utf-8") as f:
+            f.writelines(f"{digest} {pack_id}\n" for digest in digests)
+        self._stored_objects().update(dict.fromkeys(digests, pack_id))
+
+    def _reserve_id(self):
+        """A new snapshot id, claimed by creating its (empty) pack file"""
+        while True:
+            snapshot_id = datetime.now().strftime(SNAPSHOT_ID_FORMAT)
+            try:
+                with open(self._pack_path(snapshot_id), "x"):
+                    return snapshot_id
+            except FileExistsError:
+                continue
+
+    def create(self, export_dir, message=None):
+        """
+        Snapshot every lgbt_laws_{period}_results.json in `export_dir`.
+        Returns the new manifest, or None if nothing changed since the
+        latest snapshot.
+        """
+        periods = {}
+        records = {}
+        for json_file in sorted(Path(export_dir).glob("lgbt_laws_*_results.json")):
+            period_name = json_file.name[len("lgbt_laws_"):-len("_results.json")]
+            with open(json_file, encoding="utf-8") as f:
+                digests = periods[period_name] = []
+                for record in json.load(f):
+                    digest = record_digest(record)
+                    records.setdefault(digest, record)
+                    digests.append(digest)
+
+        latest = self.latest()
+        if latest is not None and latest["periods"] == periods:
+            return None
+
+        stored = self._stored_objects()
+        snapshot_id = self._reserve_id()
+        added = {digest: record for digest, record in records.items() if digest not in stored}
+        pack = json.dumps(added, ensure_ascii=False).encode("utf-8")
+        self._pack_path(snapshot_id).write_bytes(zlib.compress(pack, 9))
+        self._add_objects(list(added), snapshot_id)
+
+        manifest = {
+            "id": snapshot_id,
+            "created_at": datetime.now().isoformat(),
+            "message": message,
+            "periods": periods,
+        }
+        # Write then rename so list() never reads a partial manifest
+        manifest_file = self.manifests_dir / f"{snapshot_id}.json"
+        tmp_file = manifest_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+        tmp_file.replace(manifest_file)
+        return manifest
+
+    def list(self):
+        """Manifests from oldest to newest"""
+        manifests = []
+        for path in sorted(self.manifests_dir.glob("*.json")):
+            with open(path, encoding="utf-8") as f:
+                manifests.append(json.load(f))
+        return manifests
+
+    def latest(self):
+        paths = sorted(self.manifests_dir.glob("*.json"))
+        if not paths:
+            return None
+        with open(paths[-1], encoding="utf-8") as f:
+            return json.load(f)
+
+    def resolve(self, ref):
+        """Find a manifest by id, unique id prefix, or 'latest'"""
+        if ref == "latest":
+            manifest = self.latest()
+            if manifest is None:
+                raise ValueError("No snapshots yet")
+            return manifest
+
+        matches = sorted(self.manifests_dir.glob(f"{ref}*.json"))
+        if len(matches) != 1:
+            raise ValueError(
+                f"Snapshot '{ref}' matches {len(matches)} snapshots; use a longer id"
+            )
+        with open(matches[0], encoding="utf-8") as f:
+            return json.load(f)
+
+    def records(self, manifest, period_name):
+        objects = self._stored_objects()
+        return [
+            self._load_pack(objects[digest])[digest]
+            for digest in manifest["periods"].get(period_name, [])
+        ]
+
+    def checkout(self, ref, exporter):
+        """Rewrite a snapshot's JSON/CSV/TXT views through `exporter`"""
+        from .merge import PROVENANCE_COLUMNS
+        from .record import RECORD_FIELDS
+
+        manifest = self.resolve(ref)
+        for period_name in manifest["periods"]:
+            records = self.records(manifest, period_name)
+            columns = None
+            if period_name == "consolidated":
+                columns = list(RECORD_FIELDS) + PROVENANCE_COLUMNS
+            exporter.save_views(records, period_name, columns=columns)
+        return manifest
+
+    def diff(self, old_ref, new_ref):
+        """Yield new/changed/removed bills per period between two snapshots"""
+        old, new = self.resolve(old_ref), self.resolve(new_ref)
+        for period_name in dict.fromkeys(list(old["periods"]) + list(new["periods"])):
+            yield from diff_indexes(
+                build_index(self.records(old, period_name)),
+                build_index(self.records(new, period_name)),
+                period_name,
+            )
@@ -0,0 +1,207 @@
+"""
+SQLite result store for Peru LGBT law scrapers
+
+Every period writes into one database with a unique index on the canonical
+document key, so the same bill found by several search terms (or on
+several runs) is stored once and updated in place. The usual CSV/JSON/TXT
+views can be exported from it through DataExporter.
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime
+
+from .record import as_dict
+
+# Records buffered before an upsert transaction is committed
+BATCH_SIZE = 200
+
+# Domino document URLs end in .../<view UNID>/<document UNID>?OpenDocument
+_UNID_RE = re.compile(r"/([0-9a-fA-F]{32})(?=/|$)")
+# 2021 portal URLs end in .../expediente/main/<perParId>/<pleyNum>
+_SPLEY_RE = re.compile(r"/expediente/(?:main/)?(\d+)/(\d+)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS laws (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT NOT NULL,
+    period TEXT NOT NULL,
+    law_number TEXT,
+    title TEXT,
+    status TEXT,
+    date TEXT,
+    url TEXT,
+    record TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_laws_doc_key ON laws(doc_key);
+CREATE INDEX IF NOT EXISTS idx_laws_period ON laws(period);
+CREATE INDEX IF NOT EXISTS idx_laws_status ON laws(status);
+CREATE INDEX IF NOT EXISTS idx_laws_date ON laws(date);
+
+CREATE TABLE IF NOT EXISTS law_terms (
+    doc_key TEXT NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (doc_key, term)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_law_terms_term ON law_terms(term);
+"""
+
+_UPSERT = """
+INSERT INTO laws (doc_key, period, law_number, title, status, date, url, record, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(doc_key) DO UPDATE SET
+    period = excluded.period,
+    law_number = excluded.law_number,
+    title = excluded.title,
+    status = excluded.status,
+    date = excluded.date,
+    url = excluded.url,
+    record = excluded.record,
+    last_seen = excluded.last_seen
+"""
+
+
+def document_key(record):
+    """
+    Canonical key of a scraped law: the Domino document UNID for the legacy
+    periods, or perParId/pleyNum for the 2021 API. Falls back to the URL.
+    """
+    url = record.get("url", "") or ""
+    match = _SPLEY_RE.search(url)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}"
+
+    matches = _UNID_RE.findall(url.split("?")[0])
+    if matches:
+        return matches[-1].lower()
+
+    return url or f"{record.get('law_number', '')}|{record.get('title', '')}"
+
+
+def normalize_date(value):
+    """Return an ISO date (YYYY-MM-DD) for the date formats the periods use"""
+    if not value:
+        return None
+    value = value.strip()
+    match = re.match(r"(\d{1,2})/(\d{1,2})/(\d{4})", value)
+    if match:
+        day, month, year = match.groups()
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    match = re.match(r"(\d{4})-(\d{2})-(\d{2})", value)
+    if match:
+        return match.group(0)
+    return None
+
+
+class ResultStore:
+    """SQLite-backed store of scraped laws with batched upserts"""
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._pending = []
+
+    def add(self, record, period_name):
+        """Buffer a record for upsert, writing a batch when the buffer is full"""
+        self._pending.append((record, period_name))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def upsert_many(self, records, period_name):
+        for record in records:
+            self.add(record, period_name)
+        self.flush()
+
+    def flush(self):
+        """Upsert all buffered records in a single transaction"""
+        if not self._pending:
+            return
+
+        now = datetime.now().isoformat()
+        law_rows = []
+        term_rows = []
+        for record, period_name in self._pending:
+            record = as_dict(record)
+            key = document_key(record)
+            law_rows.append(
+                (
+                    key,
+                    period_name,
+                    record.get("law_number"),
+                    record.get("title"),
+                    record.get("status"),
+                    normalize_date(record.get("date")),
+                    record.get("url"),
+                    json.dumps(record, ensure_ascii=False),
+                    record.get("scraped_at") or now,
+                    record.get("scraped_at") or now,
+                )
+            )
+            terms = [record.get("search_term_used")] + list(record.get("found_terms") or [])
+            term_rows.extend((key, term) for term in terms if term)
+
+        with self.conn:
+            self.conn.executemany(_UPSERT, law_rows)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO law_terms (doc_key, term) VALUES (?, ?)",
+                term_rows,
+            )
+        self._pending.clear()
+
+    def contains(self, doc_key):
+        """Whether a document is already stored (indexed lookup)"""
+        row = self.conn.execute(
+            "SELECT 1 FROM laws WHERE doc_key = ?", (doc_key,)
+        ).fetchone()
+        return row is not None
+
+    def count(self, period_name=None):
+        self.flush()
+        if period_name is None:
+            return self.conn.execute("SELECT COUNT(*) FROM laws").fetchone()[0]
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM laws WHERE period = ?", (period_name,)
+        ).fetchone()[0]
+
+    def iter_records(self, period_name=None, status=None, term=None):
+        """Yield stored records (one per document), optionally filtered"""
+        self.flush()
+        query = "SELECT laws.record FROM laws"
+        clauses = []
+        params = []
+        if term is not None:
+            query += " JOIN law_terms ON law_terms.doc_key = laws.doc_key"
+            clauses.append("law_terms.term = ?")
+            params.append(term)
+        if period_name is not None:
+            clauses.append("laws.period = ?")
+            params.append(period_name)
+        if status is not None:
+            clauses.append("laws.status = ?")
+            params.append(status)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY laws.id"
+
+        for (record,) in self.conn.execute(query, params):
+            yield json.loads(record)
+
+    def terms_for(self, doc_key):
+        """All search/found terms a document was matched by"""
+        return [
+            term
+            for (term,) in self.conn.execute(
+                "SELECT term FROM law_terms WHERE doc_key = ? ORDER BY term", (doc_key,)
+            )
+        ]
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,288 @@
+"""
+Durable SQLite work queue for distributed scraper runs
+
+A refresh is split into tasks: one search task per (period, term) and one
+document task per (period, document key) found by a search. Workers (see
+scrapers/worker.py) lease tasks, run them and mark them done, so any
+number of processes can share a refresh:
+
+- a lease expires after its visibility timeout, so the tasks of a worker
+  that died are handed out again
+- tasks are unique per (kind, period, key): a document found by several
+  search terms is fetched once
+- a failed task goes back to the queue until it has used up its attempts
+- each `enqueue` of the searches starts a new refresh: tasks finished in an
+  earlier refresh are reopened when queued again, while within a refresh
+  they stay deduplicated
+
+The same database holds the politeness budget: one request slot schedule
+per Congress host, shared by every worker. SQLite serializes the writes,
+so the queue works for processes on one machine or on a shared disk; it
+stands in for a real broker.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+DEFAULT_VISIBILITY = 300.0
+MAX_ATTEMPTS = 3
+
+# Documents are leased before searches so a refresh finishes the documents
+# it has found before discovering more
+KIND_PRIORITY = {"document": 0, "search": 1}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    period TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    error TEXT,
+    refresh INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (kind, period, key)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(state, lease_expires);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('refresh', 0);
+
+CREATE TABLE IF NOT EXISTS host_slots (
+    host TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Task:
+    """A leased task"""
+
+    def __init__(self, task_id, kind, period, key, payload, attempts):
+        self.id = task_id
+        self.kind = kind
+        self.period = period
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.kind}, {self.period}, {self.key!r})"
+
+
+class WorkQueue:
+    """Leased, deduplicated tasks plus per-host request slots in one SQLite file"""
+
+    def __init__(self, path, visibility=DEFAULT_VISIBILITY, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.visibility = visibility
+        self.max_attempts = max_attempts
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        # The connection is shared by the fetcher's threads (raced variants
+        # all reserve request slots); one transaction at a time on it
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if columns and "refresh" not in columns:
+            # Queue created before refreshes were tracked
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN refresh INTEGER NOT NULL DEFAULT 0")
+        self.conn.executescript(_SCHEMA)
+
+    def _transaction(self):
+        return _ImmediateTransaction(self.conn, self._lock)
+
+    def start_refresh(self):
+        """Start a new refresh, so tasks queued from now on run again; returns its number"""
+        with self._transaction():
+            self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'refresh'")
+            return self._current_refresh()
+
+    def _current_refresh(self):
+        return self.conn.execute("SELECT value FROM meta WHERE key = 'refresh'").fetchone()[0]
+
+    def enqueue(self, kind, period, key, payload):
+        """
+        Queue a task for the current refresh; True if it was added or
+        reopened, False if this refresh already has it
+        """
+        now = datetime.now().isoformat()
+        with self._transaction():
+            refresh = self._current_refresh()
+            cursor = self.conn.execute(
+                "INSERT INTO tasks (kind, period, key, payload, refresh, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, period, key) DO UPDATE SET "
+                "state = CASE WHEN state IN ('done', 'failed') THEN 'pending' ELSE state END, "
+                "attempts = CASE WHEN state IN ('done', 'failed') THEN 0 ELSE attempts END, "
+                "payload = excluded.payload, refresh = excluded.refresh, "
+                "updated_at = excluded.updated_at "
+                "WHERE refresh < excluded.refresh",
+                (kind, period, key, json.dumps(payload, ensure_ascii=False), refresh, now, now),
+            )
+        return cursor.rowcount == 1
+
+    def lease(self, worker, kinds=None, periods=None):
+        """Lease the next pending (or expired) task for `visibility` seconds, or None"""
+        now = time.time()
+        conditions = ["(state = 'pending' OR (state = 'leased' AND lease_expires < ?))"]
+        params = [now]
+        if kinds:
+            conditions.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            params.extend(kinds)
+        if periods:
+            conditions.append(f"period IN ({', '.join('?' * len(periods))})")
+            params.extend(periods)
+        order = " ".join(f"WHEN '{kind}' THEN {rank}" for kind, rank in KIND_PRIORITY.items())
+
+        with self._transaction():
+            row = self.conn.execute(
+                f"SELECT id, kind, period, key, payload, attempts FROM tasks "
+                f"WHERE {' AND '.join(conditions)} "
+                f"ORDER BY CASE kind {order} END, id LIMIT 1",
+                params,
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE tasks SET state = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker, now + self.visibility, datetime.now().isoformat(), row[0]),
+            )
+
+        task_id, kind, period, key, payload, attempts = row
+        return Task(task_id, kind, period, key, json.loads(payload), attempts + 1)
+
+    def complete(self, task, worker):
+        """Mark a leased task done; False if the lease was lost to another worker"""
+        with self._transaction():
+            cursor = self.conn.execute(
+                "UPDATE tasks SET state = 'done', lease_expires = NULL, error = NULL, "
+                "updated_at = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (datetime.now().isoformat(), task.id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, task, worker, error):
+        """Return a task to the queue, or mark it failed once it used up its attempts"""
+        state = "failed" if task.attempts >= self.max_attempts else "pending"
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE tasks SET state = ?, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (state, str(error), datetime.now().isoformat(), task.id, worker),
+            )
+        return state
+
+    def requeue_failed(self):
+        """Give every failed task a fresh set of attempts"""
+        with self._transaction():
+            cursor = self.conn.execute(
+                "UPDATE tasks SET state = 'pending', attempts = 0, updated_at = ? "
+                "WHERE state = 'failed'",
+                (datetime.now().isoformat(),),
+            )
+        return cursor.rowcount
+
+    def reserve_slot(self, url, interval):
+        """
+        Reserve the next request slot for the URL's host, `interval` seconds
+        after the previous one taken by any worker. Returns the seconds to
+        wait before sending.
+        """
+        host = urlsplit(url).netloc
+        with self._transaction():
+            row = self.conn.execute(
+                "SELECT next_at FROM host_slots WHERE host = ?", (host,)
+            ).fetchone()
+            now = time.time()
+            slot = max(now, row[0]) if row else now
+            self.conn.execute(
+                "INSERT INTO host_slots (host, next_at) VALUES (?, ?) "
+                "ON CONFLICT(host) DO UPDATE SET next_at = excluded.next_at",
+                (host, slot + interval),
+            )
+        return slot - now
+
+    def stats(self):
+        """{kind: {state: count}} over the whole queue"""
+        stats = {}
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT kind, state, COUNT(*) FROM tasks GROUP BY kind, state ORDER BY kind, state"
+            ).fetchall()
+        for kind, state, count in rows:
+            stats.setdefault(kind, {})[state] = count
+        return stats
+
+    def pending(self):
+        """Number of tasks not yet done or failed"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE state IN ('pending', 'leased')"
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class _ImmediateTransaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT, so concurrent workers never read the same
+    pending task, holding the connection's lock so threads of one worker
+    do not interleave their transactions
+    """
+
+    def __init__(self, conn, lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+        return False
+
+
+class SharedRateLimiter:
+    """Fetcher rate limiter spacing requests to each host across all workers"""
+
+    def __init__(self, work_queue, interval):
+        self.work_queue = work_queue
+        self.interval = interval
+
+    def wait(self, url):
+        delay = self.work_queue.reserve_slot(url, self.interval)
+        if delay > 0:
+            time.sleep(delay)
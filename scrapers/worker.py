@@ -0,0 +1,225 @@
+"""
+Distributed workers for Peru LGBT law scrapers
+
+Shards a refresh across processes (or machines sharing data/exports/)
+through the SQLite work queue in scrapers/utils/work_queue.py:
+
+    python -m scrapers.worker enqueue --all      # one search task per period/term
+    python -m scrapers.worker run &               # start as many workers as wanted
+    python -m scrapers.worker run &
+    python -m scrapers.worker status
+    python main.py --all --from-store            # export once the queue is drained
+
+A search task runs one search term and enqueues a document task for every
+document it finds; documents already queued by another term are not
+queued again. Workers write records to the shared store
+(data/exports/lgbt_laws.sqlite) and space their requests to each Congress
+host through one shared request budget, so adding workers does not add
+load on a host beyond --interval.
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from .periods import PERIODS, load_scraper
+from .utils.export import DataExporter
+from .utils.logs import ROOT_LOGGER, setup_logging
+from .utils.search_terms import LGBT_SEARCH_TERMS
+from .utils.work_queue import DEFAULT_VISIBILITY, SharedRateLimiter, default_worker_id
+
+# Not __name__, which is __main__ under `python -m`
+logger = logging.getLogger(f"{ROOT_LOGGER}.worker")
+
+# Seconds between two requests to the same host, across all workers
+DEFAULT_INTERVAL = 1.0
+
+# How long an idle worker waits for tasks other workers may still enqueue
+IDLE_POLL = 2.0
+
+# Scraper method running one search term, per period
+SEARCH_METHODS = {
+    "2021": "search_laws",
+    "2016": "search_historical_laws_2016",
+    "2011": "search_laws_2011",
+    "2006": "search_laws_2006",
+    "2001": "search_laws_2001",
+    "2000": "search_laws_2000",
+    "1995": "search_laws_1995",
+}
+
+
+def enqueue_searches(work_queue, periods, test=False):
+    """
+    Start a refresh with one search task per (period, term); returns the
+    number of tasks queued
+    """
+    work_queue.start_refresh()
+    terms = LGBT_SEARCH_TERMS[:5] if test else LGBT_SEARCH_TERMS
+    queued = 0
+    for period in periods:
+        for term in terms:
+            if work_queue.enqueue("search", period, term, {"term": term}):
+                queued += 1
+    return queued
+
+
+class Worker:
+    """Leases tasks from the queue and runs them with one warm scraper per period"""
+
+    def __init__(self, work_queue, worker_id=None, periods=None, interval=DEFAULT_INTERVAL):
+        self.work_queue = work_queue
+        self.worker_id = worker_id or default_worker_id()
+        self.periods = periods
+        self.rate_limiter = SharedRateLimiter(work_queue, interval)
+        self.scrapers = {}
+        self.done = 0
+        self.failed = 0
+
+    def scraper_for(self, period):
+        scraper = self.scrapers.get(period)
+        if scraper is None:
+            scraper = load_scraper(period)()
+            scraper.export_results = False
+            scraper.exporter.open_store()
+            scraper.work_queue = self.work_queue
+            # The shared rate limiter replaces the per-scraper pauses, and
+            # hedged duplicates would bypass it
+            scraper.politeness = 0
+            scraper.fetcher.rate_limiter = self.rate_limiter
+            scraper.fetcher.hedge_after = None
+            self.scrapers[period] = scraper
+        return scraper
+
+    def run_task(self, task):
+        """Run one leased task; raises if it failed and should be retried"""
+        scraper = self.scraper_for(task.period)
+        deferred = len(scraper.retry_queue)
+
+        if task.kind == "search":
+            getattr(scraper, SEARCH_METHODS[task.period])(task.payload["term"])
+        else:
+            process = getattr(scraper, task.payload["method"])
+            process(task.payload["item"], task.payload["term"])
+
+        # Records must be committed before the task is marked done
+        scraper.exporter.store.flush()
+
+        if len(scraper.retry_queue) > deferred:
+            # The scraper deferred a failed fetch; the queue retries it instead
+            del scraper.retry_queue[deferred:]
+            raise RuntimeError("fetch failed after retries")
+
+    def run(self, keep_running=False):
+        """Work until the queue is drained (or forever with keep_running)"""
+        logger.info("Worker %s started", self.worker_id)
+        while True:
+            task = self.work_queue.lease(self.worker_id, periods=self.periods)
+            if task is None:
+                if not keep_running and not self.work_queue.pending():
+                    break
+                time.sleep(IDLE_POLL)
+                continue
+
+            try:
+                self.run_task(task)
+            except Exception as e:
+                state = self.work_queue.fail(task, self.worker_id, e)
+                self.failed += 1
+                logger.warning("%s %s: %s (%s)", task.kind, task.key, e, state)
+                continue
+
+            if self.work_queue.complete(task, self.worker_id):
+                self.done += 1
+            else:
+                logger.warning("Lease on %s %s expired before it finished", task.kind, task.key)
+
+        self.close()
+        logger.info(
+            "Worker %s finished: %d done, %d failed", self.worker_id, self.done, self.failed
+        )
+
+    def close(self):
+        for scraper in self.scrapers.values():
+            scraper.exporter.store.flush()
+            scraper.exporter.store.close()
+
+
+def print_status(work_queue):
+    stats = work_queue.stats()
+    if not stats:
+        print("Queue is empty (fill it with `enqueue`)")
+        return
+    for kind, states in stats.items():
+        counts = ", ".join(f"{state}: {count}" for state, count in states.items())
+        print(f"  {kind}: {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Shard scraping across workers through a shared SQLite task queue"
+    )
+    parser.add_argument(
+        "--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"]
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = subparsers.add_parser("enqueue", help="Queue the search tasks of a refresh")
+    enqueue.add_argument("--period", action="append", choices=list(PERIODS), help="Repeatable")
+    enqueue.add_argument("--all", action="store_true", help="Queue every period")
+    enqueue.add_argument("--test", action="store_true", help="Only the first 5 search terms")
+    enqueue.add_argument(
+        "--retry-failed", action="store_true", help="Also give failed tasks new attempts"
+    )
+
+    run = subparsers.add_parser("run", help="Lease and run tasks until the queue is drained")
+    run.add_argument("--worker-id", help="Default: hostname-pid")
+    run.add_argument("--period", action="append", choices=list(PERIODS), help="Only these periods")
+    run.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="Seconds between requests to a host, shared by all workers",
+    )
+    run.add_argument(
+        "--visibility",
+        type=float,
+        default=DEFAULT_VISIBILITY,
+        help="Seconds before an unfinished task is handed to another worker",
+    )
+    run.add_argument("--keep-running", action="store_true", help="Wait for new tasks when idle")
+    run.add_argument("--base-url", metavar="URL", help="Send requests to this host instead")
+
+    subparsers.add_parser("status", help="Show task counts by kind and state")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    exporter = DataExporter()
+
+    if args.command == "enqueue":
+        if not args.all and not args.period:
+            parser.error("enqueue needs --period or --all")
+        work_queue = exporter.open_work_queue()
+        if args.retry_failed:
+            print(f"🔁 {work_queue.requeue_failed()} failed task(s) requeued")
+        periods = list(PERIODS) if args.all else args.period
+        print(f"📥 {enqueue_searches(work_queue, periods, args.test)} search task(s) queued")
+
+    elif args.command == "run":
+        if args.base_url:
+            from .utils.endpoints import BASE_URL_ENV
+
+            os.environ[BASE_URL_ENV] = args.base_url
+        work_queue = exporter.open_work_queue(visibility=args.visibility)
+        Worker(work_queue, args.worker_id, args.period, args.interval).run(args.keep_running)
+
+    else:
+        work_queue = exporter.open_work_queue()
+        print_status(work_queue)
+
+    work_queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_exports(tmp_path, monkeypatch):
+    """Keep every exporter created by a test out of data/exports/"""
+    from scrapers.utils.export import OUTPUT_DIR_ENV
+
+    output_dir = tmp_path / "exports"
+    output_dir.mkdir()
+    monkeypatch.setenv(OUTPUT_DIR_ENV, str(output_dir))
+    return output_dir
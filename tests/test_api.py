@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from scrapers import api
+from scrapers.base import BaseLGBTScraper
+
+
+class FakeScraper(BaseLGBTScraper):
+    records = 3
+    error = None
+
+    def __init__(self):
+        super().__init__("2021")
+
+    def run(self):
+        try:
+            for n in range(self.records):
+                self.add_result({"url": f"http://x/{n}", "title": str(n)})
+            if self.error is not None:
+                raise self.error
+        except Exception as e:
+            self.run_error = e
+        finally:
+            self.save_results()
+
+
+@pytest.fixture
+def fake_scraper(monkeypatch):
+    monkeypatch.setattr(api, "load_scraper", lambda period: FakeScraper)
+    return FakeScraper
+
+
+def test_iter_laws_yields_every_record(fake_scraper):
+    assert [law["url"] for law in api.iter_laws(["2021"])] == [
+        "http://x/0",
+        "http://x/1",
+        "http://x/2",
+    ]
+
+
+def test_iter_laws_reraises_a_failed_run(fake_scraper, monkeypatch):
+    monkeypatch.setattr(fake_scraper, "error", RuntimeError("API down"))
+    laws = api.iter_laws(["2021"])
+    assert len([next(laws) for _ in range(3)]) == 3
+    with pytest.raises(RuntimeError, match="API down"):
+        next(laws)
+
+
+def test_iter_laws_rejects_unknown_periods():
+    with pytest.raises(KeyError):
+        next(api.iter_laws(["1900"]))
+
+
+def test_aiter_laws_can_stop_early(fake_scraper, monkeypatch):
+    monkeypatch.setattr(fake_scraper, "records", 1000)
+
+    async def first(n):
+        laws = []
+        async for law in api.aiter_laws(["2021"], queue_size=2):
+            laws.append(law)
+            if len(laws) == n:
+                break
+        return laws
+
+    assert len(asyncio.run(first(5))) == 5
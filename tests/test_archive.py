@@ -0,0 +1,41 @@
+from unittest.mock import Mock
+
+from scrapers.utils import archive
+from scrapers.utils.archive import PageArchive
+
+
+def response(content, url):
+    return Mock(
+        content=content,
+        status_code=200,
+        headers={"Content-Type": "text/html"},
+        request=Mock(body=None, url=url),
+    )
+
+
+def test_pages_round_trip_before_and_after_training(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "TRAIN_SAMPLES", 3)
+    pages = {
+        f"http://x/{i}": (f"<html><body>Proyecto {i} " + "boilerplate " * 50).encode()
+        for i in range(6)
+    }
+    store = PageArchive(tmp_path, "2006")
+    for url, content in pages.items():
+        store.add("GET", url, response(content, url))
+    store.close()
+
+    store = PageArchive(tmp_path, "2006")
+    for url, content in pages.items():
+        assert store.get(url) == content
+    assert store.get("http://x/missing") is None
+    store.close()
+
+
+def test_identical_pages_are_stored_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "TRAIN_SAMPLES", 1)
+    store = PageArchive(tmp_path, "2006")
+    for url in ("http://x/a", "http://x/b"):
+        store.add("GET", url, response(b"same page", url))
+    stats = store.stats()
+    store.close()
+    assert (stats["pages"], stats["blobs"]) == (2, 1)
@@ -0,0 +1,50 @@
+from scrapers.utils.changes import build_index, diff_indexes
+
+
+def record(number, status, url):
+    return {"law_number": number, "title": "Ley", "status": status, "url": url}
+
+
+def test_diff_reports_new_changed_and_removed():
+    previous = build_index(
+        [record("1/2021", "En comisión", "http://x/a"), record("2/2021", "X", "http://x/b")]
+    )
+    current = build_index(
+        [record("1/2021", "Al Archivo", "http://x/a"), record("3/2021", "X", "http://x/c")]
+    )
+
+    changes = {change["change"]: change for change in diff_indexes(previous, current, "2021")}
+    assert set(changes) == {"new", "changed", "removed"}
+    assert changes["changed"]["fields"] == {"status": {"old": "En comisión", "new": "Al Archivo"}}
+    assert changes["removed"]["law_number"] == "2/2021"
+
+
+def test_volatile_fields_are_not_changes():
+    first = dict(record("1/2021", "X", "http://x/a"), scraped_at="1", search_term_used="gay")
+    second = dict(first, scraped_at="2", search_term_used="trans")
+    assert list(diff_indexes(build_index([first]), build_index([second]), "2021")) == []
+
+
+def test_partial_run_does_not_report_unfound_bills_as_removed(tmp_path):
+    import json
+
+    from scrapers.utils.export import DataExporter
+
+    exporter = DataExporter(tmp_path)
+    full = [record("1/2021", "X", "http://x/a"), record("2/2021", "X", "http://x/b")]
+    exporter.save_results(full, "2021")
+
+    partial = [record("1/2021", "Al Archivo", "http://x/a")]
+    exporter.save_results(partial, "2021", complete=False)
+    exporter.save_results([full[0]], "2021")
+
+    with open(exporter.changes_path("2021"), encoding="utf-8") as f:
+        changes = [(c["change"], c["law_number"]) for c in map(json.loads, f)]
+    assert changes == [
+        ("new", "1/2021"),
+        ("new", "2/2021"),
+        ("changed", "1/2021"),
+        # Only the complete run reports the bill it did not find
+        ("changed", "1/2021"),
+        ("removed", "2/2021"),
+    ]
@@ -0,0 +1,139 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from scrapers.utils.fetch import CircuitBreaker, Fetcher, RetryPolicy
+
+
+def response(status):
+    return Mock(status_code=status, content=b"")
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    for attempt in range(1, 8):
+        assert 0 <= policy.backoff(attempt) <= min(4.0, 2 ** (attempt - 1))
+
+
+def test_retry_budget_limits_retries():
+    policy = RetryPolicy(budget_ratio=0.0, budget_min_tokens=2)
+    assert policy.try_spend_retry()
+    assert policy.try_spend_retry()
+    assert not policy.try_spend_retry()
+    # Each request earns back a fraction of a token
+    policy = RetryPolicy(budget_ratio=0.5, budget_min_tokens=2)
+    policy.try_spend_retry(), policy.try_spend_retry()
+    policy.record_request(), policy.record_request()
+    assert policy.try_spend_retry()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("host", failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.opened_at is None
+    breaker.record_failure()
+    assert breaker.opened_at is not None
+
+
+def test_failed_probe_doubles_the_cooldown():
+    breaker = CircuitBreaker("host", failure_threshold=1, cooldown=10, max_cooldown=25)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.cooldown == 20
+    breaker.record_failure()
+    assert breaker.cooldown == 25
+    breaker.record_success()
+    assert (breaker.opened_at, breaker.cooldown) == (None, 10)
+
+
+def fetcher(responses):
+    session = Mock()
+    session.get.side_effect = responses
+    return Fetcher(session, hedge_after=None, retry_policy=RetryPolicy(base_delay=0))
+
+
+def test_get_retries_transient_statuses():
+    result = fetcher([response(503), response(200)]).get("http://retry.example/a")
+    assert result.status_code == 200
+
+
+def test_get_returns_permanent_errors_without_retrying():
+    client = fetcher([response(404), response(200)])
+    assert client.get("http://notfound.example/a").status_code == 404
+    assert client.session.get.call_count == 1
+
+
+def test_get_reraises_the_last_connection_error():
+    error = requests.ConnectionError("down")
+    with pytest.raises(requests.ConnectionError):
+        fetcher([error] * 4).get("http://down.example/a")
+
+
+def test_race_returns_the_accepted_variant():
+    session = Mock()
+    session.get.side_effect = lambda url, **kwargs: response(200 if url.endswith("b") else 404)
+    client = Fetcher(session, hedge_after=None, retry_policy=RetryPolicy(base_delay=0))
+
+    url, result, value = client.race(
+        ["http://race.example/a", "http://race.example/b"],
+        lambda r: "ok" if r.status_code == 200 else None,
+    )
+    assert (url, value) == ("http://race.example/b", "ok")
+
+
+def test_half_open_circuit_lets_one_probe_through(monkeypatch):
+    from scrapers.utils import fetch
+
+    monkeypatch.setattr(fetch, "PROBE_POLL", 0.01)
+    breaker = CircuitBreaker("host", failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+
+    passed = []
+
+    def caller(name):
+        breaker.wait_until_closed()
+        passed.append(name)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    # Only the probe got through while the circuit is half-open
+    assert len(passed) == 1
+
+    breaker.record_success()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert len(passed) == 5
+
+
+def test_failed_probe_keeps_the_others_waiting(monkeypatch):
+    from scrapers.utils import fetch
+
+    monkeypatch.setattr(fetch, "PROBE_POLL", 0.01)
+    breaker = CircuitBreaker("host", failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    breaker.wait_until_closed()
+    breaker.record_failure()
+    assert breaker.cooldown == 0.1
+    assert breaker.probe_started is None
+
+
+def test_permanent_http_errors_are_not_deferred():
+    from scrapers.periods.scraper_2016 import Peru2016LGBTScraper
+
+    scraper = Peru2016LGBTScraper()
+    scraper.fetcher.get = Mock(return_value=response(404))
+    scraper.process_law_page_2016({"url": "http://x/gone", "title": "t"}, "gay")
+    assert scraper.retry_queue == []
+
+    scraper.fetcher.get = Mock(return_value=response(503))
+    scraper.process_law_page_2016({"url": "http://x/busy", "title": "t"}, "gay")
+    assert len(scraper.retry_queue) == 1
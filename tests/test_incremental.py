@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from scrapers.periods.scraper_2021 import Peru2021LGBTScraper
+
+
+@pytest.fixture
+def scraper():
+    return Peru2021LGBTScraper()
+
+
+def test_window_starts_at_lookback_or_mark(scraper):
+    assert scraper.window_start() is None
+    scraper.high_water_mark = date.today() - timedelta(days=90)
+    assert scraper.window_start() == scraper.high_water_mark
+    scraper.high_water_mark = date.today()
+    assert scraper.window_start() == date.today() - timedelta(days=scraper.lookback_days)
+
+
+def test_mark_advances_to_latest_presented(scraper):
+    scraper.note_presented("2025-09-09T00:00:00.000-0500")
+    scraper.note_presented("2025-08-01T00:00:00.000-0500")
+    scraper.note_presented("not a date")
+    scraper.save_state()
+
+    reloaded = Peru2021LGBTScraper()
+    reloaded.load_state()
+    assert reloaded.high_water_mark == date(2025, 9, 9)
+
+
+def test_mark_is_kept_after_failures_or_interruptions(scraper):
+    scraper.high_water_mark = date(2025, 1, 1)
+    scraper.note_presented("2025-09-09")
+    scraper.failed_items.append(("search_laws", ("gay",)))
+    scraper.save_state()
+    assert scraper.exporter.load_state("2021") == {}
+
+    scraper.failed_items.clear()
+    scraper.incomplete_terms = ["gay"]
+    scraper.save_state()
+    assert scraper.exporter.load_state("2021") == {}
+
+
+def search_response(body, status=200):
+    return Mock(status_code=status, json=Mock(return_value=body))
+
+
+def listing(total, start, size):
+    projects = [
+        {"perParId": 2021, "pleyNum": n, "fecPresentacion": f"2025-01-{n + 1:02d}"}
+        for n in range(start, min(start + size, total))
+    ]
+    return {"code": 200, "status": "success", "data": {"proyectos": projects, "rowsTotal": total}}
+
+
+def test_search_pages_through_every_match(scraper):
+    scraper.politeness = 0
+    scraper.get_project_details = Mock()
+    starts = []
+
+    def post(url, json, **kwargs):
+        starts.append(json["rowStart"])
+        return search_response(listing(7, json["rowStart"], json["pageSize"]))
+
+    scraper.fetcher.post = post
+
+    assert scraper.search_laws("gay", max_results=3) == 7
+    assert starts == [0, 3, 6]
+    assert scraper.get_project_details.call_count == 7
+    # The mark covers the last page too
+    assert scraper.latest_presented == date(2025, 1, 7)
+
+
+def test_api_error_defers_the_remaining_pages(scraper):
+    scraper.politeness = 0
+    scraper.get_project_details = Mock()
+    scraper.fetcher.post = Mock(
+        side_effect=[
+            search_response(listing(5, 0, 3)),
+            search_response({"code": 500, "status": "error"}),
+        ]
+    )
+
+    assert scraper.search_laws("gay", max_results=3) == 3
+    [(func, args)] = scraper.retry_queue
+    assert args == ("gay", 3, None, None, 3)
+
+
+def test_limited_or_interrupted_runs_are_not_complete(scraper):
+    assert scraper.run_is_complete()
+    scraper.search_terms = scraper.search_terms[:5]
+    assert not scraper.run_is_complete()
+
+    other = Peru2021LGBTScraper()
+    other.incomplete_terms = ["gay"]
+    assert not other.run_is_complete()
@@ -0,0 +1,37 @@
+from scrapers.utils.merge import consolidate, merge_key, normalize_law_number, normalize_title
+
+
+def test_normalize_law_number():
+    assert normalize_law_number("Proyecto 123/2006-CR") == "00123/2006"
+    assert normalize_law_number("00123 / 2006") == "00123/2006"
+    assert normalize_law_number("N/A") == ""
+
+
+def test_normalize_title_ignores_accents_case_and_punctuation():
+    assert normalize_title("Ley de Unión Civil, ¡ya!") == normalize_title("LEY DE UNION CIVIL YA")
+
+
+def test_same_bill_merges_across_periods_and_terms():
+    older = {
+        "law_number": "123/2006",
+        "title": "Ley de unión civil",
+        "summary": "",
+        "search_term_used": "unión civil",
+        "url": "http://x/1",
+    }
+    newer = dict(older, summary="Sumilla", search_term_used="gay", found_terms=["lgbt"])
+    merged = consolidate([("2006", [older]), ("2011", [newer, older])])
+
+    assert len(merged) == 1
+    entry = merged[merge_key(older)]
+    assert entry["occurrences"] == 3
+    assert entry["periods"] == ["2006", "2011"]
+    assert entry["search_terms"] == ["unión civil", "gay", "lgbt"]
+    # Later occurrences only fill empty fields
+    assert entry["summary"] == "Sumilla"
+
+
+def test_records_without_number_merge_by_document():
+    a = {"law_number": "N/A", "title": "Same", "url": "http://x/a"}
+    b = {"law_number": "N/A", "title": "Same", "url": "http://x/b"}
+    assert merge_key(a) != merge_key(b)
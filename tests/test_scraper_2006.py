@@ -0,0 +1,26 @@
+from scrapers.periods.scraper_2006 import Peru2006LGBTScraper
+
+BASE = "https://www2.congreso.gob.pe/Sicr/TraDocEstProc/CLProLey2006.nsf/view/36f318d2779acdac"
+
+
+def test_redirect_variants_are_distinct_and_exclude_the_original():
+    scraper = Peru2006LGBTScraper()
+    for url in (f"{BASE}?OpenDocument", f"{BASE}?OpenDocument&Highlight=0,gay", BASE):
+        variants = scraper._construct_full_url_2006(url)
+        assert len(variants) == len(set(variants))
+        assert url not in variants
+        assert variants
+
+
+def test_only_real_redirect_stubs_are_detected():
+    scraper = Peru2006LGBTScraper()
+    stub = "<html><script>location.href = location.href + '&Click=';</script></html>"
+    document = (
+        "<html><script>location.href = 'x';</script>"
+        "<table><tr><td>Número</td><td>123/2006</td></tr></table></html>"
+    )
+    short_page = "<html><script>var a = 1;</script><body>Sin datos</body></html>"
+
+    assert scraper._is_javascript_redirect_page_2006(scraper.parse_html(stub))
+    assert not scraper._is_javascript_redirect_page_2006(scraper.parse_html(document))
+    assert not scraper._is_javascript_redirect_page_2006(scraper.parse_html(short_page))
@@ -0,0 +1,50 @@
+import json
+import zlib
+
+from scrapers.utils.snapshots import SnapshotRepository
+
+
+def export(directory, records):
+    with open(directory / "lgbt_laws_2021_results.json", "w", encoding="utf-8") as f:
+        json.dump(records, f)
+
+
+def records(status, scraped_at):
+    return [
+        {"url": "http://x/1", "status": "X", "scraped_at": scraped_at},
+        {"url": "http://x/2", "status": status, "scraped_at": scraped_at},
+    ]
+
+
+def test_snapshots_store_each_record_version_once(tmp_path):
+    repository = SnapshotRepository(tmp_path / "snapshots")
+    export(tmp_path, records("En comisión", "1"))
+    first = repository.create(tmp_path)
+
+    # Only scraped_at changed: nothing to snapshot
+    export(tmp_path, records("En comisión", "2"))
+    assert repository.create(tmp_path) is None
+
+    export(tmp_path, records("Al Archivo", "3"))
+    # A new snapshot reads the object index, not the earlier manifests
+    repository = SnapshotRepository(tmp_path / "snapshots")
+    repository.list = None
+    second = repository.create(tmp_path)
+
+    pack_file = tmp_path / "snapshots" / "packs" / f"{second['id']}.pack"
+    pack = json.loads(zlib.decompress(pack_file.read_bytes()))
+    assert len(pack) == 1
+    assert [r["status"] for r in repository.records(second, "2021")] == ["X", "Al Archivo"]
+    assert [r["status"] for r in repository.records(first, "2021")] == ["X", "En comisión"]
+
+
+def test_diff_between_snapshots(tmp_path):
+    repository = SnapshotRepository(tmp_path / "snapshots")
+    export(tmp_path, records("En comisión", "1"))
+    first = repository.create(tmp_path)
+    export(tmp_path, records("Al Archivo", "2"))
+    second = repository.create(tmp_path)
+
+    [change] = repository.diff(first["id"], second["id"])
+    assert change["change"] == "changed"
+    assert change["fields"] == {"status": {"old": "En comisión", "new": "Al Archivo"}}
@@ -0,0 +1,32 @@
+from scrapers.utils.store import ResultStore, document_key, normalize_date
+
+UNID = "36f318d2779acdac052577730075f361"
+URL = f"https://www2.congreso.gob.pe/Sicr/db.nsf/view/{UNID}?OpenDocument&Highlight=0,gay"
+
+
+def test_document_key_ignores_the_search_query():
+    other = URL.replace("Highlight=0,gay", "Highlight=0,lesbiana")
+    assert document_key({"url": URL}) == document_key({"url": other}) == UNID
+
+
+def test_document_key_for_the_2021_portal():
+    url = "https://wb2server.congreso.gob.pe/spley-portal/#/expediente/main/2021/4321"
+    assert document_key({"url": url}) == "2021/4321"
+
+
+def test_normalize_date():
+    assert normalize_date("5/3/2007") == "2007-03-05"
+    assert normalize_date("2025-09-09T00:00:00.000-0500") == "2025-09-09"
+    assert normalize_date("Sin fecha") is None
+
+
+def test_upsert_keeps_one_row_per_document_and_every_term(tmp_path):
+    store = ResultStore(tmp_path / "laws.sqlite", batch_size=1)
+    store.add({"url": URL, "status": "En comisión", "search_term_used": "gay"}, "2006")
+    store.add({"url": URL, "status": "Al Archivo", "search_term_used": "lesbiana"}, "2006")
+
+    assert store.count() == 1
+    assert [r["status"] for r in store.iter_records("2006")] == ["Al Archivo"]
+    assert store.terms_for(UNID) == ["gay", "lesbiana"]
+    assert [r["status"] for r in store.iter_records(term="gay")] == ["Al Archivo"]
+    store.close()
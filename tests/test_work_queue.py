@@ -0,0 +1,88 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scrapers.utils.work_queue import SharedRateLimiter, WorkQueue
+
+
+@pytest.fixture
+def work_queue(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.sqlite", visibility=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_enqueue_deduplicates_within_a_refresh(work_queue):
+    work_queue.start_refresh()
+    assert work_queue.enqueue("document", "2006", "abc", {"n": 1})
+    assert not work_queue.enqueue("document", "2006", "abc", {"n": 2})
+    assert work_queue.pending() == 1
+
+
+def test_lease_prefers_documents_and_is_exclusive(work_queue):
+    work_queue.enqueue("search", "2006", "unión civil", {})
+    work_queue.enqueue("document", "2006", "abc", {})
+
+    first = work_queue.lease("a")
+    second = work_queue.lease("b")
+    assert (first.kind, second.kind) == ("document", "search")
+    assert work_queue.lease("c") is None
+
+
+def test_expired_lease_is_handed_out_again(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.sqlite", visibility=0.01)
+    queue.enqueue("document", "2006", "abc", {})
+    task = queue.lease("a")
+    time.sleep(0.05)
+
+    again = queue.lease("b")
+    assert again.id == task.id
+    assert again.attempts == 2
+    # The first worker lost its lease and cannot complete the task
+    assert not queue.complete(task, "a")
+    assert queue.complete(again, "b")
+    queue.close()
+
+
+def test_fail_retries_until_attempts_are_used_up(work_queue):
+    work_queue.enqueue("document", "2006", "abc", {})
+    assert work_queue.fail(work_queue.lease("a"), "a", "boom") == "pending"
+    assert work_queue.fail(work_queue.lease("a"), "a", "boom") == "failed"
+    assert work_queue.lease("a") is None
+    assert work_queue.requeue_failed() == 1
+    assert work_queue.lease("a") is not None
+
+
+def test_new_refresh_reopens_finished_tasks(work_queue):
+    work_queue.start_refresh()
+    work_queue.enqueue("search", "2021", "gay", {"term": "gay"})
+    task = work_queue.lease("a")
+    work_queue.complete(task, "a")
+    assert not work_queue.enqueue("search", "2021", "gay", {"term": "gay"})
+
+    work_queue.start_refresh()
+    assert work_queue.enqueue("search", "2021", "gay", {"term": "gay"})
+    assert work_queue.lease("a").attempts == 1
+
+
+def test_reserve_slot_spaces_requests_per_host(work_queue):
+    assert work_queue.reserve_slot("http://a.example/x", 10) == pytest.approx(0, abs=0.01)
+    assert work_queue.reserve_slot("http://a.example/y", 10) == pytest.approx(10, abs=0.1)
+    assert work_queue.reserve_slot("http://b.example/x", 10) == pytest.approx(0, abs=0.01)
+
+
+def test_rate_limiter_is_safe_across_threads(work_queue):
+    # Raced URL variants share the worker's queue connection from the
+    # fetcher's thread pool
+    limiter = SharedRateLimiter(work_queue, interval=0.0001)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(limiter.wait, f"http://host{i % 3}.example/page")
+            for i in range(400)
+        ]
+        for future in futures:
+            future.result()
+
+    work_queue.enqueue("document", "2006", "abc", {})
+    assert work_queue.pending() == 1